@@ -0,0 +1,104 @@
+"""
+Compares brute-force, BVH and uniform grid intersection on worlds of
+random spheres.
+
+For each world size, traces the same rays through intersect_world and
+intersect_world_batch with acceleration "none" and with each structure,
+printing the speedups and the build and traversal statistics.
+"""
+
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import argparse
+import random
+import time
+import ray_tracing.elements.matrix as matrix
+import ray_tracing.elements.rays as rays
+import ray_tracing.elements.shapes as shapes
+import ray_tracing.elements.tuples as tuples
+import ray_tracing.scene.world as world
+
+
+def random_world(count, seed=0):
+    """
+    A world of count small spheres scattered in a cube, above a plane.
+    """
+    rng = random.Random(seed)
+    w = world.World()
+    for _ in range(count):
+        radius = rng.uniform(0.1, 0.5)
+        w.add_object(
+            shapes.Sphere(
+                transform=matrix.TranslationMatrix(
+                    rng.uniform(-20, 20), rng.uniform(0, 40), rng.uniform(-20, 20)
+                )
+                * matrix.ScalingMatrix(radius, radius, radius)
+            )
+        )
+    w.add_object(shapes.Plane())
+    return w
+
+
+def random_rays(count, seed=1):
+    """
+    Rays from in front of the cube towards random points inside it.
+    """
+    rng = random.Random(seed)
+    origin = tuples.Point(0, 20, -60)
+    return [
+        rays.Ray(
+            origin,
+            (
+                tuples.Point(rng.uniform(-20, 20), rng.uniform(0, 40), 0) - origin
+            ).normalize(),
+        )
+        for _ in range(count)
+    ]
+
+
+def timed(function, *args):
+    """
+    Calls function once and returns the elapsed seconds.
+    """
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 3000])
+    parser.add_argument("--rays", type=int, default=500)
+    parser.add_argument("--structures", nargs="+", default=["bvh", "grid"])
+    args = parser.parse_args()
+
+    ray_list = random_rays(args.rays)
+    batch = rays.RayBatch.from_rays(ray_list)
+    print(
+        f"{'spheres':>8}{'structure':>10}{'build s':>10}{'nodes/ray':>11}"
+        f"{'tests/ray':>11}{'scalar x':>10}{'batch x':>9}"
+    )
+    for size in args.sizes:
+        w = random_world(size)
+        w.acceleration = "none"
+        brute_scalar = timed(lambda: [w.intersect_world(r) for r in ray_list])
+        brute_batch = timed(w.intersect_world_batch, batch)
+        for structure in args.structures:
+            w.acceleration = structure
+            w.acceleration_stats()
+            scalar = timed(lambda: [w.intersect_world(r) for r in ray_list])
+            batched = timed(w.intersect_world_batch, batch)
+            stats = w.acceleration_stats()
+            print(
+                f"{size:>8}{structure:>10}{stats['build_time']:>10.3f}"
+                f"{stats['nodes_per_ray']:>11.1f}{stats['tests_per_ray']:>11.2f}"
+                f"{brute_scalar / scalar:>9.1f}x{brute_batch / batched:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
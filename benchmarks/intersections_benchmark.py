@@ -0,0 +1,94 @@
+"""
+Benchmark for accumulating intersections along a ray.
+
+Builds the intersections of one ray with k objects (two per object) and
+finds the hit, the way intersect_world used to: one collection per
+object, accumulated with +=. Compares the original list-backed container
+(legacy_intersections.py), the array-backed one used the same way, and
+the array-backed bulk constructor.
+"""
+
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import random
+import time
+import legacy_intersections
+import ray_tracing.operations.intersection as intersection
+
+
+def random_ts(objects, seed=0):
+    """
+    Two t values per object, the entry and exit of a random sphere.
+    """
+    rng = random.Random(seed)
+    ts = []
+    for _ in range(objects):
+        t = rng.uniform(-50, 50)
+        ts.append((t, t + rng.uniform(0.1, 2)))
+    return ts
+
+
+def legacy_accumulate(ts, shapes):
+    xs = legacy_intersections.Intersections()
+    for (t0, t1), shape in zip(ts, shapes):
+        xs += legacy_intersections.Intersections(
+            legacy_intersections.Intersection(t0, shape),
+            legacy_intersections.Intersection(t1, shape),
+        )
+    return xs.get_first_hit()
+
+
+def array_accumulate(ts, shapes):
+    xs = intersection.Intersections()
+    for (t0, t1), shape in zip(ts, shapes):
+        xs += intersection.Intersections.from_ts((t0, t1), shape)
+    return xs.get_first_hit()
+
+
+def array_bulk(ts, shapes):
+    values = []
+    indices = []
+    for index, pair in enumerate(ts):
+        values.extend(pair)
+        indices.extend((index, index))
+    return intersection.Intersections.from_arrays(values, indices, shapes).get_first_hit()
+
+
+METHODS = {
+    "legacy +=": legacy_accumulate,
+    "arrays +=": array_accumulate,
+    "arrays bulk": array_bulk,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--objects", type=int, nargs="+", default=[10, 100, 1000, 3000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'objects':>8}{'intersections':>15}" + "".join(f"{m + ' ms':>16}" for m in METHODS))
+    for objects in args.objects:
+        ts = random_ts(objects)
+        shapes = [object() for _ in range(objects)]
+        expected = min(t for pair in ts for t in pair if t > 0)
+        row = f"{objects:>8}{2 * objects:>15}"
+        for method in METHODS.values():
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                hit = method(ts, shapes)
+                best = min(best, time.perf_counter() - start)
+            assert hit.t == expected
+            row += f"{best * 1000:>16.3f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
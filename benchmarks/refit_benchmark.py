@@ -0,0 +1,74 @@
+"""
+Compares refitting the BVH against rebuilding it for animated frames.
+
+A world of random spheres is animated for a number of frames; in every
+frame a fraction of the spheres drift along their own velocities. The
+frame is applied with World.update_transforms, which refits the BVH (or
+rebuilds it once refitting has degraded it too much), and a second world
+sharing the same objects rebuilds its BVH from scratch. Per frame, prints
+the update mode, refit and rebuild times, the SAH cost ratio of the
+refitted tree and the time to trace a batch of rays through each tree.
+"""
+
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import argparse
+import random
+import ray_tracing.elements.matrix as matrix
+import ray_tracing.elements.rays as rays
+import ray_tracing.scene.world as world
+from bvh_benchmark import random_world, random_rays, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--moving", type=float, default=0.1)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--rays", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(2)
+    world_refit = random_world(args.size)
+    world_refit.acceleration = "bvh"
+    world_rebuild = world.World()
+    world_rebuild.replace_objects(world_refit.objects)
+    world_rebuild.acceleration = "bvh"
+    batch = rays.RayBatch.from_rays(random_rays(args.rays))
+
+    objects = world_refit.objects
+    spheres = range(len(objects) - 1)
+    moving = rng.sample(spheres, int(len(spheres) * args.moving))
+    velocities = {
+        i: [rng.uniform(-args.speed, args.speed) for _ in range(3)] for i in moving
+    }
+    world_refit.acceleration_stats()
+
+    print(
+        f"{'frame':>6}{'mode':>9}{'refit ms':>10}{'rebuild ms':>12}"
+        f"{'cost x':>8}{'trace refit ms':>16}{'trace rebuilt ms':>18}"
+    )
+    for frame in range(1, args.frames + 1):
+        report = world_refit.update_transforms(
+            [
+                (i, matrix.TranslationMatrix(*velocities[i]) * objects[i].transform)
+                for i in moving
+            ]
+        )
+        rebuild_time = world_rebuild.acceleration_stats()["build_time"]
+        trace_refit = timed(world_refit.intersect_world_batch, batch)
+        trace_rebuilt = timed(world_rebuild.intersect_world_batch, batch)
+        print(
+            f"{frame:>6}{report['mode']:>9}{report['time'] * 1000:>10.1f}"
+            f"{rebuild_time * 1000:>12.1f}{report['cost_ratio']:>8.2f}"
+            f"{trace_refit * 1000:>16.1f}{trace_rebuilt * 1000:>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compares the scalar and wavefront render engines.
+
+Renders the default world and the example scenes with both engines,
+printing the wall time of each and the largest per-channel difference.
+"""
+
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+sys.path.insert(0, os.path.join(package_path, "example"))
+
+import argparse
+import math
+import time
+import camera_render
+import plane_render
+import ray_tracing.elements.tuples as tuples
+import ray_tracing.scene.camera as camera
+import ray_tracing.scene.world as world
+
+
+def default_scene(hsize, vsize):
+    """
+    The default world seen from the front.
+    """
+    cam = camera.Camera(hsize, vsize, math.pi / 2)
+    cam.transform = camera.view_transform(
+        tuples.Point(0, 0, -5), tuples.Point(0, 0, 0), tuples.Vector(0, 1, 0)
+    )
+    return cam, world.DefaultWorld()
+
+
+SCENES = {
+    "default_world": default_scene,
+    "camera_render": camera_render.build_scene,
+    "plane_render": plane_render.build_scene,
+}
+
+
+def max_difference(image_a, image_b):
+    """
+    Returns the largest channel difference between two canvases.
+    """
+    difference = 0.0
+    for row_a, row_b in zip(image_a.pixels, image_b.pixels):
+        for pixel_a, pixel_b in zip(row_a, row_b):
+            for i in range(3):
+                difference = max(difference, abs(pixel_a[i] - pixel_b[i]))
+    return difference
+
+
+def timed_render(cam, w, **kwargs):
+    """
+    Renders once and returns the image with the elapsed seconds.
+    """
+    start = time.perf_counter()
+    image = cam.render(w, **kwargs)
+    return image, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hsize", type=int, default=100)
+    parser.add_argument("--vsize", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'scene':<16}{'scalar s':>12}{'wavefront s':>14}{'speedup':>10}{'max diff':>12}")
+    for name, build_scene in SCENES.items():
+        cam, w = build_scene(args.hsize, args.vsize)
+        scalar, scalar_time = timed_render(cam, w)
+        wavefront, wavefront_time = timed_render(cam, w, engine="wavefront")
+        print(
+            f"{name:<16}{scalar_time:>12.3f}{wavefront_time:>14.3f}"
+            f"{scalar_time / wavefront_time:>9.1f}x"
+            f"{max_difference(scalar, wavefront):>12.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
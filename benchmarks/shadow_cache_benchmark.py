@@ -0,0 +1,73 @@
+"""
+Measures the last-occluder shadow cache on the example scenes.
+
+Renders each scene with the cache disabled and enabled, once with the
+scalar engine and once as wavefront batches of tile x tile pixels, and
+prints the wall times with the cache counters.
+"""
+
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+sys.path.insert(0, os.path.join(package_path, "example"))
+
+import argparse
+import time
+import camera_render
+import plane_render
+
+SCENES = {
+    "camera_render": camera_render.build_scene,
+    "plane_render": plane_render.build_scene,
+}
+
+
+def render_scalar(cam, w, tile):
+    cam.render(w)
+
+
+def render_tiles(cam, w, tile):
+    for y in range(0, cam.vsize, tile):
+        for x in range(0, cam.hsize, tile):
+            batch = cam.rays_for_region(
+                x, y, min(x + tile, cam.hsize), min(y + tile, cam.vsize)
+            )
+            w.color_at_batch(batch)
+
+
+ENGINES = {"scalar": render_scalar, "tiles": render_tiles}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hsize", type=int, default=100)
+    parser.add_argument("--vsize", type=int, default=50)
+    parser.add_argument("--tile", type=int, default=8)
+    args = parser.parse_args()
+
+    print(
+        f"{'scene':<16}{'engine':<8}{'off s':>8}{'on s':>8}"
+        f"{'lookups':>9}{'hit rate':>10}{'full queries':>14}"
+    )
+    for name, build_scene in SCENES.items():
+        cam, w = build_scene(args.hsize, args.vsize)
+        for engine, render in ENGINES.items():
+            times = {}
+            for enabled in (False, True):
+                w.occluder_cache.enabled = enabled
+                w.occluder_cache.clear()
+                w.occluder_cache.reset_stats()
+                start = time.perf_counter()
+                render(cam, w, args.tile)
+                times[enabled] = time.perf_counter() - start
+            stats = w.occluder_cache.stats()
+            print(
+                f"{name:<16}{engine:<8}{times[False]:>8.3f}{times[True]:>8.3f}"
+                f"{stats['lookups']:>9}{stats['hit_rate']:>10.2f}{stats['full_queries']:>14}"
+            )
+
+
+if __name__ == "__main__":
+    main()
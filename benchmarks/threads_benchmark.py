@@ -0,0 +1,105 @@
+"""
+Compares rendering tiles in threads against rendering them in processes.
+
+Each of the standard scenes (the default world, the example scenes and
+the uneven scene of the tile scheduling benchmark) is rendered in tiles
+by one worker, then by a pool of threads and a pool of processes, with
+the wavefront and the scalar engine. Prints the wall time of each, the
+speedup over one worker and whether the images match the serial one.
+
+Threads share the scene and write into one array, so they start fast and
+copy nothing, but run in parallel only inside numpy's array stages;
+processes pay for pickling the scene and starting the workers but are
+not held back by the GIL.
+"""
+
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import argparse
+import time
+import numpy as np
+import ray_tracing.elements.tuples as tuples
+import ray_tracing.scene.camera as camera
+from render_benchmark import SCENES
+from tile_schedule_benchmark import uneven_world
+
+
+def uneven_scene(hsize, vsize):
+    """
+    The scene of the tile scheduling benchmark: a cluster of spheres low
+    in the frame under empty sky.
+    """
+    cam = camera.Camera(
+        hsize,
+        vsize,
+        1.0,
+        camera.view_transform(
+            tuples.Point(0, 9, -25), tuples.Point(0, 6, 0), tuples.Vector(0, 1, 0)
+        ),
+    )
+    return cam, uneven_world(150, 3)
+
+
+def pixels(image):
+    """
+    Returns the pixels of a canvas as a height x width x 3 array.
+    """
+    return np.array([[tuple(p) for p in row] for row in image.pixels])
+
+
+def timed_render(cam, w, **kwargs):
+    """
+    Renders once and returns the image with the elapsed seconds.
+    """
+    start = time.perf_counter()
+    image = cam.render(w, **kwargs)
+    return image, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hsize", type=int, default=160)
+    parser.add_argument("--vsize", type=int, default=100)
+    parser.add_argument("--tile-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--engines", nargs="+", default=["wavefront", "scalar"])
+    args = parser.parse_args()
+
+    scenes = dict(SCENES, uneven=uneven_scene)
+    print(
+        f"{args.workers} workers, {args.hsize} x {args.vsize}, "
+        f"{args.tile_size} x {args.tile_size} tiles"
+    )
+    print(
+        f"{'scene':<16}{'engine':<11}{'serial s':>10}{'threads s':>11}{'speedup':>9}"
+        f"{'processes s':>13}{'speedup':>9}{'same':>6}"
+    )
+    for name, build_scene in scenes.items():
+        for engine in args.engines:
+            cam, w = build_scene(args.hsize, args.vsize)
+            common = {"engine": engine, "tile_size": args.tile_size}
+            serial, serial_time = timed_render(cam, w, workers=1, **common)
+            threaded, thread_time = timed_render(
+                cam, w, workers=args.workers, executor="threads", **common
+            )
+            pooled, process_time = timed_render(
+                cam, w, workers=args.workers, executor="processes", **common
+            )
+            reference = pixels(serial)
+            same = np.array_equal(reference, pixels(threaded)) and np.array_equal(
+                reference, pixels(pooled)
+            )
+            print(
+                f"{name:<16}{engine:<11}{serial_time:>10.3f}"
+                f"{thread_time:>11.3f}{serial_time / thread_time:>8.1f}x"
+                f"{process_time:>13.3f}{serial_time / process_time:>8.1f}x"
+                f"{'yes' if same else 'NO':>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
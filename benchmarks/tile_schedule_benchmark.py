@@ -0,0 +1,155 @@
+"""
+Compares tile scheduling strategies on a scene whose pixel cost varies a lot.
+
+The scene has empty sky above a dense cluster of spheres lit by several
+lights, low in the frame. The frame is first rendered serially a few
+times to measure the cost of every tile (the median, to keep timer noise
+and pauses out); the makespans of three strategies are then simulated
+from those costs for several worker counts:
+
+    static   each worker gets one contiguous band of rows
+    row      tiles in row order, each taken by the next idle worker
+    cost     tiles ordered by the pre-pass estimate, expensive first
+
+Utilisation is the ideal frame time (total cost / workers) over the
+makespan. Finally the frame is rendered in a process pool with the cost
+scheduler and its per-worker utilisation report is printed.
+"""
+
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import argparse
+import heapq
+import random
+import numpy as np
+import ray_tracing.elements.lights as lights
+import ray_tracing.elements.matrix as matrix
+import ray_tracing.elements.shapes as shapes
+import ray_tracing.elements.tuples as tuples
+import ray_tracing.scene.camera as camera
+import ray_tracing.scene.tiles as tiles
+import ray_tracing.scene.world as world
+
+
+def uneven_world(count, light_count, seed=0):
+    """
+    count spheres packed in the lower left of the view, over a floor, with
+    light_count lights; the upper part of the frame is empty sky.
+    """
+    rng = random.Random(seed)
+    w = world.World()
+    for _ in range(count):
+        radius = rng.uniform(0.3, 1.0)
+        w.add_object(
+            shapes.Sphere(
+                transform=matrix.TranslationMatrix(
+                    rng.uniform(-12, -2), rng.uniform(0, 6), rng.uniform(-4, 8)
+                )
+                * matrix.ScalingMatrix(radius, radius, radius)
+            )
+        )
+    w.add_object(shapes.Plane())
+    for k in range(light_count):
+        w.add_light(
+            lights.PointLight(
+                tuples.Point(-20 + 10 * k, 30, -20), tuples.Color(0.3, 0.3, 0.3)
+            )
+        )
+    return w
+
+
+def makespan(costs, workers):
+    """
+    Frame time when each tile, in the given order, goes to the worker that
+    becomes idle first.
+    """
+    finish = [0.0] * workers
+    for cost in costs:
+        heapq.heappush(finish, heapq.heappop(finish) + cost)
+    return max(finish)
+
+
+def static_makespan(costs, workers):
+    """
+    Frame time when the tiles, in row order, are cut into one contiguous
+    band per worker.
+    """
+    bands = np.array_split(np.asarray(costs), workers)
+    return max(band.sum() for band in bands)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--width", type=int, default=240)
+    parser.add_argument("--height", type=int, default=160)
+    parser.add_argument("--tile-size", type=int, default=16)
+    parser.add_argument("--spheres", type=int, default=150)
+    parser.add_argument("--lights", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--simulate", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    w = uneven_world(args.spheres, args.lights)
+    c = camera.Camera(
+        args.width,
+        args.height,
+        1.0,
+        camera.view_transform(
+            tuples.Point(0, 9, -25), tuples.Point(0, 6, 0), tuples.Vector(0, 1, 0)
+        ),
+    )
+
+    row_tiles = tiles.split_tiles(c.hsize, c.vsize, args.tile_size)
+    runs = []
+    for _ in range(args.repeats):
+        measured = tiles.TileScheduler(order="row")
+        c.render(w, workers=1, tile_size=args.tile_size, scheduler=measured)
+        runs.append([measured.costs[tile] for tile in row_tiles])
+    true_cost = np.median(runs, axis=0).tolist()
+    costs = dict(zip(row_tiles, true_cost))
+    print(
+        f"{len(row_tiles)} tiles, {sum(true_cost):.2f} s serial, "
+        f"cheapest {min(true_cost) * 1000:.2f} ms, "
+        f"most expensive {max(true_cost) * 1000:.2f} ms"
+    )
+
+    estimator = tiles.TileScheduler()
+    cost_order = estimator.schedule(c, w, row_tiles)
+    estimate = [estimator.estimates[tile] for tile in row_tiles]
+    print(
+        f"pre-pass {estimator.prepass_time:.2f} s, "
+        f"correlation with true cost {np.corrcoef(estimate, true_cost)[0, 1]:.2f}"
+    )
+
+    print(f"{'workers':>8}{'static':>9}{'row':>9}{'cost':>9}   (simulated utilisation)")
+    for count in args.simulate:
+        ideal = sum(true_cost) / count
+        static = ideal / static_makespan(true_cost, count)
+        row = ideal / makespan(true_cost, count)
+        cost = ideal / makespan([costs[tile] for tile in cost_order], count)
+        print(f"{count:>8}{static:>9.2f}{row:>9.2f}{cost:>9.2f}")
+
+    if args.workers > 1:
+        scheduler = tiles.TileScheduler()
+        for frame in (1, 2):
+            c.render(w, workers=args.workers, tile_size=args.tile_size, scheduler=scheduler)
+            report = scheduler.report
+            print(
+                f"frame {frame}: {args.workers} workers, estimates from {report['source']}, "
+                f"pre-pass {report['prepass_time']:.2f} s, frame {report['frame_time']:.2f} s, "
+                f"utilisation {report['utilisation']:.2f}"
+            )
+            for entry in report["workers"]:
+                print(
+                    f"    worker {entry['worker']}: {entry['tiles']} tiles, "
+                    f"busy {entry['busy']:.2f} s, utilisation {entry['utilisation']:.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
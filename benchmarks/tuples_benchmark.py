@@ -0,0 +1,74 @@
+"""
+Micro-benchmark for the Tuple/Point/Vector/Color arithmetic.
+
+Runs the same operations against the original generator-based module
+(legacy_tuples.py) and the current slotted implementation and prints the
+operations per second of each.
+"""
+
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import timeit
+import legacy_tuples
+import ray_tracing.elements.tuples as tuples
+
+NUMBER = 100000
+
+OPERATIONS = {
+    "point + vector": "p + v",
+    "point - point": "p - q",
+    "vector - vector": "v - u",
+    "vector * scalar": "v * 2.5",
+    "vector.dot": "v.dot(u)",
+    "vector.cross": "v.cross(u)",
+    "vector.normalize": "v.normalize()",
+    "vector.reflect": "v.reflect(n)",
+    "color + color": "c + d",
+    "color * color": "c * d",
+    "color * scalar": "c * 0.5",
+    "point(x, y, z)": "Point(1.0, 2.0, 3.0)",
+}
+
+
+def setup_namespace(module):
+    """
+    Build the operands used by every timed statement.
+    """
+    return {
+        "Point": module.Point,
+        "p": module.Point(1.0, 2.0, 3.0),
+        "q": module.Point(-2.0, 0.5, 4.0),
+        "v": module.Vector(0.5, -1.0, 2.0),
+        "u": module.Vector(1.0, 1.0, -0.5),
+        "n": module.Vector(0.0, 1.0, 0.0),
+        "c": module.Color(0.9, 0.2, 0.4),
+        "d": module.Color(0.1, 0.8, 0.6),
+    }
+
+
+def ops_per_second(statement, namespace, number=NUMBER):
+    """
+    Returns the best-of-three throughput of a statement.
+    """
+    timer = timeit.Timer(statement, globals=namespace)
+    best = min(timer.repeat(repeat=3, number=number))
+    return number / best
+
+
+def main():
+    before = setup_namespace(legacy_tuples)
+    after = setup_namespace(tuples)
+    print(f"{'operation':<20}{'before ops/s':>16}{'after ops/s':>16}{'speedup':>10}")
+    for name, statement in OPERATIONS.items():
+        old = ops_per_second(statement, before)
+        new = ops_per_second(statement, after)
+        print(f"{name:<20}{old:>16,.0f}{new:>16,.0f}{new / old:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,10 @@ import ray_tracing.elements.matrix as matrix
 import ray_tracing.elements as elements
 
 
-def main():
+def build_scene(hsize=200, vsize=100):
+    """
+    Builds the example camera and world.
+    """
     floor = shapes.Sphere()
     floor.transform = matrix.ScalingMatrix(10, 0.01, 10)
     floor.material = materials.Material(color=tuples.Color(1, 0.9, 0.9), specular=0)
@@ -69,12 +72,17 @@ def main():
         [lights.PointLight(tuples.Point(10, 10, -10), tuples.Color(0.5, 0.5, 0.5))]
     )
 
-    cam = camera.Camera(200, 100, math.pi / 3)
+    cam = camera.Camera(hsize, vsize, math.pi / 3)
     from_point = tuples.Point(0, 1.5, -5)
     to_point = tuples.Point(0, 1, 0)
     up_vector = tuples.Vector(0.4, 0.5, 0.1)
     cam.transform = camera.view_transform(from_point, to_point, up_vector)
 
+    return cam, w
+
+
+def main():
+    cam, w = build_scene()
     image = cam.render(w)
     image.save_to_file("./camera_render.ppm")
 
@@ -0,0 +1,74 @@
+"""
+Renders the camera_render scene on workers connected over TCP.
+
+Run a coordinator, which also starts --local workers on this machine:
+
+    python example/distributed_render.py --port 5000 --local 2
+
+To let workers on other machines connect, listen on a public address and
+share a secret key with them:
+
+    export RAY_TRACING_AUTHKEY=<secret>
+    python example/distributed_render.py --host 0.0.0.0 --port 5000 --local 2
+
+and on the other machines, with the same RAY_TRACING_AUTHKEY:
+
+    python example/distributed_render.py --worker COORDINATOR_HOST --port 5000
+
+The coordinator and its workers exchange pickles, which can run code when
+they are loaded, so anyone who knows the key can run code on all of them.
+Each connection must prove that it knows the key before anything is
+unpickled, but the traffic is not encrypted: on a network that others can
+watch, tunnel the port (e.g. over SSH). --authkey also sets the key, but
+command lines are visible to the other users of a machine.
+"""
+
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import argparse
+import ray_tracing.scene.distributed as distributed
+from camera_render import build_scene
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--worker", metavar="COORDINATOR_HOST")
+    parser.add_argument("--local", type=int, default=os.cpu_count())
+    parser.add_argument("--wait-for", type=int, default=None)
+    parser.add_argument("--engine", default="wavefront")
+    parser.add_argument("--authkey", default=os.environ.get("RAY_TRACING_AUTHKEY"))
+    args = parser.parse_args()
+    authkey = args.authkey.encode() if args.authkey else None
+
+    if args.worker:
+        if authkey is None:
+            parser.error("workers need the coordinator's key (RAY_TRACING_AUTHKEY)")
+        rendered = distributed.run_worker(args.worker, args.port, authkey)
+        print(f"rendered {rendered} tiles")
+        return
+
+    cam, w = build_scene()
+    # without a key, only the local workers can connect
+    with distributed.Coordinator(args.host, args.port, authkey=authkey) as coordinator:
+        host, port = coordinator.address
+        print(f"coordinator listening on {host}:{port}")
+        workers = distributed.local_workers(
+            coordinator.address, args.local, coordinator.authkey
+        )
+        coordinator.wait_for_workers(args.wait_for or args.local)
+        image = coordinator.render(cam, w, engine=args.engine)
+    for worker in workers:
+        worker.join()
+    image.save_to_file("./camera_render.ppm")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,10 @@ import ray_tracing.elements as elements
 from ray_tracing.utils.constants import *
 
 
-def main():
+def build_scene(hsize=400, vsize=200):
+    """
+    Builds the example camera and world.
+    """
     floor = shapes.Plane()
     # floor.transform = matrix.TranslationMatrix(0, 0, 1)
     floor.material = materials.Material(color=tuples.Color(1, 0.9, 0.9), specular=0)
@@ -76,12 +79,17 @@ def main():
     #     [lights.PointLight(tuples.Point(10, 10, -10), tuples.Color(0.5, 0.5, 0.5))]
     # )
 
-    cam = camera.Camera(400, 200, math.pi / 3)
+    cam = camera.Camera(hsize, vsize, math.pi / 3)
     from_point = tuples.Point(0, 1.5, -5)
     to_point = tuples.Point(0, 1, 0)
     up_vector = tuples.Vector(0, 1, 0)
     cam.transform = camera.view_transform(from_point, to_point, up_vector)
 
+    return cam, w
+
+
+def main():
+    cam, w = build_scene()
     image = cam.render(w)
     image.save_to_file("./plane_render.ppm")
 
@@ -42,4 +42,161 @@ Feature: Matrices and Determinants
         And vector up ← vector(0, 1, 0)
         And camera c.transform ← view_transform(from, to, up)
         When camera image ← render(c, w)
-        Then pixel_at(image, 5, 5) = color(0.38066119308103435, 0.47582649135129296, 0.28549589481077575)
\ No newline at end of file
+        Then pixel_at(image, 5, 5) = color(0.38066119308103435, 0.47582649135129296, 0.28549589481077575)
+
+    Scenario: Generating the rays of a whole frame at once
+        Given camera c ← camera(11, 7, 1.5707963267948966)
+        When camera c.transform ← rotation_y(0.7853981633974483) * translation(0, -2, 5)
+        And camera rs ← rays_for_frame(c)
+        Then camera rs.count = 77
+        And camera rs matches ray_for_pixel(c, x, y) for every pixel
+    Scenario: Generating the rays of a pixel rectangle
+        Given camera c ← camera(201, 101, 1.5707963267948966)
+        When camera rs ← rays_for_region(c, 95, 45, 105, 55)
+        Then camera rs.count = 100
+        And camera rs matches ray_for_pixel(c, x, y) for every pixel
+
+    Scenario: The wavefront engine renders the same image as the scalar engine
+        Given world w ← default_world()
+        And camera c ← camera(21, 15, 1.5707963267948966)
+        And point from ← point(0, 0.5, -5)
+        And point to ← point(0, 0, 0)
+        And vector up ← vector(0, 1, 0)
+        And camera c.transform ← view_transform(from, to, up)
+        When camera image ← render(c, w)
+        And camera fast ← render(c, w) with the wavefront engine
+        Then camera image and fast have the same pixels
+
+    Scenario: The wavefront engine sees a material edited after a render
+        Given world w ← default_world()
+        And camera c ← camera(21, 15, 1.5707963267948966)
+        And point from ← point(0, 0.5, -5)
+        And point to ← point(0, 0, 0)
+        And vector up ← vector(0, 1, 0)
+        And camera c.transform ← view_transform(from, to, up)
+        When camera before ← render(c, w) with the wavefront engine
+        And camera the first object of w is painted color(1, 0, 0)
+        And camera image ← render(c, w)
+        And camera fast ← render(c, w) with the wavefront engine
+        Then camera image and fast have the same pixels
+        And camera before and fast differ
+
+    Scenario: The wavefront engine sees a light moved after a render
+        Given world w ← default_world()
+        And camera c ← camera(21, 15, 1.5707963267948966)
+        And point from ← point(0, 0.5, -5)
+        And point to ← point(0, 0, 0)
+        And vector up ← vector(0, 1, 0)
+        And camera c.transform ← view_transform(from, to, up)
+        When camera before ← render(c, w) with the wavefront engine
+        And camera the first light of w is moved to point(10, 10, -10)
+        And camera image ← render(c, w)
+        And camera fast ← render(c, w) with the wavefront engine
+        Then camera image and fast have the same pixels
+        And camera before and fast differ
+
+    Scenario: Splitting a frame into tiles
+        Given camera c ← camera(10, 7, 1.5707963267948966)
+        Then camera the 4 x 4 tiles of c are 6 tiles covering every pixel once
+
+    Scenario: Rendering tiles in worker processes gives the scalar image
+        Given world w ← default_world()
+        And camera c ← camera(21, 15, 1.5707963267948966)
+        And point from ← point(0, 0.5, -5)
+        And point to ← point(0, 0, 0)
+        And vector up ← vector(0, 1, 0)
+        And camera c.transform ← view_transform(from, to, up)
+        When camera image ← render(c, w)
+        And camera tiled ← render(c, w) with 3 workers and 4 x 4 tiles
+        Then camera image and tiled have exactly the same pixels
+
+    Scenario: Tiled wavefront renders do not depend on the number of workers
+        Given world w ← default_world()
+        And camera c ← camera(21, 15, 1.5707963267948966)
+        And point from ← point(0, 0.5, -5)
+        And point to ← point(0, 0, 0)
+        And vector up ← vector(0, 1, 0)
+        And camera c.transform ← view_transform(from, to, up)
+        When camera one ← render(c, w) with 1 workers and 8 x 8 tiles in the wavefront engine
+        And camera many ← render(c, w) with 4 workers and 8 x 8 tiles in the wavefront engine
+        Then camera one and many have exactly the same pixels
+
+    Scenario: Tiles sent back by the workers give the shared framebuffer image
+        Given world w ← default_world()
+        And camera c ← camera(21, 15, 1.5707963267948966)
+        And point from ← point(0, 0.5, -5)
+        And point to ← point(0, 0, 0)
+        And vector up ← vector(0, 1, 0)
+        And camera c.transform ← view_transform(from, to, up)
+        When camera shared ← render(c, w) with 2 workers and 4 x 4 tiles
+        And camera sent ← render(c, w) with 2 workers and 4 x 4 tiles sent back
+        Then camera shared and sent have exactly the same pixels
+
+    Scenario: Rendering tiles in threads gives the image of worker processes
+        Given world w ← default_world()
+        And camera c ← camera(21, 15, 1.5707963267948966)
+        And point from ← point(0, 0.5, -5)
+        And point to ← point(0, 0, 0)
+        And vector up ← vector(0, 1, 0)
+        And camera c.transform ← view_transform(from, to, up)
+        When camera processes ← render(c, w) with 3 workers and 4 x 4 tiles in the wavefront engine
+        And camera threads ← render(c, w) with 3 threads and 4 x 4 tiles in the wavefront engine
+        Then camera processes and threads have exactly the same pixels
+
+    Scenario: Rendering tiles in threads reports the utilisation of each thread
+        Given world w ← default_world()
+        And camera c ← camera(21, 15, 1.5707963267948966)
+        And camera scheduler ← tile_scheduler()
+        When camera image ← render(c, w) with 2 threads, 4 x 4 tiles and scheduler
+        Then camera scheduler reported 24 tiles over 2 workers
+
+    Scenario: A failing render thread stops the render
+        Given world w ← default_world()
+        And world w has an object that cannot be intersected
+        And camera c ← camera(11, 11, 1.5707963267948966)
+        Then camera rendering c, w with 2 threads fails
+
+    Scenario: A failing worker does not leak the shared framebuffer
+        Given world w ← default_world()
+        And world w has an object that cannot be intersected
+        And camera c ← camera(11, 11, 1.5707963267948966)
+        Then camera rendering c, w with 2 workers fails without leaking shared memory
+
+    Scenario: Tiles that hit objects are dispatched before empty ones
+        Given world w ← default_world()
+        And camera c ← camera(40, 40, 1.5707963267948966)
+        And point from ← point(0, 0, -5)
+        And point to ← point(0, 0, 0)
+        And vector up ← vector(0, 1, 0)
+        And camera c.transform ← view_transform(from, to, up)
+        And camera scheduler ← tile_scheduler() with a pre-pass stride of 2
+        When camera order ← the 10 x 10 tiles of c scheduled by scheduler for w
+        Then camera the first tile in order covers the center of c
+        And camera the last tile in order does not cover the center of c
+        And camera scheduler estimated its costs from the "prepass"
+
+    Scenario: The pre-pass samples tiles with the engine of the render
+        Given world w ← default_world()
+        And camera c ← camera(40, 40, 1.5707963267948966)
+        And point from ← point(0, 0, -5)
+        And point to ← point(0, 0, 0)
+        And vector up ← vector(0, 1, 0)
+        And camera c.transform ← view_transform(from, to, up)
+        And camera scheduler ← tile_scheduler() with a pre-pass stride of 2
+        When camera order ← the 10 x 10 tiles of c scheduled by scheduler for w in the wavefront engine
+        Then camera the first tile in order covers the center of c
+        And camera the last tile in order does not cover the center of c
+        And camera scheduler estimated its costs from the "prepass"
+
+    Scenario: Rendering with a scheduler reports the utilisation of each worker
+        Given world w ← default_world()
+        And camera c ← camera(21, 15, 1.5707963267948966)
+        And point from ← point(0, 0.5, -5)
+        And point to ← point(0, 0, 0)
+        And vector up ← vector(0, 1, 0)
+        And camera c.transform ← view_transform(from, to, up)
+        And camera scheduler ← tile_scheduler()
+        When camera image ← render(c, w) with 2 workers, 4 x 4 tiles and scheduler
+        Then camera scheduler reported 24 tiles over 2 workers
+        When camera image ← render(c, w) with 2 workers, 4 x 4 tiles and scheduler
+        Then camera scheduler estimated its costs from the "previous frame"
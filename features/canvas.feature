@@ -52,4 +52,21 @@ Feature: Canvas
     Scenario: PPM files are terminated by a newline character
         Given can ← canvas(5, 3)
         When ppm ← canvas_to_ppm(can)
-        Then ppm ends with a newline character
\ No newline at end of file
+        Then ppm ends with a newline character
+    Scenario: Writing a tile into a shared canvas
+        Given shared ← shared_canvas(10, 20)
+        When write_tile(shared, 2, 3, 4, 5) with color(1, 0.5, 0)
+        Then pixel_at(shared, 3, 4) = color(1, 0.5, 0)
+        And pixel_at(shared, 4, 4) = color(0, 0, 0)
+        And every pixel of shared seen through a second mapping matches
+
+    Scenario: Converting a shared canvas to a canvas
+        Given shared ← shared_canvas(5, 3)
+        When write_tile(shared, 0, 0, 5, 3) with color(0.25, 0.5, 1)
+        And can ← canvas of shared
+        Then every pixel of can is color(0.25, 0.5, 1)
+
+    Scenario: Closing a shared canvas removes its memory block
+        Given shared ← shared_canvas(5, 3)
+        When shared is closed
+        Then the memory block of shared can no longer be attached
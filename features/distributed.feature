@@ -0,0 +1,56 @@
+Feature: Distributed rendering
+
+    Background:
+        Given world w ← default_world()
+        And camera c ← camera(21, 15, 1.5707963267948966)
+        And point from ← point(0, 0.5, -5)
+        And point to ← point(0, 0, 0)
+        And vector up ← vector(0, 1, 0)
+        And camera c.transform ← view_transform(from, to, up)
+
+    Scenario: Workers connected over TCP render the image of a local render
+        Given distributed coordinator with 2 local workers
+        When camera image ← render(c, w)
+        And distributed remote ← render(c, w) on the workers with 4 x 4 tiles
+        Then camera image and remote have exactly the same pixels
+
+    Scenario: Workers cache the scene by a hash of its content
+        Given distributed coordinator with 2 local workers
+        When distributed first ← render(c, w) on the workers with 4 x 4 tiles
+        Then distributed the coordinator has sent 2 scenes
+        When distributed second ← render(c, w) on the workers with 4 x 4 tiles
+        Then distributed the coordinator has sent 2 scenes
+        And camera first and second have exactly the same pixels
+
+    Scenario: The scene digest depends on the content of the scene only
+        Given distributed digest ← scene_digest(c, w)
+        When camera image ← render(c, w)
+        Then distributed scene_digest(c, w) = digest
+        And distributed scene_digest of a pickled copy of c, w = digest
+        When world the first object of w is moved by translation(0, 1, 0)
+        Then distributed scene_digest(c, w) != digest
+
+    Scenario: A tile held by a worker that does not answer is re-queued
+        Given distributed coordinator with a tile timeout of 0.5 seconds
+        And distributed a worker that never answers
+        And distributed 1 local worker
+        When camera image ← render(c, w)
+        And distributed remote ← render(c, w) on the workers with 4 x 4 tiles
+        Then camera image and remote have exactly the same pixels
+        And distributed the coordinator re-queued at least 1 tile
+
+    Scenario: A worker without the coordinator's key is refused
+        Given distributed coordinator with 1 local worker
+        Then distributed a worker with the wrong authkey is refused
+        When camera image ← render(c, w)
+        And distributed remote ← render(c, w) on the workers with 4 x 4 tiles
+        Then camera image and remote have exactly the same pixels
+
+    Scenario: A failing tile stops a distributed render
+        Given world w has an object that cannot be intersected
+        And distributed coordinator with 1 local worker
+        Then distributed rendering c, w on the workers fails
+
+    Scenario: A scene that does not match its hash is not cached
+        Given distributed scene_cache ← scene_cache()
+        Then distributed caching a scene under the wrong hash fails
@@ -44,6 +44,34 @@ Feature: Intersections
         And intersections xs ← 4 intersections(i1, i2, i3, i4)
         When intersection i ← hit(xs)
         Then intersection i = i4
+    Scenario: Intersections built in bulk are sorted when read
+        Given sphere s ← sphere()
+        And intersections xs ← intersections of s at 5, -1, 2, 7
+        When intersection i ← hit(xs)
+        Then intersection i.t = 2
+        And intersections xs.count = 4
+        And intersections xs[0].t = -1
+        And intersections xs[3].t = 7
+        And intersections xs[1].shape = s
+    Scenario: The hit follows intersections added later
+        Given sphere s ← sphere()
+        And intersections xs ← intersections of s at 5, -1
+        And intersection i1 ← intersection(0.5, s)
+        When intersections add(xs, i1)
+        And intersection i ← hit(xs)
+        Then intersection i = i1
+        And intersections xs.count = 3
+    Scenario: Merging collections of intersections
+        Given sphere s1 ← sphere()
+        And sphere s2 ← sphere()
+        And intersections xs ← intersections of s1 at 4, 6
+        And intersections ys ← intersections of s2 at -1, 3
+        When intersections xs += ys
+        And intersection i ← hit(xs)
+        Then intersection i.t = 3
+        And intersections xs.count = 4
+        And intersections xs[2].shape = s1
+        And intersections xs[1].shape = s2
 
     Scenario: Precomputing the state of an intersection
         Given ray r ← ray(point(0, 0, -5), vector(0, 0, 1))
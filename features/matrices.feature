@@ -264,4 +264,64 @@ Feature: Matrices and Determinants
             | 5  | 8 | 16 | 7 |
         When matrix B ← transpose(inverse(A))
         And matrix C ← inverse(transpose(A))
-        Then matrix B == C
\ No newline at end of file
+        Then matrix B == C
+
+    Scenario: Calculating the inverse of an affine matrix
+        Given the following 4x4 matrix A:
+            | 2 | 0 | 0  | 3  |
+            | 0 | 0 | -4 | 1  |
+            | 0 | 5 | 0  | -2 |
+            | 0 | 0 | 0  | 1  |
+        Then determinant(A) = 40
+        And inverse(A) is the following 4x4 matrix:
+            | 0.5 | 0     | 0   | -1.5 |
+            | 0   | 0     | 0.2 | 0.4  |
+            | 0   | -0.25 | 0   | 0.25 |
+            | 0   | 0     | 0   | 1    |
+
+    Scenario: Calculating the determinant and inverse of a 5x5 matrix
+        Given the following 5x5 matrix A:
+            | 2 | -1 | 0  | 3  | 1  |
+            | 1 | 3  | 2  | 0  | -2 |
+            | 0 | 4  | -1 | 1  | 2  |
+            | 5 | 0  | 1  | -2 | 1  |
+            | 1 | 1  | 1  | 1  | 1  |
+        When matrix C ← matrix A * matrix inverse(A)
+        Then determinant(A) = 358
+        And matrix C = identity_matrix(5)
+
+    Scenario: Matrices with the same entries share a hash
+        Given the following matrix A:
+            | 1 | 2 | 3 | 4 |
+            | 5 | 6 | 7 | 8 |
+            | 9 | 8 | 7 | 6 |
+            | 5 | 4 | 3 | 2 |
+        And the following matrix B:
+            | 1 | 2 | 3 | 4 |
+            | 5 | 6 | 7 | 8 |
+            | 9 | 8 | 7 | 6 |
+            | 5 | 4 | 3 | 2 |
+        Then matrix A == B
+        And hash(A) = hash(B)
+        And a dictionary keyed by A finds B
+
+    Scenario: Matrices within the tolerance are equal but are different keys
+        Given the following matrix A:
+            | 1 | 2 | 3 | 4 |
+            | 5 | 6 | 7 | 8 |
+            | 9 | 8 | 7 | 6 |
+            | 5 | 4 | 3 | 2 |
+        And the following matrix B:
+            | 1 | 2 | 3.000000001 | 4 |
+            | 5 | 6 | 7           | 8 |
+            | 9 | 8 | 7           | 6 |
+            | 5 | 4 | 3           | 2 |
+        Then matrix A == B
+        And a dictionary keyed by A does not find B
+
+    Scenario: A matrix cannot be modified after construction
+        Given the following matrix A:
+            | 1 | 2 |
+            | 3 | 4 |
+        Then assigning A[0,0] ← 5 raises an error
+        And A[0,0] = 1
@@ -33,4 +33,26 @@ Feature: Planes
         When plane xs ← local_intersect(p, r)
         Then plane xs.count = 1
         And plane xs[0].t = 1
-        And plane xs[0].object = p
\ No newline at end of file
+        And plane xs[0].object = p
+
+    Scenario: Intersecting a plane with a batch of rays
+        Given plane p ← plane()
+        And batch b ← ray_batch of:
+            | 0 | 10 | 0 | 0 | 0         | 1 |
+            | 0 | 0  | 0 | 0 | 0         | 1 |
+            | 0 | 1  | 0 | 0 | -1        | 0 |
+            | 0 | -1 | 0 | 0 | 1         | 0 |
+            | 0 | 1  | 0 | 0 | 0.0000001 | 1 |
+            | 2 | 3  | 1 | 0 | -0.5      | 1 |
+        When batch xs ← local_intersect_batch(p, b)
+        Then batch xs agrees with local_intersect(p, ray) for every ray in b
+    Scenario: Intersecting a transformed plane with a batch of rays
+        Given plane p ← plane()
+        And transformation m ← translation(0, 2, 0)
+        And plane set_transform(p, m)
+        And batch b ← ray_batch of:
+            | 0 | 10 | 0 | 0 | -1 | 0 |
+            | 0 | 0  | 0 | 0 | 1  | 1 |
+            | 0 | 0  | 0 | 1 | 0  | 0 |
+        When batch xs ← intersect_batch(p, b)
+        Then batch xs agrees with intersect(p, ray) for every ray in b
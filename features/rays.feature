@@ -26,3 +26,26 @@ Feature: Rays
         When ray r2 ← transform(r, m)
         Then ray r2.origin = point(2, 6, 12)
         And ray r2.direction = vector(0, 3, 0)
+
+    Scenario: Packing rays into a batch and back
+        Given ray r1 ← ray(point(1, 2, 3), vector(0, 1, 0))
+        And ray r2 ← ray(point(2, 3, 4), vector(1, 0, 0))
+        When batch b ← ray_batch(r1, r2)
+        Then batch b.count = 2
+        And batch b[1] = r2
+        And batch b unpacks to r1, r2
+    Scenario: Computing positions along a batch of rays
+        Given ray r1 ← ray(point(1, 2, 3), vector(0, 1, 0))
+        And ray r2 ← ray(point(2, 3, 4), vector(1, 0, 0))
+        When batch b ← ray_batch(r1, r2)
+        Then batch position(b, 2.5) matches position(r1, 2.5), position(r2, 2.5)
+    Scenario: Transforming a batch of rays
+        Given ray r1 ← ray(point(1, 2, 3), vector(0, 1, 0))
+        And ray r2 ← ray(point(2, 3, 4), vector(1, 0, 0))
+        And transformation m ← translation(3, 4, 5)
+        And transformation s ← scaling(2, 3, 4)
+        When batch b ← ray_batch(r1, r2)
+        And batch bt ← transform(b, m)
+        And batch bs ← transform(b, s)
+        Then batch bt unpacks to transform(r1, m), transform(r2, m)
+        And batch bs unpacks to transform(r1, s), transform(r2, s)
@@ -41,4 +41,56 @@ Feature: Shape
         And shape m ← scaling(1, 0.5, 1) * rotation_z(0.6283185307179586)
         When shape set_transform(s, m)
         And normal n ← normal_at(s, point(0, 0.7071067811865476, -0.7071067811865476))
-        Then normal n = vector(0, 0.97014, -0.24254)
\ No newline at end of file
+        Then normal n = vector(0, 0.97014, -0.24254)
+
+    Scenario: A shape with only a scalar intersection intersects batches of rays
+        Given shape s ← scalar_only_sphere()
+        When shape set_transform(s, translation(5, 0, 0))
+        Then shape s intersects 7 x 7 rays from point(5, 0, -5) in a batch as one at a time
+
+    Scenario: A shape with only scalar methods renders in the wavefront engine
+        Given world w ← default_world()
+        And shape the first object of w is replaced by a scalar_only_sphere()
+        And camera c ← camera(21, 15, 1.5707963267948966)
+        And point from ← point(0, 0.5, -5)
+        And point to ← point(0, 0, 0)
+        And vector up ← vector(0, 1, 0)
+        And camera c.transform ← view_transform(from, to, up)
+        When camera image ← render(c, w)
+        And camera fast ← render(c, w) with the wavefront engine
+        Then camera image and fast have the same pixels
+
+    Scenario: Translating a shape composes onto its transform
+        Given shape s ← test_shape()
+        When shape translate(s, 2, 3, 4)
+        Then shape s.transform = translation(2, 3, 4)
+    Scenario: The inverse transform is computed once per transform change
+        Given shape s ← test_shape()
+        And ray r ← ray(point(0, 0, -5), vector(0, 0, 1))
+        When shape set_transform(s, scaling(2, 2, 2))
+        And shape s is intersected with r 10 times
+        And normal n ← normal_at(s, point(0, 1, 0))
+        Then shape s.inversion_count = 1
+        When shape set_transform(s, translation(5, 0, 0))
+        And shape s is intersected with r 10 times
+        Then shape s.inversion_count = 2
+        And shape s.saved_ray.origin = point(-5, 0, -5)
+
+    Scenario: A shape without a known extent is unbounded
+        Given shape s ← test_shape()
+        Then shape s.world_bounds is unbounded
+    Scenario: The bounds of a sphere follow its transform
+        Given sphere s ← sphere()
+        When shape set_transform(s, scaling(2, 2, 2))
+        Then shape s.world_bounds = box((-2, -2, -2), (2, 2, 2))
+        When shape set_transform(s, translation(5, 0, 0))
+        Then shape s.world_bounds = box((4, -1, -1), (6, 1, 1))
+    Scenario: A plane is unbounded
+        Given plane p ← plane()
+        Then shape p.world_bounds is unbounded
+    Scenario: A ray missing the bounds is rejected before the transform is inverted
+        Given sphere s ← sphere()
+        And ray r ← ray(point(0, 5, -5), vector(0, 0, 1))
+        When shape set_transform(s, scaling(2, 2, 2))
+        And shape s is intersected with r 10 times
+        Then shape s.inversion_count = 0
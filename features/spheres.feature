@@ -114,3 +114,25 @@ Feature: Spheres
         And material m.ambient ← 1
         When sphere s.material ← m
         Then sphere s.material = m
+
+    Scenario: Intersecting a sphere with a batch of rays
+        Given sphere s ← sphere()
+        And batch b ← ray_batch of:
+            | 0 | 0 | -5 | 0 | 0 | 1 |
+            | 0 | 1 | -5 | 0 | 0 | 1 |
+            | 0 | 2 | -5 | 0 | 0 | 1 |
+            | 0 | 0 | 0  | 0 | 0 | 1 |
+            | 0 | 0 | 5  | 0 | 0 | 1 |
+        When batch xs ← local_intersect_batch(s, b)
+        Then batch xs agrees with local_intersect(s, ray) for every ray in b
+    Scenario: Intersecting a transformed sphere with a batch of rays
+        Given sphere s ← sphere()
+        And transformation m ← scaling(2, 2, 2)
+        And sphere set_transform(s, m)
+        And batch b ← ray_batch of:
+            | 0 | 0   | -5 | 0   | 0 | 1 |
+            | 0 | 1.5 | -5 | 0   | 0 | 1 |
+            | 5 | 0   | -5 | 0   | 0 | 1 |
+            | 0 | 0   | 0  | 0.6 | 0 | 0.8 |
+        When batch xs ← intersect_batch(s, b)
+        Then batch xs agrees with intersect(s, ray) for every ray in b
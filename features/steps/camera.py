@@ -1,6 +1,7 @@
 import os
 import sys
 import math
+import numpy as np
 
 package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 package_path = os.path.abspath(os.path.join(package_path, ".."))
@@ -10,6 +11,8 @@ import ray_tracing.elements.matrix as matrix
 
 # import ray_tracing.elements.tuples as tuples
 import ray_tracing.scene.camera as camera
+import ray_tracing.scene.tiles as tiles
+import ray_tracing.elements.shapes as shapes
 from ray_tracing.utils.constants import *
 import ray_tracing.utils.utils as utils
 from behave import given, when, then
@@ -119,3 +122,251 @@ def step_impl(context, image, c, w):
     c = getattr(context, c)
     w = getattr(context, w)
     setattr(context, image, c.render(w))
+
+
+# batched primary rays
+@when("camera {rs} ← rays_for_frame({c})")
+def step_impl(context, rs, c):
+    c = getattr(context, c)
+    setattr(context, rs, c.rays_for_frame())
+
+
+@when("camera {rs} ← rays_for_region({c}, {x_start}, {y_start}, {x_end}, {y_end})")
+def step_impl(context, rs, c, x_start, y_start, x_end, y_end):
+    c = getattr(context, c)
+    batch = c.rays_for_region(int(x_start), int(y_start), int(x_end), int(y_end))
+    setattr(context, rs, batch)
+
+
+@then("camera {rs}.count = {count}")
+def step_impl(context, rs, count):
+    assert len(getattr(context, rs)) == int(count)
+
+
+@then("camera {rs} matches ray_for_pixel({c}, x, y) for every pixel")
+def step_impl(context, rs, c):
+    batch = getattr(context, rs)
+    c = getattr(context, c)
+    for index, (px, py) in enumerate(batch.pixels.tolist()):
+        expected = c.ray_for_pixel(px, py)
+        ray = batch[index]
+        assert ray.origin == expected.origin
+        assert ray.direction == expected.direction
+
+
+# wavefront engine
+@when("camera {image} ← render({c}, {w}) with the wavefront engine")
+def step_impl(context, image, c, w):
+    c = getattr(context, c)
+    w = getattr(context, w)
+    setattr(context, image, c.render(w, engine="wavefront"))
+
+
+@then("camera {image1} and {image2} have the same pixels")
+def step_impl(context, image1, image2):
+    image1 = getattr(context, image1)
+    image2 = getattr(context, image2)
+    assert (image1.width, image1.height) == (image2.width, image2.height)
+    for y in range(image1.height):
+        for x in range(image1.width):
+            for i in range(3):
+                assert utils.equal(image1.pixel_at(x, y)[i], image2.pixel_at(x, y)[i])
+
+
+# tiled rendering
+@then("camera the {n} x {n} tiles of {c} are {count} tiles covering every pixel once")
+def step_impl(context, n, c, count):
+    c = getattr(context, c)
+    tile_list = tiles.split_tiles(c.hsize, c.vsize, int(n))
+    assert len(tile_list) == int(count)
+    covered = np.concatenate([tiles.tile_pixels(tile) for tile in tile_list])
+    assert len(covered) == c.hsize * c.vsize
+    assert len(set(map(tuple, covered.tolist()))) == c.hsize * c.vsize
+
+
+@when("camera {image} ← render({c}, {w}) with {workers} workers and {n} x {n} tiles")
+def step_impl(context, image, c, w, workers, n):
+    c = getattr(context, c)
+    w = getattr(context, w)
+    setattr(context, image, c.render(w, workers=int(workers), tile_size=int(n)))
+
+
+@when(
+    "camera {image} ← render({c}, {w}) with {workers} workers and {n} x {n} tiles in the wavefront engine"
+)
+def step_impl(context, image, c, w, workers, n):
+    c = getattr(context, c)
+    w = getattr(context, w)
+    result = c.render(w, engine="wavefront", workers=int(workers), tile_size=int(n))
+    setattr(context, image, result)
+
+
+@then("camera {image1} and {image2} differ")
+def step_impl(context, image1, image2):
+    image1 = getattr(context, image1)
+    image2 = getattr(context, image2)
+    assert any(
+        not utils.equal(image1.pixel_at(x, y)[i], image2.pixel_at(x, y)[i])
+        for y in range(image1.height)
+        for x in range(image1.width)
+        for i in range(3)
+    )
+
+
+@when("camera the first object of {w} is painted color({r}, {g}, {b})")
+def step_impl(context, w, r, g, b):
+    obj = getattr(context, w).objects[0]
+    obj.material.color = tuples.Color(float(r), float(g), float(b))
+
+
+@when("camera the first light of {w} is moved to point({x}, {y}, {z})")
+def step_impl(context, w, x, y, z):
+    light = getattr(context, w).lights[0]
+    light.position = tuples.Point(float(x), float(y), float(z))
+
+
+@then("camera {image1} and {image2} have exactly the same pixels")
+def step_impl(context, image1, image2):
+    image1 = getattr(context, image1)
+    image2 = getattr(context, image2)
+    assert (image1.width, image1.height) == (image2.width, image2.height)
+    for row1, row2 in zip(image1.pixels, image2.pixels):
+        assert [tuple(p) for p in row1] == [tuple(p) for p in row2]
+
+
+@when(
+    "camera {image} ← render({c}, {w}) with {threads} threads and {n} x {n} tiles in the wavefront engine"
+)
+def step_impl(context, image, c, w, threads, n):
+    c = getattr(context, c)
+    w = getattr(context, w)
+    result = c.render(
+        w, engine="wavefront", workers=int(threads), tile_size=int(n), executor="threads"
+    )
+    setattr(context, image, result)
+
+
+@when("camera {image} ← render({c}, {w}) with {workers} workers and {n} x {n} tiles sent back")
+def step_impl(context, image, c, w, workers, n):
+    c = getattr(context, c)
+    w = getattr(context, w)
+    result = tiles.render_tiles(c, w, int(workers), int(n), shared=False)
+    setattr(context, image, result)
+
+
+@given("world {w} has an object that cannot be intersected")
+def step_impl(context, w):
+    # the base Shape has no local_intersect
+    getattr(context, w).add_object(shapes.Shape())
+
+
+@then("camera rendering {c}, {w} with {workers} workers fails without leaking shared memory")
+def step_impl(context, c, w, workers):
+    c = getattr(context, c)
+    w = getattr(context, w)
+    blocks = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+    try:
+        c.render(w, workers=int(workers), tile_size=4)
+    except Exception:
+        pass
+    else:
+        raise AssertionError("the render did not fail")
+    if os.path.isdir("/dev/shm"):
+        assert set(os.listdir("/dev/shm")) <= blocks
+
+
+@then("camera rendering {c}, {w} with {threads} threads fails")
+def step_impl(context, c, w, threads):
+    c = getattr(context, c)
+    w = getattr(context, w)
+    try:
+        c.render(w, workers=int(threads), tile_size=4, executor="threads")
+    except Exception:
+        pass
+    else:
+        raise AssertionError("the render did not fail")
+
+
+# tile scheduling
+@given("camera {s} ← tile_scheduler()")
+def step_impl(context, s):
+    setattr(context, s, tiles.TileScheduler())
+
+
+@given("camera {s} ← tile_scheduler() with a pre-pass stride of {stride}")
+def step_impl(context, s, stride):
+    setattr(context, s, tiles.TileScheduler(stride=int(stride)))
+
+
+# defined first, since the pattern below also matches these steps
+@when(
+    "camera {order} ← the {n} x {n} tiles of {c} scheduled by {s} for {w} in the wavefront engine"
+)
+def step_impl(context, order, n, c, s, w):
+    c = getattr(context, c)
+    tile_list = tiles.split_tiles(c.hsize, c.vsize, int(n))
+    scheduled = getattr(context, s).schedule(
+        c, getattr(context, w), tile_list, "wavefront"
+    )
+    assert sorted(scheduled) == sorted(tile_list)
+    setattr(context, order, scheduled)
+
+
+@when("camera {order} ← the {n} x {n} tiles of {c} scheduled by {s} for {w}")
+def step_impl(context, order, n, c, s, w):
+    c = getattr(context, c)
+    tile_list = tiles.split_tiles(c.hsize, c.vsize, int(n))
+    scheduled = getattr(context, s).schedule(c, getattr(context, w), tile_list)
+    assert sorted(scheduled) == sorted(tile_list)
+    setattr(context, order, scheduled)
+
+
+@then("camera the first tile in {order} covers the center of {c}")
+def step_impl(context, order, c):
+    c = getattr(context, c)
+    x_start, y_start, x_end, y_end = getattr(context, order)[0]
+    assert x_start <= c.hsize // 2 <= x_end and y_start <= c.vsize // 2 <= y_end
+
+
+@then("camera the last tile in {order} does not cover the center of {c}")
+def step_impl(context, order, c):
+    c = getattr(context, c)
+    x_start, y_start, x_end, y_end = getattr(context, order)[-1]
+    assert not (x_start <= c.hsize // 2 <= x_end and y_start <= c.vsize // 2 <= y_end)
+
+
+@then('camera {s} estimated its costs from the "{source}"')
+def step_impl(context, s, source):
+    assert getattr(context, s).source == source
+
+
+@when("camera {image} ← render({c}, {w}) with {workers} workers, {n} x {n} tiles and {s}")
+def step_impl(context, image, c, w, workers, n, s):
+    c = getattr(context, c)
+    w = getattr(context, w)
+    scheduler = getattr(context, s)
+    result = c.render(w, workers=int(workers), tile_size=int(n), scheduler=scheduler)
+    setattr(context, image, result)
+
+
+@then("camera {s} reported {count} tiles over {workers} workers")
+def step_impl(context, s, count, workers):
+    report = getattr(context, s).report
+    assert report["tiles"] == int(count)
+    assert 1 <= len(report["workers"]) <= int(workers)
+    assert sum(entry["tiles"] for entry in report["workers"]) == int(count)
+    assert report["frame_time"] == report["prepass_time"] + report["wall_time"]
+    for entry in report["workers"]:
+        assert 0 < entry["utilisation"] <= 1
+    assert 0 < report["utilisation"] <= 1
+
+
+@when("camera {image} ← render({c}, {w}) with {threads} threads, {n} x {n} tiles and {s}")
+def step_impl(context, image, c, w, threads, n, s):
+    c = getattr(context, c)
+    w = getattr(context, w)
+    scheduler = getattr(context, s)
+    result = c.render(
+        w, workers=int(threads), tile_size=int(n), scheduler=scheduler, executor="threads"
+    )
+    setattr(context, image, result)
@@ -1,6 +1,7 @@
 import os
 import sys
 import math
+import numpy as np
 
 package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 package_path = os.path.abspath(os.path.join(package_path, ".."))
@@ -88,3 +89,46 @@ def step_impl(context, r, g, b):
 @then("ppm ends with a newline character")
 def step_impl(context):
     assert context.ppm[-1] == "\n"
+
+
+# shared canvas
+@given("shared ← shared_canvas({width}, {height})")
+def step_impl(context, width, height):
+    context.shared = canvas.SharedCanvas(int(width), int(height))
+    context.add_cleanup(context.shared.close)
+
+
+@when("write_tile(shared, {x_start}, {y_start}, {x_end}, {y_end}) with color({r}, {g}, {b})")
+def step_impl(context, x_start, y_start, x_end, y_end, r, g, b):
+    tile = (int(x_start), int(y_start), int(x_end), int(y_end))
+    count = (tile[2] - tile[0]) * (tile[3] - tile[1])
+    colors = np.tile([float(r), float(g), float(b)], (count, 1))
+    context.shared.write_tile(tile, colors)
+
+
+@then("every pixel of shared seen through a second mapping matches")
+def step_impl(context):
+    shared = context.shared
+    with canvas.SharedCanvas.attach(shared.name, shared.width, shared.height) as view:
+        assert not view.owner
+        assert np.array_equal(view.colors, shared.colors)
+
+
+@when("can ← canvas of shared")
+def step_impl(context):
+    context.can = context.shared.to_canvas()
+
+
+@when("shared is closed")
+def step_impl(context):
+    context.shared.close()
+
+
+@then("the memory block of shared can no longer be attached")
+def step_impl(context):
+    shared = context.shared
+    try:
+        canvas.SharedCanvas.attach(shared.name, shared.width, shared.height)
+    except FileNotFoundError:
+        return
+    raise AssertionError("the shared memory block still exists")
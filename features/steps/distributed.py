@@ -0,0 +1,160 @@
+import os
+import sys
+import math
+import multiprocessing
+import pickle
+import socket
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+package_path = os.path.abspath(os.path.join(package_path, ".."))
+sys.path.insert(0, package_path)
+
+import ray_tracing.scene.distributed as distributed
+import ray_tracing.scene.tiles as tiles
+import ray_tracing.scene.world as world
+from behave import given, when, then
+
+
+def start_coordinator(context, timeout=distributed.TILE_TIMEOUT):
+    coordinator = distributed.Coordinator(timeout=timeout)
+    context.coordinator = coordinator
+    context.worker_processes = []
+    context.expected_workers = 0
+    context.add_cleanup(stop_coordinator, context)
+    return coordinator
+
+
+def stop_coordinator(context):
+    # closing the coordinator disconnects the workers, which then exit
+    context.coordinator.close()
+    for process in context.worker_processes:
+        process.join(10)
+        assert process.exitcode == 0
+
+
+def start_local_workers(context, count):
+    coordinator = context.coordinator
+    processes = distributed.local_workers(
+        coordinator.address, count, coordinator.authkey
+    )
+    context.worker_processes += processes
+    context.expected_workers += count
+    assert context.coordinator.wait_for_workers(context.expected_workers, 30)
+
+
+# coordinators and workers
+@given("distributed coordinator with {count:d} local workers")
+@given("distributed coordinator with {count:d} local worker")
+def step_impl(context, count):
+    start_coordinator(context)
+    start_local_workers(context, count)
+
+
+@given("distributed coordinator with a tile timeout of {timeout:g} seconds")
+def step_impl(context, timeout):
+    start_coordinator(context, timeout)
+
+
+@given("distributed {count:d} local worker")
+def step_impl(context, count):
+    start_local_workers(context, count)
+
+
+@given("distributed a worker that never answers")
+def step_impl(context):
+    silent = socket.create_connection(context.coordinator.address)
+    context.add_cleanup(silent.close)
+    distributed._authenticate_coordinator(silent, context.coordinator.authkey)
+    context.expected_workers += 1
+    assert context.coordinator.wait_for_workers(context.expected_workers, 30)
+
+
+@then("distributed a worker with the wrong authkey is refused")
+def step_impl(context):
+    host, port = context.coordinator.address
+    try:
+        distributed.run_worker(host, port, b"not the key")
+    except multiprocessing.AuthenticationError:
+        pass
+    else:
+        raise AssertionError("the worker was served")
+    assert context.coordinator.workers == context.expected_workers
+
+
+# rendering
+@when("distributed {image} ← render({c}, {w}) on the workers with {n} x {n} tiles")
+def step_impl(context, image, c, w, n):
+    c = getattr(context, c)
+    w = getattr(context, w)
+    setattr(context, image, context.coordinator.render(c, w, tile_size=int(n)))
+
+
+@then("distributed rendering {c}, {w} on the workers fails")
+def step_impl(context, c, w):
+    c = getattr(context, c)
+    w = getattr(context, w)
+    # row order skips the cost pre-pass, which would fail here rather than on a worker
+    scheduler = tiles.TileScheduler(order="row")
+    try:
+        context.coordinator.render(c, w, tile_size=4, scheduler=scheduler)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("the render did not fail")
+
+
+@then("distributed the coordinator has sent {count:d} scenes")
+def step_impl(context, count):
+    assert context.coordinator.scenes_sent == count
+
+
+@then("distributed the coordinator re-queued at least {count:d} tile")
+def step_impl(context, count):
+    assert context.coordinator.requeued >= count
+
+
+# scene digests
+@given("distributed {name} ← scene_digest({c}, {w})")
+def step_impl(context, name, c, w):
+    digest = distributed.scene_digest(getattr(context, c), getattr(context, w))
+    setattr(context, name, digest)
+
+
+@then("distributed scene_digest({c}, {w}) = {name}")
+def step_impl(context, c, w, name):
+    digest = distributed.scene_digest(getattr(context, c), getattr(context, w))
+    assert digest == getattr(context, name)
+
+
+@then("distributed scene_digest({c}, {w}) != {name}")
+def step_impl(context, c, w, name):
+    digest = distributed.scene_digest(getattr(context, c), getattr(context, w))
+    assert digest != getattr(context, name)
+
+
+@then("distributed scene_digest of a pickled copy of {c}, {w} = {name}")
+def step_impl(context, c, w, name):
+    copy = pickle.loads(pickle.dumps((getattr(context, c), getattr(context, w))))
+    assert distributed.scene_digest(*copy) == getattr(context, name)
+
+
+# scene cache
+@given("distributed {name} ← scene_cache()")
+def step_impl(context, name):
+    setattr(context, name, distributed.SceneCache())
+
+
+@then("distributed caching a scene under the wrong hash fails")
+def step_impl(context):
+    cache = context.scene_cache
+    data = pickle.dumps((context.c, context.w))
+    try:
+        cache.put(distributed.scene_digest(context.c, world.World()), data)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("the scene was cached")
+    assert len(cache) == 0
+    digest = distributed.scene_digest(context.c, context.w)
+    cache.put(digest, data)
+    assert digest in cache
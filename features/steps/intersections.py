@@ -85,6 +85,30 @@ def step_impl(context, xs, index, t):
     assert xs[index].t == t
 
 
+@given("intersections {xs} ← intersections of {s} at {ts}")
+def step_impl(context, xs, s, ts):
+    ts = [float(t) for t in ts.split(", ")]
+    shape = getattr(context, s)
+    setattr(context, xs, intersection.Intersections.from_ts(ts, shape))
+
+
+@when("intersections add({xs}, {interx})")
+def step_impl(context, xs, interx):
+    getattr(context, xs).add(getattr(context, interx))
+
+
+@when("intersections {xs} += {ys}")
+def step_impl(context, xs, ys):
+    collection = getattr(context, xs)
+    collection += getattr(context, ys)
+    setattr(context, xs, collection)
+
+
+@then("intersections {xs}[{index}].shape = {s}")
+def step_impl(context, xs, index, s):
+    assert getattr(context, xs)[int(index)].get_object() is getattr(context, s)
+
+
 # hit
 @when("intersection {interx} ← hit({xs})")
 def step_impl(context, interx, xs):
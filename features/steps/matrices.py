@@ -105,6 +105,12 @@ def step_impl(context, name):
     assert getattr(context, name) == m
 
 
+@then("matrix {name} = identity_matrix({size})")
+def step_impl(context, name, size):
+    m = matrix.IdentityMatrix(int(size))
+    assert getattr(context, name) == m
+
+
 # determinant of 2x2 matrix
 @then("determinant({name}) = {value}")
 def step_impl(context, name, value):
@@ -217,3 +223,30 @@ def step_impl(context, t, x, y, z):
 def step_impl(context, t, x, y, z):
     m = matrix.TranslationMatrix(float(x), float(y), float(z))
     assert getattr(context, t) == m
+
+
+# immutability and hashing
+@then("hash({name1}) = hash({name2})")
+def step_impl(context, name1, name2):
+    assert hash(getattr(context, name1)) == hash(getattr(context, name2))
+
+
+@then("a dictionary keyed by {name1} does not find {name2}")
+def step_impl(context, name1, name2):
+    # keys match exact entries, not entries within the tolerance
+    assert getattr(context, name2) not in {getattr(context, name1): name1}
+
+
+@then("a dictionary keyed by {name1} finds {name2}")
+def step_impl(context, name1, name2):
+    assert {getattr(context, name1): name1}[getattr(context, name2)] == name1
+
+
+@then("assigning {name}[{row},{column}] ← {value} raises an error")
+def step_impl(context, name, row, column, value):
+    m = getattr(context, name)
+    try:
+        m[int(row), int(column)] = float(value)
+    except TypeError:
+        return
+    assert False, "matrix accepted an assignment"
@@ -61,3 +61,9 @@ def step_impl(context, xs, index, p):
 def step_impl(context, xs):
     xs = getattr(context, xs)
     assert len(xs) == 0
+
+
+@given("plane set_transform({p}, {m})")
+def step_impl(context, p, m):
+    plane = getattr(context, p)
+    plane.set_transform(getattr(context, m))
@@ -1,6 +1,7 @@
 import os
 import sys
 import math
+import numpy as np
 
 package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 package_path = os.path.abspath(os.path.join(package_path, ".."))
@@ -78,3 +79,60 @@ def step_impl(context, name1, x1, y1, z1):
     y1 = float(y1)
     z1 = float(z1)
     assert ray.direction == tuples.Vector(x1, y1, z1)
+
+
+# ray batches
+@when("batch {name} ← ray_batch({r1}, {r2})")
+def step_impl(context, name, r1, r2):
+    ray_list = [getattr(context, r1), getattr(context, r2)]
+    setattr(context, name, rays.RayBatch.from_rays(ray_list))
+
+
+@when("batch {name2} ← transform({name1}, {m})")
+def step_impl(context, name2, name1, m):
+    batch = getattr(context, name1)
+    setattr(context, name2, batch.transform(getattr(context, m)))
+
+
+@then("batch {name}.count = {count}")
+def step_impl(context, name, count):
+    assert len(getattr(context, name)) == int(count)
+
+
+@then("batch {name}[{index}] = {r}")
+def step_impl(context, name, index, r):
+    batch = getattr(context, name)
+    assert batch[int(index)] == getattr(context, r)
+
+
+@then("batch {name} unpacks to transform({r1}, {m}), transform({r2}, {m2})")
+def step_impl(context, name, r1, m, r2, m2):
+    expected = [
+        getattr(context, r1).transform(getattr(context, m)),
+        getattr(context, r2).transform(getattr(context, m2)),
+    ]
+    assert getattr(context, name).to_rays() == expected
+
+
+@then("batch {name} unpacks to {r1}, {r2}")
+def step_impl(context, name, r1, r2):
+    expected = [getattr(context, r1), getattr(context, r2)]
+    assert getattr(context, name).to_rays() == expected
+
+
+@then("batch position({name}, {t}) matches position({r1}, {t1}), position({r2}, {t2})")
+def step_impl(context, name, t, r1, t1, r2, t2):
+    positions = getattr(context, name).position(float(t))
+    expected = [
+        getattr(context, r1).position(float(t1)),
+        getattr(context, r2).position(float(t2)),
+    ]
+    for position, point in zip(positions.tolist(), expected):
+        assert tuples.Point(*position) == point
+
+
+@given("batch {name} ← ray_batch of")
+def step_impl(context, name):
+    given_list = utils.matrix_text2list(context.table.headings, context.table.rows)
+    rows = np.array(given_list)
+    setattr(context, name, rays.RayBatch(rows[:, :3], rows[:, 3:]))
@@ -5,13 +5,27 @@ package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 package_path = os.path.abspath(os.path.join(package_path, ".."))
 sys.path.insert(0, package_path)
 
+import numpy as np
 import ray_tracing.elements.shapes as shapes
 import ray_tracing.elements.matrix as matrix
 import ray_tracing.elements.tuples as tuples
 from ray_tracing.utils.constants import *
+import ray_tracing.utils.utils as utils
+import ray_tracing.elements.rays as rays
 from behave import given, when, then
 
 
+class ScalarOnlySphere(shapes.Shape):
+    """
+    A sphere that implements only the scalar methods of a shape.
+    """
+
+    local_bounds = shapes.Sphere.local_bounds
+    local_intersect = shapes.Sphere.local_intersect
+    local_intersect_ts = shapes.Sphere.local_intersect_ts
+    local_normal_at = shapes.Sphere.local_normal_at
+
+
 # refactor
 @given("shape {s} ← test_shape()")
 def step_impl(context, s):
@@ -90,3 +104,91 @@ def step_impl(context, s, x, y, z):
 def step_impl(context, s, x, y, z):
     shape = getattr(context, s)
     assert shape.saved_ray.direction == tuples.Vector(float(x), float(y), float(z))
+
+
+@when("shape translate({s}, {x}, {y}, {z})")
+def step_impl(context, s, x, y, z):
+    shape = getattr(context, s)
+    shape.translate(float(x), float(y), float(z))
+
+
+@when("shape {s} is intersected with {r} {count} times")
+def step_impl(context, s, r, count):
+    shape = getattr(context, s)
+    ray = getattr(context, r)
+    for _ in range(int(count)):
+        shape.intersect(ray)
+
+
+@then("shape {s}.inversion_count = {count}")
+def step_impl(context, s, count):
+    shape = getattr(context, s)
+    assert shape.inversion_count == int(count)
+
+
+# batch intersections
+@when("batch {xs} ← {method}({s}, {b})")
+def step_impl(context, xs, method, s, b):
+    shape = getattr(context, s)
+    batch = getattr(context, b)
+    setattr(context, xs, getattr(shape, method)(batch))
+
+
+@then("batch {xs} agrees with {method}({s}, ray) for every ray in {b}")
+def step_impl(context, xs, method, s, b):
+    ts, hit = getattr(context, xs)
+    shape = getattr(context, s)
+    for index, ray in enumerate(getattr(context, b).to_rays()):
+        expected = sorted(i.t for i in getattr(shape, method)(ray))
+        assert bool(hit[index]) == (len(expected) > 0)
+        if expected:
+            results = sorted(ts[index][: len(expected)])
+            for value, expected_value in zip(results, expected):
+                assert utils.equal(value, expected_value)
+
+
+# bounds
+@then("shape {s}.world_bounds = box(({x1}, {y1}, {z1}), ({x2}, {y2}, {z2}))")
+def step_impl(context, s, x1, y1, z1, x2, y2, z2):
+    box = getattr(context, s).world_bounds()
+    expected = (float(x1), float(y1), float(z1), float(x2), float(y2), float(z2))
+    for value, expected_value in zip(box.minimum + box.maximum, expected):
+        assert utils.equal(value, expected_value)
+
+
+@then("shape {s}.world_bounds is unbounded")
+def step_impl(context, s):
+    assert not getattr(context, s).world_bounds().is_bounded()
+
+
+# shapes with only scalar methods
+@given("shape {s} ← scalar_only_sphere()")
+def step_impl(context, s):
+    setattr(context, s, ScalarOnlySphere())
+
+
+@then(
+    "shape {s} intersects {n} x {n} rays from point({x}, {y}, {z}) in a batch as one at a time"
+)
+def step_impl(context, s, n, x, y, z):
+    s = getattr(context, s)
+    origin = tuples.Point(float(x), float(y), float(z))
+    ray_list = [
+        rays.Ray(origin, tuples.Vector(u, v, 4).normalize())
+        for u in np.linspace(-1.5, 1.5, int(n))
+        for v in np.linspace(-1.5, 1.5, int(n))
+    ]
+    ts, hit = s.intersect_batch(rays.RayBatch.from_rays(ray_list))
+    assert hit.any() and not hit.all()
+    for i, ray in enumerate(ray_list):
+        expected = [intersection.t for intersection in s.intersect(ray)]
+        assert hit[i] == (len(expected) > 0)
+        assert np.allclose(ts[i, : len(expected)], expected)
+        assert np.isinf(ts[i, len(expected) :]).all()
+
+
+@given("shape the first object of {w} is replaced by a scalar_only_sphere()")
+def step_impl(context, w):
+    wor = getattr(context, w)
+    original = wor.objects[0]
+    wor[0] = ScalarOnlySphere(original.transform, original.material)
@@ -140,3 +140,21 @@ def step_impl(context, transform, from_point, to_point, up_vector):
     up_vector = getattr(context, up_vector)
     results = camera.view_transform(from_point, to_point, up_vector)
     setattr(context, transform, results)
+
+
+# bulk transformations
+@when("transformation {name} ← {method}({transform}) of")
+def step_impl(context, name, method, transform):
+    given_list = utils.matrix_text2list(context.table.headings, context.table.rows)
+    m = getattr(context, transform)
+    setattr(context, name, getattr(m, method)(given_list))
+
+
+@then("transformation {name} is the following array")
+def step_impl(context, name):
+    given_list = utils.matrix_text2list(context.table.headings, context.table.rows)
+    results = getattr(context, name)
+    assert results.shape == (len(given_list), len(given_list[0]))
+    for row, expected in zip(results, given_list):
+        for value, expected_value in zip(row, expected):
+            assert abs(value - expected_value) < 1e-5
@@ -147,6 +147,28 @@ def step_impl(context, num1, num2, x, y, z):
     assert results == tuples.Vector(x, y, z)
 
 
+# adding two vectors
+@then("v{num1} + v{num2} = vector({x}, {y}, {z})")
+def step_impl(context, num1, num2, x, y, z):
+    x = float(x)
+    y = float(y)
+    z = float(z)
+    results = getattr(context, "v" + num1) + getattr(context, "v" + num2)
+    assert isinstance(results, tuples.Vector)
+    assert results == tuples.Vector(x, y, z)
+
+
+# adding a vector to a point
+@then("p + v = point({x}, {y}, {z})")
+def step_impl(context, x, y, z):
+    x = float(x)
+    y = float(y)
+    z = float(z)
+    results = getattr(context, "p") + getattr(context, "v")
+    assert isinstance(results, tuples.Point)
+    assert results == tuples.Point(x, y, z)
+
+
 # negate a tuple
 @then("-a = tuple({x}, {y}, {z}, {w})")
 def step_impl(context, x, y, z, w):
@@ -1,6 +1,9 @@
 import os
 import sys
 import math
+import copy
+import pickle
+import numpy as np
 
 package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 package_path = os.path.abspath(os.path.join(package_path, ".."))
@@ -15,7 +18,8 @@ import ray_tracing.elements.materials as materials
 from ray_tracing.utils.constants import *
 import ray_tracing.utils.utils as utils
 import ray_tracing.scene.world as world
-from behave import given, when, then
+import ray_tracing.scene.compiled_scene as compiled_scene
+from behave import given, when, then, step
 
 
 # definition
@@ -67,6 +71,47 @@ def step_impl(context, xs, w, r):
     setattr(context, xs, w.intersect_world(r))
 
 
+@when("world {h} ← closest_hit({w}, {r}, {t_max})")
+def step_impl(context, h, w, r, t_max):
+    w = getattr(context, w)
+    setattr(context, h, w.closest_hit(getattr(context, r), float(t_max)))
+
+
+@when("world {h} ← closest_hit({w}, {r})")
+def step_impl(context, h, w, r):
+    setattr(context, h, getattr(context, w).closest_hit(getattr(context, r)))
+
+
+@then("world {h}.t = {t}")
+def step_impl(context, h, t):
+    assert utils.equal(getattr(context, h).t, float(t))
+
+
+@then("world {h}.object is the {ordinal} object in {w}")
+def step_impl(context, h, ordinal, w):
+    index = {"first": 0, "second": 1}[ordinal]
+    hit = getattr(context, h)
+    assert hit.get_object() is getattr(context, w).objects[index]
+    assert hit.object_index == index
+
+
+@then("world {h} is nothing")
+def step_impl(context, h):
+    assert getattr(context, h) is None
+
+
+@then("world closest_hit({w}, ray) agrees with intersect_world for every ray in {b}")
+def step_impl(context, w, b):
+    w = getattr(context, w)
+    for ray in getattr(context, b).to_rays():
+        expected = w.intersect_world(ray).get_first_hit()
+        hit = w.closest_hit(ray)
+        assert (hit is None) == (expected is None)
+        if hit is not None:
+            assert hit.get_object() is expected.get_object()
+            assert utils.equal(hit.t, expected.t)
+
+
 # shading intersection
 @given("world {shape} ← the first object in {w}")
 def step_impl(context, shape, w):
@@ -131,6 +176,84 @@ def step_impl(context, w, p, is_shadowed):
     assert w.is_shadowed(p) == is_shadowed
 
 
+@then("world is_shadowed({w}, {p}) from light {k} is {is_shadowed}")
+def step_impl(context, w, p, k, is_shadowed):
+    w = getattr(context, w)
+    p = getattr(context, p)
+    is_shadowed = utils.str_to_bool(is_shadowed)
+    assert w.is_shadowed(p, w.lights[int(k)]) == is_shadowed
+
+
+@given("world point_light(point({x}, {y}, {z}), color({r}, {g}, {b})) is added to {w}")
+@when("world point_light(point({x}, {y}, {z}), color({r}, {g}, {b})) is added to {w}")
+def step_impl(context, x, y, z, r, g, b, w):
+    getattr(context, w).add_light(
+        lights.PointLight(
+            tuples.Point(float(x), float(y), float(z)),
+            tuples.Color(float(r), float(g), float(b)),
+        )
+    )
+
+
+@then("world color_at_batch({w}, {b}) agrees with color_at for every ray")
+def step_impl(context, w, b):
+    w = getattr(context, w)
+    batch = getattr(context, b)
+    colors = w.color_at_batch(batch)
+    for color, ray in zip(colors, batch.to_rays()):
+        expected = w.color_at(ray)
+        for i in range(3):
+            assert utils.equal(color[i], expected[i])
+
+
+@then("world {w}.occluder_cache has {hits} hits, {misses} misses and {full} full queries")
+def step_impl(context, w, hits, misses, full):
+    stats = getattr(context, w).occluder_cache.stats()
+    assert stats["hits"] == int(hits)
+    assert stats["misses"] == int(misses)
+    assert stats["full_queries"] == int(full)
+
+
+@then("world is_shadowed_batch({w}) matches is_shadowed for every hit of {b} twice")
+def step_impl(context, w, b):
+    w = getattr(context, w)
+    batch = getattr(context, b)
+    ts, indices = w.intersect_world_batch(batch)
+    hit = indices >= 0
+    comps = w.prepare_computations_batch(batch[hit], ts[hit], indices[hit])
+    points = comps.over_point
+    w.occluder_cache.enabled = False
+    expected = [
+        [w.is_shadowed(tuples.Point(*point), light) for light in w.lights]
+        for point in points
+    ]
+    w.occluder_cache.enabled = True
+    for _ in range(2):
+        assert w.is_shadowed_batch(points).tolist() == expected
+
+
+# occlusion
+@then(
+    "world occluded({w}, point({x}, {y}, {z}), vector({dx}, {dy}, {dz}), {distance}) is {expected}"
+)
+def step_impl(context, w, x, y, z, dx, dy, dz, distance, expected):
+    w = getattr(context, w)
+    origin = tuples.Point(float(x), float(y), float(z))
+    direction = tuples.Vector(float(dx), float(dy), float(dz))
+    expected = utils.str_to_bool(expected)
+    assert w.occluded(origin, direction, float(distance)) == expected
+
+
+@then("world occluded({w}, ray, {distance}) agrees with intersect_world for every ray in {b}")
+def step_impl(context, w, distance, b):
+    w = getattr(context, w)
+    distance = float(distance)
+    for ray in getattr(context, b).to_rays():
+        hit = w.intersect_world(ray).get_first_hit()
+        expected = hit is not None and hit.get_t() < distance
+        assert w.occluded(ray.origin, ray.direction, distance) == expected
+
+
 # render shadows
 @given("world {shape} is added to {w}")
 def step_impl(context, shape, w):
@@ -138,3 +261,254 @@ def step_impl(context, shape, w):
     shape = getattr(context, shape)
     wor.add_object(shape)
     setattr(context, w, wor)
+
+
+# acceleration
+@given("world {w} ← {n} spheres in a lattice above a plane")
+def step_impl(context, w, n):
+    wor = world.World()
+    n = int(n)
+    side = math.ceil(n ** (1 / 3))
+    for i in range(n):
+        x, y, z = i % side, (i // side) % side, i // (side * side)
+        wor.add_object(
+            shapes.Sphere(
+                transform=matrix.TranslationMatrix(3 * x - side, 3 * y + 1, 3 * z)
+                * matrix.ScalingMatrix(0.3 + 0.1 * (i % 7), 1, 0.5)
+            )
+        )
+    wor.add_object(shapes.Plane())
+    wor.add_light(
+        lights.PointLight(position=tuples.Point(-10, 30, -10), intensity=WHITE)
+    )
+    setattr(context, w, wor)
+
+
+@given("world batch {b} ← {n} x {n} rays from point({x}, {y}, {z}) towards {w}")
+def step_impl(context, b, n, x, y, z, w):
+    n = int(n)
+    origin = tuples.Point(float(x), float(y), float(z))
+    ray_list = []
+    for i in range(n):
+        for j in range(n):
+            target = tuples.Point(-8 + 16 * i / (n - 1), -2 + 16 * j / (n - 1), 6)
+            ray_list.append(rays.Ray(origin, (target - origin).normalize()))
+    setattr(context, b, rays.RayBatch.from_rays(ray_list))
+
+
+@step('world {w}.acceleration ← "{name}"')
+def step_impl(context, w, name):
+    getattr(context, w).acceleration = name
+
+
+@then("world {w} accelerates {n} bounded objects")
+def step_impl(context, w, n):
+    stats = getattr(context, w).acceleration_stats()
+    assert stats is not None
+    assert stats["shapes"] == int(n)
+    assert stats["unbounded"] == 1
+
+
+@then("world {w} is intersected by brute force")
+def step_impl(context, w):
+    assert getattr(context, w).acceleration_stats() is None
+
+
+@then("world {w} tests as many objects tracing {b} in a batch as one ray at a time")
+def step_impl(context, w, b):
+    wor = getattr(context, w)
+    batch = getattr(context, b)
+    before = wor.acceleration_stats()["primitive_tests"]
+    wor.intersect_world_batch(batch)
+    middle = wor.acceleration_stats()["primitive_tests"]
+    for ray in batch.to_rays():
+        wor.closest_hit(ray)
+    after = wor.acceleration_stats()["primitive_tests"]
+    assert middle - before == after - middle
+
+
+@then("world {w} intersects every ray in {b} as brute force does")
+def step_impl(context, w, b):
+    wor = getattr(context, w)
+    batch = getattr(context, b)
+    mode = wor.acceleration
+    accelerated = [wor.intersect_world(r) for r in batch.to_rays()]
+    accelerated_batch = wor.intersect_world_batch(batch)
+    wor.acceleration = "none"
+    expected = [wor.intersect_world(r) for r in batch.to_rays()]
+    expected_batch = wor.intersect_world_batch(batch)
+    wor.acceleration = mode
+    for xs, ys in zip(accelerated, expected):
+        assert sorted(i.t for i in xs) == sorted(i.t for i in ys)
+        hit, expected_hit = xs.get_first_hit(), ys.get_first_hit()
+        assert (hit is None) == (expected_hit is None)
+        if hit is not None:
+            assert hit.get_object() is expected_hit.get_object()
+    assert (accelerated_batch[0] == expected_batch[0]).all()
+    assert (accelerated_batch[1] == expected_batch[1]).all()
+
+
+@given("world {w} has been intersected with every ray in {b}")
+def step_impl(context, w, b):
+    getattr(context, w).intersect_world_batch(getattr(context, b))
+
+
+@when("world the first object of {w} is moved by translation({x}, {y}, {z})")
+def step_impl(context, w, x, y, z):
+    obj = getattr(context, w).objects[0]
+    obj.transform = matrix.TranslationMatrix(float(x), float(y), float(z)) * obj.transform
+
+
+@when("world a sphere outside {w} is created and moved")
+def step_impl(context, w):
+    sphere = shapes.Sphere()
+    sphere.transform = matrix.TranslationMatrix(1, 2, 3)
+
+
+# compiled scenes
+def compiled(context, name):
+    if name.startswith("compile(") and name.endswith(")"):
+        return getattr(context, name[len("compile(") : -1]).compile()
+    return getattr(context, name)
+
+
+@step("world {c} ← compile({w})")
+def step_impl(context, c, w):
+    setattr(context, c, getattr(context, w).compile())
+
+
+@then("world {c} holds {n} objects and {l} lights")
+def step_impl(context, c, n, l):
+    scene = compiled(context, c)
+    assert len(scene) == int(n)
+    assert scene.num_lights() == int(l)
+    assert scene.transforms.shape == (int(n), 4, 4)
+    assert scene.light_positions.shape == (int(l), 3)
+
+
+@then("world {c} type codes are {spheres} spheres and {planes} planes")
+def step_impl(context, c, spheres, planes):
+    codes = list(compiled(context, c).type_codes)
+    assert codes.count(compiled_scene.SPHERE) == int(spheres)
+    assert codes.count(compiled_scene.PLANE) == int(planes)
+
+
+@then("world {c} arrays match the objects and lights of {w}")
+def step_impl(context, c, w):
+    scene = compiled(context, c)
+    wor = getattr(context, w)
+    for i, obj in enumerate(wor.objects):
+        assert np.array_equal(scene.transforms[i], obj.transform.array)
+        assert np.array_equal(scene.inverse_transforms[i], obj.inverse_transform.array)
+        assert np.array_equal(scene.normal_transforms[i], obj.normal_transform.array)
+        assert tuple(scene.bounds_min[i]) == obj.world_bounds().minimum
+        assert scene.materials.diffuse[i] == obj.material.diffuse
+    for k, light in enumerate(wor.lights):
+        assert tuple(scene.light_positions[k]) == (
+            light.position.x(),
+            light.position.y(),
+            light.position.z(),
+        )
+    assert list(scene.unbounded) == [len(wor.objects) - 1]
+
+
+@then("world {c} arrays are read-only")
+def step_impl(context, c):
+    scene = compiled(context, c)
+    for array in (
+        scene.type_codes,
+        scene.transforms,
+        scene.inverse_transforms,
+        scene.normal_transforms,
+        scene.materials.color,
+        scene.light_positions,
+    ):
+        assert not array.flags.writeable
+        assert array.flags.c_contiguous
+
+
+@then("world compile({w}) is not {c}")
+def step_impl(context, w, c):
+    assert getattr(context, w).compile() is not getattr(context, c)
+
+
+@then("world compile({w}) is {c}")
+def step_impl(context, w, c):
+    assert getattr(context, w).compile() is getattr(context, c)
+
+
+# animation updates
+@when("world the first {n} objects of {w} are updated by translation({x}, {y}, {z})")
+def step_impl(context, n, w, x, y, z):
+    wor = getattr(context, w)
+    move = matrix.TranslationMatrix(float(x), float(y), float(z))
+    context.update_report = wor.update_transforms(
+        [(obj, move * obj.transform) for obj in wor.objects[: int(n)]]
+    )
+
+
+@then('world the last update of {w} was a "{mode}"')
+def step_impl(context, w, mode):
+    assert context.update_report["mode"] == mode
+
+
+# copying and pickling
+@when("world {v} ← copy({w})")
+def step_impl(context, v, w):
+    setattr(context, v, copy.copy(getattr(context, w)))
+
+
+@when("world {v} ← deepcopy({w})")
+def step_impl(context, v, w):
+    setattr(context, v, copy.deepcopy(getattr(context, w)))
+
+
+@when("world {v} ← pickle round trip of {w}")
+def step_impl(context, v, w):
+    setattr(context, v, pickle.loads(pickle.dumps(getattr(context, w))))
+
+
+@then("world {v} equals {w}")
+def step_impl(context, v, w):
+    assert getattr(context, v) == getattr(context, w)
+
+
+@then('world {v} uses the "{name}" acceleration')
+def step_impl(context, v, name):
+    assert getattr(context, v).acceleration == name
+
+
+@then("world {v} shares the objects of {w}")
+def step_impl(context, v, w):
+    v, w = getattr(context, v), getattr(context, w)
+    assert v.objects is not w.objects
+    assert all(a is b for a, b in zip(v.objects, w.objects))
+
+
+@then("world {v} does not share the objects of {w}")
+def step_impl(context, v, w):
+    v, w = getattr(context, v), getattr(context, w)
+    assert not any(a is b for a, b in zip(v.objects, w.objects))
+    assert not any(a is b for a, b in zip(v.lights, w.lights))
+
+
+@then("world color_at_batch({v}, {b}) = color_at_batch({w}, {b})")
+def step_impl(context, v, b, w):
+    batch = getattr(context, b)
+    colors = getattr(context, v).color_at_batch(batch)
+    assert np.array_equal(colors, getattr(context, w).color_at_batch(batch))
+
+
+@when("world {v} ← thread view of {w}")
+def step_impl(context, v, w):
+    setattr(context, v, getattr(context, w).thread_view())
+
+
+@then("world {v} shares the compiled scene of {w}")
+def step_impl(context, v, w):
+    assert getattr(context, v).compile() is getattr(context, w).compile()
+
+
+@then("world {v} does not share the occluder cache of {w}")
+def step_impl(context, v, w):
+    assert getattr(context, v).occluder_cache is not getattr(context, w).occluder_cache
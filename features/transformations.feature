@@ -131,4 +131,36 @@ Feature: Transformation
             | -0.50709 | 0.50709 | 0.67612  | -2.36643 |
             | 0.76772  | 0.60609 | 0.12122  | -2.82843 |
             | -0.35857 | 0.59761 | -0.71714 | 0.00000  |
-            | 0.00000  | 0.00000 | 0.00000  | 1.00000  |
\ No newline at end of file
+            | 0.00000  | 0.00000 | 0.00000  | 1.00000  |
+    Scenario: Transforming a batch of points
+        Given transformation transform ← translation(5, -3, 2)
+        When transformation ps ← transform_points(transform) of:
+            | -3 | 4 | 5 |
+            | 0  | 0 | 0 |
+        Then transformation ps is the following array:
+            | 2 | 1  | 7 |
+            | 5 | -3 | 2 |
+    Scenario: Translation does not affect a batch of vectors
+        Given transformation transform ← translation(5, -3, 2)
+        When transformation vs ← transform_vectors(transform) of:
+            | -3 | 4 | 5 |
+            | 1  | 0 | 0 |
+        Then transformation vs is the following array:
+            | -3 | 4 | 5 |
+            | 1  | 0 | 0 |
+    Scenario: Points given with w keep their w component
+        Given transformation transform ← scaling(2, 3, 4)
+        When transformation ps ← transform_points(transform) of:
+            | -4 | 6 | 8 | 1 |
+            | -4 | 6 | 8 | 0 |
+        Then transformation ps is the following array:
+            | -8 | 18 | 32 | 1 |
+            | -8 | 18 | 32 | 0 |
+    Scenario: Transforming a batch of normals
+        Given transformation transform ← scaling(1, 0.5, 1)
+        When transformation ns ← transform_normals(transform) of:
+            | 0 | 0.7071067811865476 | -0.7071067811865476 |
+            | 1 | 0                  | 0                   |
+        Then transformation ns is the following array:
+            | 0 | 0.89443 | -0.44721 |
+            | 1 | 0       | 0        |
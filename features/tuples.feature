@@ -41,6 +41,14 @@ Feature: Tuples, Points, Vectors, and Colors
     Given vector v1 ← vector(3, 2, 1)
     And vector v2 ← vector(5, 6, 7)
     Then v1 - v2 = vector(-2, -4, -6)
+  Scenario: Adding two vectors
+    Given vector v1 ← vector(3, 2, 1)
+    And vector v2 ← vector(5, 6, 7)
+    Then v1 + v2 = vector(8, 8, 8)
+  Scenario: Adding a vector to a point
+    Given point p ← point(3, 2, 1)
+    And vector v ← vector(5, 6, 7)
+    Then p + v = point(8, 8, 8)
   Scenario: Subtracting a vector from the zero vector
     Given vector v0 ← vector(0, 0, 0)
     And vector v1 ← vector(1, -2, 3)
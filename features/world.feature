@@ -88,6 +88,87 @@ Feature: World
         And point p ← point(-2, 2, -2)
         Then world is_shadowed(w, p) is false
 
+    Scenario: Shadows are tested against each light
+        Given world w ← default_world()
+        And world point_light(point(20, -10, 10), color(1, 1, 1)) is added to w
+        And point p ← point(10, -10, 10)
+        Then world is_shadowed(w, p) from light 0 is true
+        And world is_shadowed(w, p) from light 1 is false
+
+    Scenario: A light's last occluder answers the next shadow test
+        Given world w ← default_world()
+        And point p ← point(10, -10, 10)
+        Then world is_shadowed(w, p) is true
+        And world is_shadowed(w, p) is true
+        And world w.occluder_cache has 1 hits, 0 misses and 1 full queries
+    Scenario: A light forgets its last occluder once a point is lit
+        Given world w ← default_world()
+        And point p ← point(10, -10, 10)
+        And point q ← point(0, 10, 0)
+        Then world is_shadowed(w, p) is true
+        And world is_shadowed(w, q) is false
+        And world is_shadowed(w, q) is false
+        And world w.occluder_cache has 0 hits, 1 misses and 3 full queries
+    Scenario: Cached occluders do not change batched shadows
+        Given world w ← 60 spheres in a lattice above a plane
+        And world point_light(point(10, 20, -30), color(0.5, 0.5, 0.5)) is added to w
+        And world batch b ← 12 x 12 rays from point(0, 5, -20) towards w
+        Then world is_shadowed_batch(w) matches is_shadowed for every hit of b twice
+
+    # closest hit
+    Scenario: The closest hit of a ray in a world
+        Given world w ← default_world()
+        And ray r ← ray(point(0, 0, -5), vector(0, 0, 1))
+        When world h ← closest_hit(w, r)
+        Then world h.t = 4
+        And world h.object is the first object in w
+    Scenario: The closest hit of a ray starting inside objects
+        Given world w ← default_world()
+        And ray r ← ray(point(0, 0, 0), vector(0, 0, 1))
+        When world h ← closest_hit(w, r)
+        Then world h.t = 0.5
+        And world h.object is the second object in w
+    Scenario: There is no closest hit beyond t_max
+        Given world w ← default_world()
+        And ray r ← ray(point(0, 0, -5), vector(0, 0, 1))
+        When world h ← closest_hit(w, r, 3.5)
+        Then world h is nothing
+    Scenario: There is no closest hit when the ray misses
+        Given world w ← default_world()
+        And ray r ← ray(point(0, 0, -5), vector(0, 1, 0))
+        When world h ← closest_hit(w, r)
+        Then world h is nothing
+    Scenario: Closest hits agree with the first hit of intersect_world
+        Given world w ← 60 spheres in a lattice above a plane
+        And world batch b ← 12 x 12 rays from point(0, 5, -20) towards w
+        Then world closest_hit(w, ray) agrees with intersect_world for every ray in b
+        When world w.acceleration ← "grid"
+        Then world closest_hit(w, ray) agrees with intersect_world for every ray in b
+        When world w.acceleration ← "none"
+        Then world closest_hit(w, ray) agrees with intersect_world for every ray in b
+
+    # occlusion
+    Scenario: A segment through an object is occluded
+        Given world w ← default_world()
+        Then world occluded(w, point(0, 0, -5), vector(0, 0, 2), 10) is true
+    Scenario: A segment that ends before an object is not occluded
+        Given world w ← default_world()
+        Then world occluded(w, point(0, 0, -5), vector(0, 0, 2), 3.5) is false
+    Scenario: An object behind the origin does not occlude
+        Given world w ← default_world()
+        Then world occluded(w, point(0, 0, 5), vector(0, 0, 1), 100) is false
+    Scenario: A segment starting inside an object is occluded
+        Given world w ← default_world()
+        Then world occluded(w, point(0, 0, 0), vector(1, 0, 0), 2) is true
+    Scenario: Occlusion queries agree with the nearest intersection
+        Given world w ← 60 spheres in a lattice above a plane
+        And world batch b ← 12 x 12 rays from point(0, 5, -20) towards w
+        Then world occluded(w, ray, 20) agrees with intersect_world for every ray in b
+        When world w.acceleration ← "grid"
+        Then world occluded(w, ray, 20) agrees with intersect_world for every ray in b
+        When world w.acceleration ← "none"
+        Then world occluded(w, ray, 20) agrees with intersect_world for every ray in b
+
     # render shadows
     Scenario: shade_hit() is given an intersection in shadow
         Given world w ← world()
@@ -102,4 +183,148 @@ Feature: World
         When computation comps ← prepare_computations(i, r)
         And world c ← shade_hit(w, comps)
         Then color c = color(0.1, 0.1, 0.1)
+    Scenario: shade_hit() is given an intersection in the shadow of one light only
+        Given world w ← world()
+        And world w.light ← point_light(point(0, 0, -10), color(1, 1, 1))
+        And world point_light(point(0, 10, 5), color(1, 1, 1)) is added to w
+        And sphere s1 ← sphere()
+        And world s1 is added to w
+        And sphere s2 ← sphere() with:
+            | transform | translation(0, 0, 10) |
+        And world s2 is added to w
+        And ray r ← ray(point(0, 0, 5), vector(0, 0, 1))
+        And intersection i ← intersection(4, s2)
+        When computation comps ← prepare_computations(i, r)
+        And world c ← shade_hit(w, comps)
+        Then color c = color(0.53425, 0.53425, 0.53425)
+    Scenario: Batched shading traces shadows for every light
+        Given world w ← 60 spheres in a lattice above a plane
+        And world point_light(point(10, 20, -30), color(0.5, 0.5, 0.5)) is added to w
+        And world batch b ← 12 x 12 rays from point(0, 5, -20) towards w
+        Then world color_at_batch(w, b) agrees with color_at for every ray
+
+
+    # acceleration
+    Scenario: Small worlds are intersected by brute force
+        Given world w ← default_world()
+        Then world w is intersected by brute force
+
+    Scenario: A bounding volume hierarchy finds the same intersections as brute force
+        Given world w ← 60 spheres in a lattice above a plane
+        And world batch b ← 12 x 12 rays from point(0, 5, -20) towards w
+        Then world w accelerates 60 bounded objects
+        And world w intersects every ray in b as brute force does
+
+    Scenario: A bounding volume hierarchy is rebuilt after a shape moves
+        Given world w ← 60 spheres in a lattice above a plane
+        And world batch b ← 12 x 12 rays from point(0, 5, -20) towards w
+        And world w.acceleration ← "bvh"
+        And world w has been intersected with every ray in b
+        When world the first object of w is moved by translation(4, 4, -10)
+        Then world w intersects every ray in b as brute force does
+
+    Scenario: Shapes outside a world do not make its structure stale
+        Given world w ← 60 spheres in a lattice above a plane
+        And world w.acceleration ← "bvh"
+        And world s ← compile(w)
+        When world a sphere outside w is created and moved
+        Then world compile(w) is s
+        When world the first object of w is moved by translation(4, 4, -10)
+        Then world compile(w) is not s
+
+    Scenario: A uniform grid finds the same intersections as brute force
+        Given world w ← 60 spheres in a lattice above a plane
+        And world batch b ← 12 x 12 rays from point(0, 5, -20) towards w
+        And world w.acceleration ← "grid"
+        Then world w accelerates 60 bounded objects
+        And world w intersects every ray in b as brute force does
+
+    Scenario: A batch crossing a uniform grid tests each object once per ray
+        Given world w ← 60 spheres in a lattice above a plane
+        And world batch b ← 12 x 12 rays from point(0, 5, -20) towards w
+        And world w.acceleration ← "grid"
+        Then world w tests as many objects tracing b in a batch as one ray at a time
+
+
+    # compiled scenes
+    Scenario: Compiling a world flattens it into arrays
+        Given world w ← 60 spheres in a lattice above a plane
+        When world c ← compile(w)
+        Then world c holds 61 objects and 1 lights
+        And world c type codes are 60 spheres and 1 planes
+        And world c arrays match the objects and lights of w
+        And world c arrays are read-only
+
+    Scenario: A compiled world is reused until the world changes
+        Given world w ← 60 spheres in a lattice above a plane
+        When world c ← compile(w)
+        Then world compile(w) is c
+        When world point_light(point(10, 20, -30), color(0.5, 0.5, 0.5)) is added to w
+        Then world compile(w) is not c
+        And world compile(w) holds 61 objects and 2 lights
+
+    Scenario: A compiled world is rebuilt after objects change
+        Given world w ← 60 spheres in a lattice above a plane
+        And world c ← compile(w)
+        When world the first object of w is moved by translation(4, 4, -10)
+        Then world compile(w) is not c
+        And world compile(w) arrays match the objects and lights of w
+        Given world c ← compile(w)
+        And sphere s ← sphere()
+        And world s is added to w
+        Then world compile(w) is not c
+        And world compile(w) holds 62 objects and 1 lights
+
+    Scenario: A bounding volume hierarchy is refitted when objects are updated
+        Given world w ← 60 spheres in a lattice above a plane
+        And world batch b ← 12 x 12 rays from point(0, 5, -20) towards w
+        And world w.acceleration ← "bvh"
+        And world w has been intersected with every ray in b
+        When world the first 10 objects of w are updated by translation(0.5, 0.2, -0.3)
+        Then world the last update of w was a "refit"
+        And world w intersects every ray in b as brute force does
+
+    Scenario: A refitted bounding volume hierarchy is rebuilt once it degrades
+        Given world w ← 60 spheres in a lattice above a plane
+        And world w.acceleration ← "bvh"
+        When world the first 10 objects of w are updated by translation(0, 100, 0)
+        Then world the last update of w was a "rebuild"
+
+    Scenario: Updating a uniform grid rebuilds it
+        Given world w ← 60 spheres in a lattice above a plane
+        And world batch b ← 12 x 12 rays from point(0, 5, -20) towards w
+        And world w.acceleration ← "grid"
+        When world the first 10 objects of w are updated by translation(0.5, 0.2, -0.3)
+        Then world the last update of w was a "rebuild"
+        And world w intersects every ray in b as brute force does
+
+
+    # copying and pickling
+    Scenario: Copying a world shares its objects
+        Given world w ← default_world()
+        And world w.acceleration ← "bvh"
+        When world v ← copy(w)
+        Then world v equals w
+        And world v uses the "bvh" acceleration
+        And world v shares the objects of w
+
+    Scenario: Deep copying a world copies its objects
+        Given world w ← default_world()
+        When world v ← deepcopy(w)
+        Then world v equals w
+        And world v does not share the objects of w
+
+    Scenario: A pickled world renders like the original
+        Given world w ← 60 spheres in a lattice above a plane
+        And world batch b ← 12 x 12 rays from point(0, 5, -20) towards w
+        When world v ← pickle round trip of w
+        Then world v equals w
+        And world color_at_batch(v, b) = color_at_batch(w, b)
 
+    Scenario: A thread view shares the compiled world but not the occluder cache
+        Given world w ← 60 spheres in a lattice above a plane
+        And world batch b ← 12 x 12 rays from point(0, 5, -20) towards w
+        When world v ← thread view of w
+        Then world v shares the compiled scene of w
+        And world v does not share the occluder cache of w
+        And world color_at_batch(v, b) = color_at_batch(w, b)
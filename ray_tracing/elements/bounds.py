@@ -0,0 +1,190 @@
+"""
+This module contains the BoundingBox class.
+"""
+
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import math
+import numpy as np
+import ray_tracing.elements.matrix as matrix
+
+INFINITY = float("inf")
+
+
+def inverse_direction(direction):
+    """
+    Returns the per-component reciprocal of a direction for slab tests.
+    Zero components map to +inf; a ray lying exactly on a slab plane then
+    gives 0 * inf = nan, which the slab tests treat as no constraint.
+    """
+    return tuple(1.0 / d if d != 0 else INFINITY for d in direction)
+
+
+def inverse_directions(directions: np.ndarray) -> np.ndarray:
+    """
+    Returns the per-component reciprocals of an N x 3 array of directions,
+    with +inf for zero components as in inverse_direction.
+    """
+    inverses = np.full(np.shape(directions), INFINITY)
+    np.divide(1.0, directions, out=inverses, where=directions != 0)
+    return inverses
+
+
+def slab_interval(minimum, maximum, origin, inverse):
+    """
+    Slab test of one ray, given by its origin (x, y, z) and the reciprocal
+    of its direction, against the box minimum..maximum. Returns
+    (t_near, t_far); the line misses the box when t_near > t_far.
+    """
+    t_near = -INFINITY
+    t_far = INFINITY
+    for axis in range(3):
+        t1 = (minimum[axis] - origin[axis]) * inverse[axis]
+        t2 = (maximum[axis] - origin[axis]) * inverse[axis]
+        # a nan bound fails every comparison below and is ignored
+        if t1 > t2:
+            t1, t2 = t2, t1
+        if t1 > t_near:
+            t_near = t1
+        if t2 < t_far:
+            t_far = t2
+    return t_near, t_far
+
+
+def slab_intervals(minimum, maximum, origins: np.ndarray, inverses: np.ndarray):
+    """
+    Slab test of N rays (N x 3 origins and reciprocal directions) against
+    the box minimum..maximum. Returns the t_near and t_far arrays.
+    """
+    with np.errstate(invalid="ignore"):
+        t1 = (np.asarray(minimum) - origins) * inverses
+        t2 = (np.asarray(maximum) - origins) * inverses
+    # with inverses of +inf, nan only comes from an origin on a slab plane;
+    # that axis then places no constraint on t
+    t1[np.isnan(t1)] = -INFINITY
+    t2[np.isnan(t2)] = INFINITY
+    return np.minimum(t1, t2).max(axis=1), np.maximum(t1, t2).min(axis=1)
+
+
+class BoundingBox:
+    """
+    This class represents an axis-aligned bounding box.
+    """
+
+    __slots__ = ("minimum", "maximum")
+
+    def __init__(
+        self,
+        minimum=(INFINITY, INFINITY, INFINITY),
+        maximum=(-INFINITY, -INFINITY, -INFINITY),
+    ):
+        """
+        Constructor for the BoundingBox class.
+        The default box is empty; points and boxes can be merged into it.
+        """
+        self.minimum = tuple(float(v) for v in minimum)
+        self.maximum = tuple(float(v) for v in maximum)
+
+    @classmethod
+    def infinite(cls):
+        """
+        Returns a box that contains all of space.
+        """
+        return cls((-INFINITY,) * 3, (INFINITY,) * 3)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the bounding box.
+        """
+        return f"BoundingBox(minimum={self.minimum}, maximum={self.maximum})"
+
+    def __eq__(self, other):
+        """
+        Checks if two bounding boxes are equal.
+        """
+        return self.minimum == other.minimum and self.maximum == other.maximum
+
+    def is_empty(self):
+        """
+        Returns True if the box contains no points.
+        """
+        return any(lo > hi for lo, hi in zip(self.minimum, self.maximum))
+
+    def is_bounded(self):
+        """
+        Returns True if the box is non-empty and finite on every axis.
+        """
+        return not self.is_empty() and all(
+            math.isfinite(v) for v in self.minimum + self.maximum
+        )
+
+    def merge(self, other: "BoundingBox") -> "BoundingBox":
+        """
+        Returns the smallest box containing both boxes.
+        """
+        return BoundingBox(
+            tuple(map(min, self.minimum, other.minimum)),
+            tuple(map(max, self.maximum, other.maximum)),
+        )
+
+    def add_point(self, point) -> "BoundingBox":
+        """
+        Returns the smallest box containing this box and the point (x, y, z).
+        """
+        return BoundingBox(
+            tuple(map(min, self.minimum, point[:3])),
+            tuple(map(max, self.maximum, point[:3])),
+        )
+
+    def centroid(self):
+        """
+        Returns the center of the box.
+        """
+        return tuple((lo + hi) / 2 for lo, hi in zip(self.minimum, self.maximum))
+
+    def surface_area(self):
+        """
+        Returns the surface area of the box (0 for an empty box).
+        """
+        if self.is_empty():
+            return 0.0
+        dx, dy, dz = (hi - lo for lo, hi in zip(self.minimum, self.maximum))
+        return 2 * (dx * dy + dy * dz + dz * dx)
+
+    def transform(self, trans: matrix.Matrix) -> "BoundingBox":
+        """
+        Returns the axis-aligned box containing this box after the transform.
+        Unbounded boxes stay infinite.
+        """
+        if self.is_empty():
+            return BoundingBox()
+        if not self.is_bounded():
+            return BoundingBox.infinite()
+        corners = np.array(
+            [
+                (x, y, z)
+                for x in (self.minimum[0], self.maximum[0])
+                for y in (self.minimum[1], self.maximum[1])
+                for z in (self.minimum[2], self.maximum[2])
+            ]
+        )
+        corners = trans.transform_points(corners)
+        return BoundingBox(corners.min(axis=0).tolist(), corners.max(axis=0).tolist())
+
+    def intersect_interval(self, origin, inverse):
+        """
+        Slab test against a ray given by its origin (x, y, z) and the
+        reciprocal of its direction. Returns (t_near, t_far); the line
+        misses the box when t_near > t_far.
+        """
+        return slab_interval(self.minimum, self.maximum, origin, inverse)
+
+    def intersect_intervals(self, origins: np.ndarray, inverses: np.ndarray):
+        """
+        Slab test against N rays, see slab_intervals.
+        """
+        return slab_intervals(self.minimum, self.maximum, origins, inverses)
@@ -7,6 +7,8 @@ import sys
 package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, package_path)
 
+from multiprocessing import shared_memory
+import numpy as np
 from ray_tracing.elements.tuples import Color
 import ray_tracing.utils.utils as utils
 
@@ -19,6 +21,14 @@ class Canvas:
         self.height = height
         self.pixels = [[Color(0, 0, 0) for _ in range(width)] for _ in range(height)]
 
+    @classmethod
+    def from_array(cls, colors):
+        """Create a canvas from a height x width x 3 array of colors"""
+        image = cls.__new__(cls)
+        image.height, image.width = colors.shape[:2]
+        image.write_array(colors)
+        return image
+
     def __repr__(self) -> str:
         return f"Canvas({self.width}, {self.height})"
 
@@ -33,6 +43,17 @@ class Canvas:
         if x >= 0 and x < self.width and y >= 0 and y < self.height:
             self.pixels[y][x] = color
 
+    def write_pixels(self, pixels, colors):
+        """Write many pixels at once from an N x 2 array of (x, y) indices
+        and an N x 3 array of colors"""
+        for (x, y), (r, g, b) in zip(pixels.tolist(), colors.tolist()):
+            if x >= 0 and x < self.width and y >= 0 and y < self.height:
+                self.pixels[y][x] = Color(r, g, b)
+
+    def write_array(self, colors):
+        """Write every pixel from a height x width x 3 array of colors"""
+        self.pixels = [[Color(r, g, b) for r, g, b in row] for row in colors.tolist()]
+
     def pixel_at(self, x, y):
         """Get the color of a pixel"""
         return self.pixels[y][x]
@@ -64,3 +85,70 @@ class Canvas:
         """Save the canvas to a file"""
         with open(filename, "w") as file:
             file.write(self.to_ppm())
+
+
+class SharedCanvas:
+    """A framebuffer of float64 colors in a multiprocessing.shared_memory
+    block, so that worker processes can write tiles into it directly.
+
+    The process that creates the canvas owns the block and unlinks it on
+    close() (or when leaving a with block); other processes attach() by
+    name and only close their own mapping. Should the owner die first, the
+    multiprocessing resource tracker still removes the block."""
+
+    def __init__(self, width, height, name=None):
+        self.width = width
+        self.height = height
+        self.owner = name is None
+        size = max(width * height * 3 * 8, 1)
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        self.colors = np.ndarray(
+            (height, width, 3), dtype=np.float64, buffer=self.memory.buf
+        )
+        if self.owner:
+            self.colors[:] = 0
+
+    @classmethod
+    def attach(cls, name, width, height):
+        """Map an existing shared canvas created by another process"""
+        return cls(width, height, name=name)
+
+    def __repr__(self) -> str:
+        return f"SharedCanvas({self.width}, {self.height}, name={self.name!r})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the mapping; the owner also unlinks the block"""
+        if self.memory is None:
+            return
+        # the array must go before the buffer it views can be released
+        self.colors = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+        self.memory = None
+
+    def write_tile(self, tile, colors):
+        """Write the pixels of the tile (x_start, y_start, x_end, y_end)
+        from an N x 3 array of colors in row-major order"""
+        x_start, y_start, x_end, y_end = tile
+        self.colors[y_start:y_end, x_start:x_end] = np.reshape(
+            colors, (y_end - y_start, x_end - x_start, 3)
+        )
+
+    def pixel_at(self, x, y):
+        """Get the color of a pixel"""
+        return Color(*self.colors[y, x].tolist())
+
+    def to_canvas(self):
+        """Copy the framebuffer into a Canvas"""
+        return Canvas.from_array(self.colors)
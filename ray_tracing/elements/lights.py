@@ -17,11 +17,14 @@ import ray_tracing.elements.rays as rays
 import ray_tracing.operations.intersection as intersection
 import ray_tracing.elements.materials as materials
 import ray_tracing.utils.utils as utils
+import ray_tracing.utils.changes as changes
 
 
-class Light:
+class Light(changes.Watchable):
     """
     This class represents a light.
+    Setting the position or intensity increments the counters watching
+    the light, such as the one a world checks its compiled scene against.
     """
 
     def __init__(self, position: tuples.Point, intensity: tuples.Color):
@@ -31,6 +34,13 @@ class Light:
         self.position = position
         self.intensity = intensity
 
+    def __setattr__(self, name, value):
+        """
+        Sets a property and notifies the watchers.
+        """
+        super().__setattr__(name, value)
+        self._changed()
+
     def __repr__(self):
         """
         Returns a string representation of the light.
@@ -92,6 +102,48 @@ class Light:
 
         return resulting_color
 
+    def lighting_batch(
+        self,
+        material_batch: materials.MaterialBatch,
+        points: np.ndarray,
+        eye_vectors: np.ndarray,
+        normal_vectors: np.ndarray,
+        in_shadow: np.ndarray = None,
+    ) -> np.ndarray:
+        """
+        Calculates the lighting at N points at once.
+        material_batch holds one material per point; the vectors are N x 3
+        arrays and in_shadow an optional boolean array. Returns N x 3 colors.
+        """
+        intensity = np.array(
+            [self.intensity.r(), self.intensity.g(), self.intensity.b()]
+        )
+        position = np.array([self.position.x(), self.position.y(), self.position.z()])
+        effective_color = material_batch.color * intensity
+        ambient = effective_color * material_batch.ambient[:, np.newaxis]
+
+        light_vector = position - points
+        light_vector /= np.linalg.norm(light_vector, axis=1, keepdims=True)
+        light_dot_normal = np.einsum("ij,ij->i", light_vector, normal_vectors)
+        lit = light_dot_normal >= 0
+        if in_shadow is not None:
+            lit &= ~in_shadow
+        diffuse = effective_color * (material_batch.diffuse * light_dot_normal)[
+            :, np.newaxis
+        ]
+
+        # reflect(-l, n) = -l + n * 2 * dot(l, n), with l the light vector
+        reflect_vector = -light_vector + normal_vectors * (2 * light_dot_normal)[
+            :, np.newaxis
+        ]
+        reflect_dot_eye = np.einsum("ij,ij->i", reflect_vector, eye_vectors)
+        shiny = lit & (reflect_dot_eye > 0)
+        factor = np.zeros(len(points))
+        factor[shiny] = reflect_dot_eye[shiny] ** material_batch.shininess[shiny]
+        specular = intensity * (material_batch.specular * factor)[:, np.newaxis]
+
+        return ambient + np.where(lit[:, np.newaxis], diffuse + specular, 0.0)
+
 
 class PointLight(Light):
     """
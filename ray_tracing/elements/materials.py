@@ -8,13 +8,18 @@ import sys
 package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, package_path)
 
+from typing import List
+import numpy as np
 from ray_tracing.utils.constants import *
 import ray_tracing.elements.tuples as tuples
+import ray_tracing.utils.changes as changes
 
 
-class Material:
+class Material(changes.Watchable):
     """
     This class represents a material.
+    Setting any property increments the counters watching the material,
+    such as the one a world checks its compiled scene against.
     """
 
     def __init__(
@@ -34,6 +39,13 @@ class Material:
         self.specular = specular
         self.shininess = shininess
 
+    def __setattr__(self, name, value):
+        """
+        Sets a property and notifies the watchers.
+        """
+        super().__setattr__(name, value)
+        self._changed()
+
     def set_material_properties(self, **kwargs):
         """
         Sets the material properties.
@@ -64,3 +76,51 @@ class Material:
             and self.specular == other.specular
             and self.shininess == other.shininess
         )
+
+
+class MaterialBatch:
+    """
+    This class holds the parameters of many materials as arrays.
+    """
+
+    def __init__(self, color, ambient, diffuse, specular, shininess):
+        """
+        Constructor for the MaterialBatch class.
+        color is an N x 3 array, the other parameters are arrays of length N.
+        """
+        self.color = np.asarray(color, dtype=np.float64).reshape(-1, 3)
+        self.ambient = np.asarray(ambient, dtype=np.float64)
+        self.diffuse = np.asarray(diffuse, dtype=np.float64)
+        self.specular = np.asarray(specular, dtype=np.float64)
+        self.shininess = np.asarray(shininess, dtype=np.float64)
+
+    @classmethod
+    def from_materials(cls, material_list: List[Material]):
+        """
+        Packs a list of materials into arrays.
+        """
+        return cls(
+            [(m.color.r(), m.color.g(), m.color.b()) for m in material_list],
+            [m.ambient for m in material_list],
+            [m.diffuse for m in material_list],
+            [m.specular for m in material_list],
+            [m.shininess for m in material_list],
+        )
+
+    def __len__(self):
+        """
+        Returns the number of materials.
+        """
+        return len(self.ambient)
+
+    def take(self, indices):
+        """
+        Returns the materials at the given indices, e.g. one per ray hit.
+        """
+        return MaterialBatch(
+            self.color[indices],
+            self.ambient[indices],
+            self.diffuse[indices],
+            self.specular[indices],
+            self.shininess[indices],
+        )
@@ -10,6 +10,7 @@ sys.path.insert(0, package_path)
 
 import numpy as np
 import math
+from ray_tracing.utils.constants import *
 import ray_tracing.elements.tuples as tuples
 import ray_tracing.utils.utils as utils
 
@@ -17,36 +18,98 @@ import ray_tracing.utils.utils as utils
 class Matrix:
     """
     Matrix for ray tracing.
+
+    Entries are stored in a contiguous, read-only float64 array. A Matrix
+    cannot be modified after construction. Matrices compare equal within
+    EPSILON but are hashed by their exact entries (see key), so as
+    dictionary keys they match matrices with the same entries.
     """
 
     def __init__(self, entry_list):
-        self.matrix = entry_list
-        self.rows = len(entry_list)
-        self.columns = len(entry_list[0])
+        if isinstance(entry_list, Matrix):
+            entry_list = entry_list.array
+        self._set_array(np.array(entry_list, dtype=np.float64))
+
+    @classmethod
+    def from_array(cls, array):
+        """
+        Wraps a float64 array without copying it.
+        The caller must not keep a writeable reference to the array.
+        """
+
+        results = cls.__new__(cls)
+        results._set_array(array)
+        return results
+
+    def _set_array(self, array):
+        if array.ndim != 2:
+            raise ValueError("A matrix needs two dimensions.")
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        array.flags.writeable = False
+        self.array = array
+        self.rows, self.columns = array.shape
         self.shape = (self.rows, self.columns)
+        self._rows = None
+        self._key = None
+        self._inverse = None
+        self._normal_matrix = None
+
+    @property
+    def matrix(self):
+        """
+        The entries as a tuple of row tuples of Python floats.
+        """
+
+        if self._rows is None:
+            self._rows = tuple(tuple(row) for row in self.array.tolist())
+        return self._rows
+
+    @property
+    def key(self):
+        """
+        The exact entries as a hashable (shape, bytes) pair; -0.0 and 0.0
+        give the same key.
+        """
+
+        if self._key is None:
+            self._key = (self.shape, (self.array + 0.0).tobytes())
+        return self._key
 
     def __getitem__(self, index):
         i, j = index
         return self.matrix[i][j]
 
     def __setitem__(self, index, value):
-        i, j = index
-        self.matrix[i][j] = value
+        raise TypeError("Matrix is immutable.")
+
+    def __setattr__(self, name, value):
+        if name in ("array", "rows", "columns", "shape") and name in self.__dict__:
+            raise AttributeError("Matrix is immutable.")
+        super().__setattr__(name, value)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __getstate__(self):
+        return self.array
+
+    def __setstate__(self, state):
+        self._set_array(np.array(state, dtype=np.float64))
 
     def __repr__(self):
         texts = ""
         for row in self.matrix:
-            texts += str(row) + "\n"
+            texts += str(list(row)) + "\n"
         return texts
 
     def __eq__(self, other):
-        if self.rows != other.rows or self.columns != other.columns:
+        if not isinstance(other, Matrix):
             return False
-        for i in range(self.rows):
-            for j in range(self.columns):
-                if not utils.equal(self.matrix[i][j], other.matrix[i][j]):
-                    return False
-        return True
+        if self.shape != other.shape:
+            return False
+        if self.array is other.array:
+            return True
+        return bool(np.all(np.abs(self.array - other.array) < EPSILON))
 
     def __neq__(self, other):
         return not self.__eq__(other)
@@ -69,76 +132,95 @@ class Matrix:
         Matrix multiplication.
         """
 
-        # np implementation
-        results = np.array(self.matrix) @ np.array(other.matrix)
-        results = results.tolist()
-
-        # naive implementation without optimization
-        # results = []
-        # for i in range(self.rows):
-        #     row = []
-        #     for j in range(other.columns):
-        #         entry = 0
-        #         for k in range(self.columns):
-        #             entry += self.matrix[i][k] * other.matrix[k][j]
-        #         row.append(entry)
-        #     results.append(row)
-        return Matrix(results)
+        return Matrix.from_array(self.array @ other.array)
 
     def scalar_multiplication(self, other):
         """
         Scalar multiplication.
         """
 
-        # np implementation
-        results = np.array(self.matrix) * other
-        results = results.tolist()
-
-        # naive implementation without optimization
-        # results = []
-        # for i in range(self.rows):
-        #     row = []
-        #     for j in range(self.columns):
-        #         row.append(self.matrix[i][j] * other)
-        #     results.append(row)
-        return Matrix(results)
+        return Matrix.from_array(self.array * other)
 
     def tuple_multiplication(self, other):
         """
         Tuple multiplication.
         """
 
-        # np implementation
-        tuple_in_matrix_form = [element for element in other]
-        tuple_in_matrix_form = np.array(tuple_in_matrix_form)[np.newaxis].T
-        results = np.array(self.matrix) @ tuple_in_matrix_form
-        results = results.T.tolist()[0]
-
-        # naive implementation without optimization
-        # results = []
-        # for i in range(self.rows):
-        #     entry = 0
-        #     for j in range(self.columns):
-        #         entry += self.matrix[i][j] * other[j]
-        #     results.append(entry)
+        if self.shape != (4, 4):
+            raise ValueError("Only 4x4 matrices can be multiplied by a tuple.")
+        x, y, z, w = other
+        results = [a * x + b * y + c * z + d * w for a, b, c, d in self.matrix]
         return tuples.Tuple(results[0], results[1], results[2], results[3])
 
+    def _transform_array(self, values, w):
+        """
+        Multiplies every row of an N x 3 or N x 4 array by the matrix.
+        N x 3 rows get the implicit w and keep their shape; N x 4 rows use
+        their own w. A single 1-D row is accepted as well.
+        """
+
+        if self.shape != (4, 4):
+            raise ValueError("Only 4x4 matrices can transform points or vectors.")
+        values = np.asarray(values, dtype=np.float64)
+        single = values.ndim == 1
+        values = np.atleast_2d(values)
+        if values.shape[1] == 4:
+            results = values @ self.array.T
+        elif values.shape[1] == 3:
+            results = values @ self.array[:3, :3].T
+            if w:
+                results += self.array[:3, 3]
+        else:
+            raise ValueError("Expected an array of shape (N, 3) or (N, 4).")
+        return results[0] if single else results
+
+    def transform_points(self, points):
+        """
+        Transforms an N x 3 (w = 1 implied) or N x 4 array of points.
+        """
+
+        return self._transform_array(points, 1)
+
+    def transform_vectors(self, vectors):
+        """
+        Transforms an N x 3 (w = 0 implied) or N x 4 array of vectors.
+        """
+
+        return self._transform_array(vectors, 0)
+
+    def transform_normals(self, normals, normalize=True):
+        """
+        Maps object-space normals to world space with the inverse transpose
+        of this (object-to-world) matrix. w is forced back to 0 and the
+        results are normalized unless normalize is False.
+        """
+
+        normal_matrix = self.normal_matrix()
+        normals = np.asarray(normals, dtype=np.float64)
+        single = normals.ndim == 1
+        normals = np.atleast_2d(normals)
+        results = normal_matrix._transform_array(normals[:, :3], 0)
+        if normalize:
+            results /= np.linalg.norm(results, axis=1, keepdims=True)
+        if normals.shape[1] == 4:
+            results = np.hstack([results, np.zeros((len(results), 1))])
+        return results[0] if single else results
+
+    def normal_matrix(self):
+        """
+        Returns the transpose of the inverse, used to transform normals.
+        """
+
+        if self._normal_matrix is None:
+            self._normal_matrix = self.inverse().transpose()
+        return self._normal_matrix
+
     def transpose(self):
         """
         Transpose the matrix.
         """
 
-        # np implementation
-        results = np.array(self.matrix).T.tolist()
-
-        # naive implementation without optimization
-        # results = []
-        # for i in range(self.columns):
-        #     row = []
-        #     for j in range(self.rows):
-        #         row.append(self.matrix[j][i])
-        #     results.append(row)
-        return Matrix(results)
+        return Matrix.from_array(self.array.T.copy())
 
     def determinant(self):
         """
@@ -148,34 +230,114 @@ class Matrix:
         if self.rows != self.columns:
             raise ValueError("The matrix is not square.")
 
+        m = self.matrix
         if self.rows == 2:
+            det = m[0][0] * m[1][1] - m[0][1] * m[1][0]
+        elif self.rows == 3:
             det = (
-                self.matrix[0][0] * self.matrix[1][1]
-                - self.matrix[0][1] * self.matrix[1][0]
+                m[0][0] * (m[1][1] * m[2][2] - m[1][2] * m[2][1])
+                - m[0][1] * (m[1][0] * m[2][2] - m[1][2] * m[2][0])
+                + m[0][2] * (m[1][0] * m[2][1] - m[1][1] * m[2][0])
             )
+        elif self.rows == 4:
+            det = self._determinant_4x4()
         else:
-            det = 0
-            for i in range(self.columns):
-                det = det + self.matrix[0][i] * self.cofactor(0, i)
+            lu, _, sign = self._lu_decompose()
+            if lu is None:
+                return 0
+            det = sign
+            for i in range(self.rows):
+                det *= lu[i][i]
         return det
 
+    def _determinant_4x4(self):
+        """
+        Closed-form 4x4 determinant from the 2x2 minors of the top and
+        bottom row pairs.
+        """
+
+        if self.is_affine():
+            m = self.matrix
+            return (
+                m[0][0] * (m[1][1] * m[2][2] - m[1][2] * m[2][1])
+                - m[0][1] * (m[1][0] * m[2][2] - m[1][2] * m[2][0])
+                + m[0][2] * (m[1][0] * m[2][1] - m[1][1] * m[2][0])
+            )
+        s, c = self._pair_minors_4x4()
+        return (
+            s[0] * c[5]
+            - s[1] * c[4]
+            + s[2] * c[3]
+            + s[3] * c[2]
+            - s[4] * c[1]
+            + s[5] * c[0]
+        )
+
+    def _pair_minors_4x4(self):
+        """
+        The six 2x2 minors of rows 0-1 (s) and rows 2-3 (c) of a 4x4 matrix.
+        """
+
+        (a00, a01, a02, a03), (a10, a11, a12, a13) = self.matrix[0], self.matrix[1]
+        (a20, a21, a22, a23), (a30, a31, a32, a33) = self.matrix[2], self.matrix[3]
+        s = (
+            a00 * a11 - a10 * a01,
+            a00 * a12 - a10 * a02,
+            a00 * a13 - a10 * a03,
+            a01 * a12 - a11 * a02,
+            a01 * a13 - a11 * a03,
+            a02 * a13 - a12 * a03,
+        )
+        c = (
+            a20 * a31 - a30 * a21,
+            a20 * a32 - a30 * a22,
+            a20 * a33 - a30 * a23,
+            a21 * a32 - a31 * a22,
+            a21 * a33 - a31 * a23,
+            a22 * a33 - a32 * a23,
+        )
+        return s, c
+
+    def _lu_decompose(self):
+        """
+        LU decomposition with partial pivoting.
+        Returns (lu, permutation, sign), or (None, None, 0) if singular.
+        """
+
+        n = self.rows
+        lu = [list(row) for row in self.matrix]
+        permutation = list(range(n))
+        sign = 1
+        for k in range(n):
+            pivot = max(range(k, n), key=lambda i: abs(lu[i][k]))
+            if lu[pivot][k] == 0:
+                return None, None, 0
+            if pivot != k:
+                lu[k], lu[pivot] = lu[pivot], lu[k]
+                permutation[k], permutation[pivot] = permutation[pivot], permutation[k]
+                sign = -sign
+            for i in range(k + 1, n):
+                lu[i][k] /= lu[k][k]
+                factor = lu[i][k]
+                for j in range(k + 1, n):
+                    lu[i][j] -= factor * lu[k][j]
+        return lu, permutation, sign
+
+    def is_affine(self):
+        """
+        Check if the matrix is a 4x4 affine transform (last row is 0, 0, 0, 1).
+        """
+
+        return self.shape == (4, 4) and self.matrix[3] == (0.0, 0.0, 0.0, 1.0)
+
     def submatrix(self, row_idx, column_idx):
         """
         Calculate the submatrix of the matrix.
         Remove the row_idx and column_idx of the matrix.
         """
 
-        results = []
-        for i in range(self.rows):
-            if i == row_idx:
-                continue
-            row = []
-            for j in range(self.columns):
-                if j == column_idx:
-                    continue
-                row.append(self.matrix[i][j])
-            results.append(row)
-        return Matrix(results)
+        results = np.delete(np.delete(self.array, row_idx, axis=0), column_idx, axis=1)
+        return Matrix.from_array(results)
 
     def minor(self, row_idx, column_idx):
         """
@@ -207,31 +369,152 @@ class Matrix:
         Calculate the inverse of the matrix.
         """
 
-        if not self.is_invertible():
-            raise ValueError("The matrix is not invertible.")
+        if self._inverse is None:
+            if self.rows != self.columns:
+                raise ValueError("The matrix is not square.")
+            if self.rows == 4:
+                if self.is_affine():
+                    results = self._inverse_affine()
+                else:
+                    results = self._inverse_4x4()
+            elif self.rows in (2, 3):
+                results = self._inverse_cofactor()
+            else:
+                results = self._inverse_lu()
+            # matrices are immutable, so the pair can reference each other
+            results._inverse = self
+            self._inverse = results
+        return self._inverse
+
+    def _inverse_cofactor(self):
+        """
+        Inverse as the transposed cofactor matrix divided by the determinant.
+        """
 
         det = self.determinant()
+        if det == 0:
+            raise ValueError("The matrix is not invertible.")
         results = []
         for i in range(self.rows):
             row = []
             for j in range(self.columns):
-                cofactor = self.cofactor(i, j)
-                row.append(float(cofactor / det))
+                row.append(float(self.cofactor(j, i) / det))
             results.append(row)
-        return Matrix(results).transpose()
+        return Matrix(results)
+
+    def _inverse_affine(self):
+        """
+        Inverse of an affine 4x4 matrix: invert the 3x3 linear part and map
+        the translation back through it.
+        """
+
+        (a, b, c, tx), (d, e, f, ty), (g, h, i, tz) = self.matrix[:3]
+        co00 = e * i - f * h
+        co01 = f * g - d * i
+        co02 = d * h - e * g
+        det = a * co00 + b * co01 + c * co02
+        if det == 0:
+            raise ValueError("The matrix is not invertible.")
+        r00 = co00 / det
+        r01 = (c * h - b * i) / det
+        r02 = (b * f - c * e) / det
+        r10 = co01 / det
+        r11 = (a * i - c * g) / det
+        r12 = (c * d - a * f) / det
+        r20 = co02 / det
+        r21 = (b * g - a * h) / det
+        r22 = (a * e - b * d) / det
+        return Matrix(
+            [
+                [r00, r01, r02, -(r00 * tx + r01 * ty + r02 * tz)],
+                [r10, r11, r12, -(r10 * tx + r11 * ty + r12 * tz)],
+                [r20, r21, r22, -(r20 * tx + r21 * ty + r22 * tz)],
+                [0.0, 0.0, 0.0, 1.0],
+            ]
+        )
+
+    def _inverse_4x4(self):
+        """
+        Closed-form inverse of a general 4x4 matrix.
+        """
+
+        (a00, a01, a02, a03), (a10, a11, a12, a13) = self.matrix[0], self.matrix[1]
+        (a20, a21, a22, a23), (a30, a31, a32, a33) = self.matrix[2], self.matrix[3]
+        s, c = self._pair_minors_4x4()
+        det = (
+            s[0] * c[5]
+            - s[1] * c[4]
+            + s[2] * c[3]
+            + s[3] * c[2]
+            - s[4] * c[1]
+            + s[5] * c[0]
+        )
+        if det == 0:
+            raise ValueError("The matrix is not invertible.")
+        return Matrix(
+            [
+                [
+                    (a11 * c[5] - a12 * c[4] + a13 * c[3]) / det,
+                    (-a01 * c[5] + a02 * c[4] - a03 * c[3]) / det,
+                    (a31 * s[5] - a32 * s[4] + a33 * s[3]) / det,
+                    (-a21 * s[5] + a22 * s[4] - a23 * s[3]) / det,
+                ],
+                [
+                    (-a10 * c[5] + a12 * c[2] - a13 * c[1]) / det,
+                    (a00 * c[5] - a02 * c[2] + a03 * c[1]) / det,
+                    (-a30 * s[5] + a32 * s[2] - a33 * s[1]) / det,
+                    (a20 * s[5] - a22 * s[2] + a23 * s[1]) / det,
+                ],
+                [
+                    (a10 * c[4] - a11 * c[2] + a13 * c[0]) / det,
+                    (-a00 * c[4] + a01 * c[2] - a03 * c[0]) / det,
+                    (a30 * s[4] - a31 * s[2] + a33 * s[0]) / det,
+                    (-a20 * s[4] + a21 * s[2] - a23 * s[0]) / det,
+                ],
+                [
+                    (-a10 * c[3] + a11 * c[1] - a12 * c[0]) / det,
+                    (a00 * c[3] - a01 * c[1] + a02 * c[0]) / det,
+                    (-a30 * s[3] + a31 * s[1] - a32 * s[0]) / det,
+                    (a20 * s[3] - a21 * s[1] + a22 * s[0]) / det,
+                ],
+            ]
+        )
+
+    def _inverse_lu(self):
+        """
+        Inverse of an arbitrary square matrix by solving LU x = e_k for
+        every column of the identity.
+        """
+
+        lu, permutation, _ = self._lu_decompose()
+        if lu is None:
+            raise ValueError("The matrix is not invertible.")
+        n = self.rows
+        columns = []
+        for k in range(n):
+            # forward substitution with the permuted unit vector
+            y = [0.0] * n
+            for i in range(n):
+                total = 1.0 if permutation[i] == k else 0.0
+                for j in range(i):
+                    total -= lu[i][j] * y[j]
+                y[i] = total
+            # back substitution
+            x = [0.0] * n
+            for i in reversed(range(n)):
+                total = y[i]
+                for j in range(i + 1, n):
+                    total -= lu[i][j] * x[j]
+                x[i] = total / lu[i][i]
+            columns.append(x)
+        return Matrix(columns).transpose()
 
     def round_matrix(self, digits=4):
         """
         Round the matrix.
         """
 
-        results = []
-        for i in range(self.rows):
-            row = []
-            for j in range(self.columns):
-                row.append(round(self.matrix[i][j], digits))
-            results.append(row)
-        return Matrix(results)
+        return Matrix.from_array(np.round(self.array, digits))
 
     def translate(self, x, y, z):
         """
@@ -82,3 +82,146 @@ class Ray:
         :rtype: str
         """
         return f"Ray(origin={self.origin}, direction={self.direction})"
+
+
+class RayBatch:
+    """
+    This class represents many rays stored as a structure of arrays.
+    """
+
+    def __init__(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        t_min: np.ndarray = None,
+        t_max: np.ndarray = None,
+        pixels: np.ndarray = None,
+    ):
+        """
+        Constructor for the RayBatch class.
+
+        :param origins: N x 3 array of ray origins (or N x 4 with w = 1).
+        :param directions: N x 3 array of ray directions (or N x 4 with w = 0).
+        :param t_min: Optional array of N lower bounds on t, zero by default.
+        :param t_max: Optional array of N upper bounds on t, infinite by default.
+        :param pixels: Optional N x 2 integer array of (x, y) pixel indices.
+        """
+        origins = np.atleast_2d(np.asarray(origins, dtype=np.float64))
+        directions = np.atleast_2d(np.asarray(directions, dtype=np.float64))
+        if origins.shape[1] == 4:
+            if not np.all(origins[:, 3] == 1):
+                raise ValueError("Origins are not points.")
+            origins = origins[:, :3]
+        if directions.shape[1] == 4:
+            if not np.all(directions[:, 3] == 0):
+                raise ValueError("directions are not vectors.")
+            directions = directions[:, :3]
+        if origins.shape[1] != 3 or origins.shape != directions.shape:
+            raise ValueError("Origins and directions must both be N x 3 arrays.")
+        count = len(origins)
+        self.origins = np.ascontiguousarray(origins)
+        self.directions = np.ascontiguousarray(directions)
+        self.t_min = (
+            np.zeros(count)
+            if t_min is None
+            else np.broadcast_to(np.asarray(t_min, dtype=np.float64), (count,)).copy()
+        )
+        self.t_max = (
+            np.full(count, np.inf)
+            if t_max is None
+            else np.broadcast_to(np.asarray(t_max, dtype=np.float64), (count,)).copy()
+        )
+        self.pixels = None if pixels is None else np.asarray(pixels, dtype=np.int64)
+
+    @classmethod
+    def from_rays(cls, ray_list, pixels=None):
+        """
+        Builds a batch from a list of Ray objects.
+
+        :param ray_list: The rays to pack.
+        :param pixels: Optional N x 2 array of pixel indices.
+        :return: The packed rays.
+        :rtype: RayBatch
+        """
+        origins = [(r.origin.x(), r.origin.y(), r.origin.z()) for r in ray_list]
+        directions = [
+            (r.direction.x(), r.direction.y(), r.direction.z()) for r in ray_list
+        ]
+        return cls(
+            np.array(origins, dtype=np.float64).reshape(-1, 3),
+            np.array(directions, dtype=np.float64).reshape(-1, 3),
+            pixels=pixels,
+        )
+
+    def to_rays(self):
+        """
+        Unpacks the batch into a list of Ray objects.
+
+        :return: One Ray per entry of the batch.
+        :rtype: list
+        """
+        return [
+            Ray(tuples.Point(*origin), tuples.Vector(*direction))
+            for origin, direction in zip(
+                self.origins.tolist(), self.directions.tolist()
+            )
+        ]
+
+    def __len__(self):
+        """
+        Returns the number of rays in the batch.
+        """
+        return len(self.origins)
+
+    def __getitem__(self, index):
+        """
+        Returns a single Ray for an integer index, or a sub-batch for a
+        slice, an index array or a boolean mask.
+        """
+        if isinstance(index, (int, np.integer)):
+            return Ray(
+                tuples.Point(*self.origins[index].tolist()),
+                tuples.Vector(*self.directions[index].tolist()),
+            )
+        return RayBatch(
+            self.origins[index],
+            self.directions[index],
+            self.t_min[index],
+            self.t_max[index],
+            None if self.pixels is None else self.pixels[index],
+        )
+
+    def position(self, t) -> np.ndarray:
+        """
+        Returns the positions of the rays at t.
+
+        :param t: A scalar or an array with one value per ray.
+        :return: N x 3 array of positions.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        if t.ndim == 0:
+            return self.origins + self.directions * t
+        return self.origins + self.directions * t[:, np.newaxis]
+
+    def transform(self, trans: matrix.Matrix):
+        """
+        Transforms every ray in the batch by the given matrix.
+
+        :param trans: The matrix to transform the rays by.
+        :type trans: matrix.Matrix
+        :return: The transformed rays, sharing the t bounds and pixels.
+        :rtype: RayBatch
+        """
+        results = RayBatch.__new__(RayBatch)
+        results.origins = trans.transform_points(self.origins)
+        results.directions = trans.transform_vectors(self.directions)
+        results.t_min = self.t_min
+        results.t_max = self.t_max
+        results.pixels = self.pixels
+        return results
+
+    def __repr__(self):
+        """
+        Returns a string representation of the batch.
+        """
+        return f"RayBatch(count={len(self)})"
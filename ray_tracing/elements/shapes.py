@@ -15,13 +15,18 @@ import ray_tracing.elements.tuples as tuples
 import ray_tracing.elements.matrix as matrix
 import ray_tracing.elements.materials as materials
 import ray_tracing.elements.rays as rays
+import ray_tracing.elements.bounds as bounds
 import ray_tracing.operations.intersection as intersection
 import ray_tracing.utils.utils as utils
+import ray_tracing.utils.changes as changes
 
 
-class Shape:
+class Shape(changes.Watchable):
     """
     This class represents a shape in 3D space.
+    Setting the transform increments the counters watching the shape's
+    "transform" aspect, such as the one a world checks its BVH against;
+    setting the material increments those watching its "material" aspect.
     """
 
     def __init__(
@@ -30,6 +35,7 @@ class Shape:
         """
         Constructor for the Shape class.
         """
+        self.inversion_count = 0
         self.transform = transform
         self.material = material
         if id is None:
@@ -59,6 +65,107 @@ class Shape:
         """
         return self.transform == other.transform and self.material == other.material
 
+    @property
+    def transform(self):
+        """
+        Returns the object-to-world transform of the shape.
+        """
+        return self._transform
+
+    @transform.setter
+    def transform(self, transform):
+        """
+        Sets the transform and drops the cached inverse and normal matrices.
+        """
+        self._transform = transform
+        self._inverse_transform = None
+        self._normal_transform = None
+        self._world_bounds = None
+        self._changed("transform")
+
+    @property
+    def material(self):
+        """
+        Returns the material of the shape.
+        """
+        return self._material
+
+    @material.setter
+    def material(self, material):
+        """
+        Sets the material and notifies the watchers.
+        """
+        self._material = material
+        self._changed("material")
+
+    @property
+    def inverse_transform(self):
+        """
+        Returns the world-to-object transform, inverted once per transform change.
+        """
+        if self._inverse_transform is None:
+            self._inverse_transform = self._transform.inverse()
+            self.inversion_count += 1
+        return self._inverse_transform
+
+    @property
+    def normal_transform(self):
+        """
+        Returns the transpose of the inverse transform, used to map normals.
+        """
+        if self._normal_transform is None:
+            self._normal_transform = self.inverse_transform.transpose()
+        return self._normal_transform
+
+    def local_bounds(self) -> bounds.BoundingBox:
+        """
+        Returns the object-space bounding box of the shape.
+        Shapes without a known extent are unbounded.
+        """
+        return bounds.BoundingBox.infinite()
+
+    def world_bounds(self) -> bounds.BoundingBox:
+        """
+        Returns the world-space bounding box, recomputed once per transform.
+        """
+        if self._world_bounds is None:
+            self._world_bounds = self.local_bounds().transform(self._transform)
+            self._world_bounded = self._world_bounds.is_bounded()
+        return self._world_bounds
+
+    def may_intersect(
+        self, ray: rays.Ray, t_min=-bounds.INFINITY, t_max=bounds.INFINITY
+    ) -> bool:
+        """
+        Cheap world-space slab test: False only if the ray misses the
+        bounding box between t_min and t_max, in which case it cannot
+        intersect the shape there.
+        """
+        box = self.world_bounds()
+        if not self._world_bounded:
+            return True
+        origin = ray.origin
+        direction = ray.direction
+        t_near, t_far = bounds.slab_interval(
+            box.minimum,
+            box.maximum,
+            (origin.x(), origin.y(), origin.z()),
+            bounds.inverse_direction((direction.x(), direction.y(), direction.z())),
+        )
+        return t_near <= t_far and t_far >= t_min and t_near <= t_max
+
+    def may_intersect_batch(self, batch: rays.RayBatch) -> np.ndarray:
+        """
+        Vectorized may_intersect, returns a boolean mask over the batch.
+        """
+        box = self.world_bounds()
+        if not self._world_bounded:
+            return np.ones(len(batch), dtype=bool)
+        t_near, t_far = box.intersect_intervals(
+            batch.origins, bounds.inverse_directions(batch.directions)
+        )
+        return t_near <= t_far
+
     def set_transform(self, transform):
         """
         Sets the transform of the shape.
@@ -87,45 +194,43 @@ class Shape:
         """
         Translates the shape by the given values.
         """
-        self.transform = matrix.translation(x, y, z) * self.transform
+        self.transform = self.transform.translate(x, y, z)
 
     def scale(self, x: float, y, z):
         """
         Scales the shape by the given values.
         """
-        self.transform = matrix.scaling(x, y, z) * self.transform
+        self.transform = self.transform.scale(x, y, z)
 
     def rotate_x(self, r):
         """
         Rotates the shape around the x-axis by the given value.
         """
-        self.transform = matrix.rotation_x(r) * self.transform
+        self.transform = self.transform.rotate_x(r)
 
     def rotate_y(self, r):
         """
         Rotates the shape around the y-axis by the given value.
         """
-        self.transform = matrix.rotation_y(r) * self.transform
+        self.transform = self.transform.rotate_y(r)
 
     def rotate_z(self, r):
         """
         Rotates the shape around the z-axis by the given value.
         """
-        self.transform = matrix.rotation_z(r) * self.transform
+        self.transform = self.transform.rotate_z(r)
 
     def rotate(self, angle_x=0, angle_y=0, angle_z=0, order="xyz"):
         """
         Rotates the shape around the given axes by the given values.
         """
-        self.transform = (
-            matrix.rotation(angle_x, angle_y, angle_z, order) * self.transform
-        )
+        self.transform = self.transform.rotate(angle_x, angle_y, angle_z, order)
 
     def shear(self, xy, xz, yx, yz, zx, zy):
         """
         Shears the shape by the given values.
         """
-        self.transform = matrix.shearing(xy, xz, yx, yz, zx, zy) * self.transform
+        self.transform = self.transform.shear(xy, xz, yx, yz, zx, zy)
 
     def local_intersect(self, ray: rays.Ray):
         """
@@ -135,6 +240,13 @@ class Shape:
         print(f"local_intersect not implemented.")
         # raise NotImplementedError("local_intersect not implemented.")
 
+    def local_intersect_ts(self, ray: rays.Ray):
+        """
+        Returns the t values of the intersections with an object-space ray,
+        without creating Intersection objects.
+        """
+        return [i.t for i in self.local_intersect(ray)]
+
     def local_normal_at(self, point: tuples.Point):
         """
         Returns the normal of the shape at the given point.
@@ -146,10 +258,111 @@ class Shape:
     def intersect(self, ray: rays.Ray):
         """
         Intersects the shape with the given ray.
+        Rays whose line misses the world-space bounds are rejected before
+        being transformed to object space.
         """
-        ray = ray.transform(self.transform.inverse())
+        if not self.may_intersect(ray):
+            return intersection.Intersections()
+        ray = ray.transform(self.inverse_transform)
         return self.local_intersect(ray)
 
+    def intersect_ts(self, ray: rays.Ray):
+        """
+        Returns the t values of the intersections with a world-space ray,
+        without creating Intersection objects.
+        """
+        if not self.may_intersect(ray):
+            return ()
+        return self.local_intersect_ts(ray.transform(self.inverse_transform))
+
+    def occludes(self, ray: rays.Ray, t_max: float) -> bool:
+        """
+        Checks if the shape intersects the ray at some 0 < t < t_max.
+        """
+        if not self.may_intersect(ray, 0, t_max):
+            return False
+        ray = ray.transform(self.inverse_transform)
+        for t in self.local_intersect_ts(ray):
+            if 0 < t < t_max:
+                return True
+        return False
+
+    def closest_t(self, ray: rays.Ray, t_max=bounds.INFINITY):
+        """
+        Returns (t, object-space ray) for the nearest intersection with
+        0 < t < t_max, or None. Rays whose bounds interval starts beyond
+        t_max are rejected before being transformed.
+        """
+        if not self.may_intersect(ray, 0, t_max):
+            return None
+        local_ray = ray.transform(self.inverse_transform)
+        best = None
+        for t in self.local_intersect_ts(local_ray):
+            if 0 < t < t_max:
+                best = t_max = t
+        if best is None:
+            return None
+        return best, local_ray
+
+    def local_intersect_batch(self, batch: rays.RayBatch):
+        """
+        Intersects the shape with a batch of rays given in object space.
+        Returns an N x k array of t values (np.inf where there is no
+        intersection) and a boolean mask of the rays that hit.
+        This default calls local_intersect_ts once per ray, so shapes that
+        only implement the scalar intersection still work in the batch
+        and wavefront paths; subclasses override it with array code.
+        """
+        per_ray = [tuple(self.local_intersect_ts(ray)) for ray in batch.to_rays()]
+        width = max([len(ts) for ts in per_ray], default=0)
+        ts = np.full((len(batch), max(width, 1)), np.inf)
+        for i, values in enumerate(per_ray):
+            ts[i, : len(values)] = values
+        hit = np.array([len(values) > 0 for values in per_ray], dtype=bool)
+        return ts, hit
+
+    def intersect_batch(self, batch: rays.RayBatch):
+        """
+        Intersects the shape with a batch of rays given in world space.
+        Only the rays passing the bounding box test are transformed and
+        intersected; the others are reported as misses.
+        """
+        candidate = self.may_intersect_batch(batch)
+        if candidate.all():
+            return self.local_intersect_batch(batch.transform(self.inverse_transform))
+        local_ts, local_hit = self.local_intersect_batch(
+            batch[candidate].transform(self.inverse_transform)
+        )
+        ts = np.full((len(batch), local_ts.shape[1]), np.inf)
+        ts[candidate] = local_ts
+        hit = np.zeros(len(batch), dtype=bool)
+        hit[candidate] = local_hit
+        return ts, hit
+
+    def local_normal_at_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Returns the object-space normals at an N x 3 array of object-space points.
+        This default calls local_normal_at once per point, so shapes that
+        only implement the scalar normal still render in the wavefront
+        engine; subclasses override it with array code.
+        """
+        normals = np.empty((len(points), 3))
+        for i, (x, y, z) in enumerate(np.asarray(points, dtype=np.float64).tolist()):
+            normal = self.local_normal_at(tuples.Point(x, y, z))
+            normals[i] = (normal.x(), normal.y(), normal.z())
+        return normals
+
+    def normal_at_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Returns the normalized world-space normals at an N x 3 array of
+        world-space points.
+        """
+        local_points = self.inverse_transform.transform_points(points)
+        local_normals = self.local_normal_at_batch(local_points)
+        world_normals = self.normal_transform.transform_vectors(local_normals)
+        world_normals /= np.linalg.norm(world_normals, axis=1, keepdims=True)
+        return world_normals
+
     def normal_at(self, point: tuples.Point) -> tuples.Vector:
         """
         Returns the normal of the shape at the given point.
@@ -163,14 +376,13 @@ class Shape:
         """
         Transforms the given point from world space to object space.
         """
-        return self.transform.inverse() * point
+        return self.inverse_transform * point
 
     def normal_to_world(self, normal: tuples.Vector):
         """
         Transforms the given normal from object space to world space.
         """
-        object_normal = self.transform.inverse().transpose()
-        object_normal = object_normal * normal
+        object_normal = self.normal_transform * normal
         object_normal = object_normal.to_vector()
         return object_normal.normalize()
 
@@ -193,6 +405,12 @@ class Sphere(Shape):
         super().__init__(id=id, transform=transform, material=material)
         self.radius = radius
 
+    def local_bounds(self) -> bounds.BoundingBox:
+        """
+        Returns the bounding box of the unit sphere.
+        """
+        return bounds.BoundingBox((-1, -1, -1), (1, 1, 1))
+
     def __repr__(self):
         return f"Sphere(id={self.id}, radius={self.radius}, transform=\n{self.transform}, material={self.material})"
 
@@ -200,6 +418,12 @@ class Sphere(Shape):
         """
         Intersects the sphere with the given ray.
         """
+        return intersection.Intersections.from_ts(self.local_intersect_ts(ray), self)
+
+    def local_intersect_ts(self, ray: rays.Ray):
+        """
+        Returns the t values at which the ray enters and leaves the sphere.
+        """
         sphere_to_ray = ray.origin - tuples.Point(0, 0, 0)
         a = ray.direction.dot(ray.direction)
         b = 2 * ray.direction.dot(sphere_to_ray)
@@ -207,14 +431,32 @@ class Sphere(Shape):
         discriminant = b**2 - 4 * a * c
 
         if discriminant < 0:
-            return intersection.Intersections()
+            return ()
 
         t1 = (-b - math.sqrt(discriminant)) / (2 * a)
         t2 = (-b + math.sqrt(discriminant)) / (2 * a)
-        intersection_1 = intersection.Intersection(t1, self)
-        intersection_2 = intersection.Intersection(t2, self)
-        intersections = intersection.Intersections(intersection_1, intersection_2)
-        return intersections
+        return (t1, t2)
+
+    def local_intersect_batch(self, batch: rays.RayBatch):
+        """
+        Intersects the sphere with every ray of an object-space batch.
+        Column 0 holds t0 and column 1 holds t1 (t0 <= t1 for a
+        non-degenerate ray); both are np.inf where the ray misses.
+        """
+        origins = batch.origins
+        directions = batch.directions
+        a = np.einsum("ij,ij->i", directions, directions)
+        b = 2 * np.einsum("ij,ij->i", directions, origins)
+        c = np.einsum("ij,ij->i", origins, origins) - 1
+        discriminant = b**2 - 4 * a * c
+
+        hit = discriminant >= 0
+        root = np.sqrt(np.where(hit, discriminant, 0.0))
+        ts = np.full((len(batch), 2), np.inf)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ts[hit, 0] = (-b[hit] - root[hit]) / (2 * a[hit])
+            ts[hit, 1] = (-b[hit] + root[hit]) / (2 * a[hit])
+        return ts, hit
 
     def local_normal_at(self, point: tuples.Point):
         """
@@ -222,6 +464,12 @@ class Sphere(Shape):
         """
         return point - tuples.Point(0, 0, 0)
 
+    def local_normal_at_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Returns the normals of the sphere at an N x 3 array of points.
+        """
+        return np.array(points, dtype=np.float64)
+
 
 class Plane(Shape):
     """
@@ -239,6 +487,15 @@ class Plane(Shape):
         """
         super().__init__(id=id, transform=transform, material=material)
 
+    def local_bounds(self) -> bounds.BoundingBox:
+        """
+        Returns the bounding box of the xz plane, infinite in x and z.
+        """
+        return bounds.BoundingBox(
+            (-bounds.INFINITY, 0, -bounds.INFINITY),
+            (bounds.INFINITY, 0, bounds.INFINITY),
+        )
+
     def __repr__(self):
         return f"Plane(id={self.id}, transform=\n{self.transform}, material={self.material})"
 
@@ -246,14 +503,38 @@ class Plane(Shape):
         """
         Intersects the plane with the given ray.
         """
+        return intersection.Intersections.from_ts(self.local_intersect_ts(ray), self)
+
+    def local_intersect_ts(self, ray: rays.Ray):
+        """
+        Returns the t value at which the ray crosses the plane, if any.
+        """
         if abs(ray.direction.y()) < EPSILON:
-            return intersection.Intersections()
+            return ()
+        return (-ray.origin.y() / ray.direction.y(),)
 
-        t = -ray.origin.y() / ray.direction.y()
-        return intersection.Intersections(intersection.Intersection(t, self))
+    def local_intersect_batch(self, batch: rays.RayBatch):
+        """
+        Intersects the plane with every ray of an object-space batch.
+        Rays whose direction has |y| < EPSILON are parallel (or coplanar)
+        and miss; their t is np.inf.
+        """
+        direction_y = batch.directions[:, 1]
+        hit = np.abs(direction_y) >= EPSILON
+        ts = np.full((len(batch), 1), np.inf)
+        ts[hit, 0] = -batch.origins[hit, 1] / direction_y[hit]
+        return ts, hit
 
     def local_normal_at(self, point: tuples.Point):
         """
         Returns the normal of the plane at the given point.
         """
         return tuples.Vector(0, 1, 0)
+
+    def local_normal_at_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Returns the normals of the plane at an N x 3 array of points.
+        """
+        normals = np.zeros((len(points), 3))
+        normals[:, 1] = 1
+        return normals
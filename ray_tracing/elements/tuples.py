@@ -1,4 +1,11 @@
-import numpy as np
+import math
+
+
+def _close(a, b):
+    """
+    Element-wise closeness with the same tolerances as np.allclose.
+    """
+    return abs(a - b) <= 1e-08 + 1e-05 * abs(b)
 
 
 class Tuple:
@@ -6,95 +13,149 @@ class Tuple:
     A tuple_t with 4 values
     """
 
+    __slots__ = ("_x", "_y", "_z", "_w")
+
     def __init__(self, x, y, z, w):
-        self.tuple_t = (x, y, z, w)
+        self._x = x
+        self._y = y
+        self._z = z
+        self._w = w
+
+    @property
+    def tuple_t(self):
+        return (self._x, self._y, self._z, self._w)
+
+    @tuple_t.setter
+    def tuple_t(self, values):
+        self._x, self._y, self._z, self._w = values
 
     def __getitem__(self, index):
-        return self.tuple_t[index]
+        return (self._x, self._y, self._z, self._w)[index]
 
     def __setitem__(self, index, value):
-        self.tuple_t = list(self.tuple_t)
-        self.tuple_t[index] = value
-        self.tuple_t = tuple(self.tuple_t)
+        values = [self._x, self._y, self._z, self._w]
+        values[index] = value
+        self._x, self._y, self._z, self._w = values
+
+    def __iter__(self):
+        return iter((self._x, self._y, self._z, self._w))
+
+    def __len__(self):
+        return 4
 
     def __eq__(self, other):
-        return np.allclose(self.tuple_t, other.tuple_t)
+        return (
+            _close(self._x, other._x)
+            and _close(self._y, other._y)
+            and _close(self._z, other._z)
+            and _close(self._w, other._w)
+        )
+
+    __hash__ = None
 
     def __add__(self, other):
-        return Tuple(*(a + b for a, b in zip(self.tuple_t, other.tuple_t)))
+        return Tuple(
+            self._x + other._x,
+            self._y + other._y,
+            self._z + other._z,
+            self._w + other._w,
+        )
 
     def __sub__(self, other):
-        return Tuple(*(a - b for a, b in zip(self.tuple_t, other.tuple_t)))
+        return Tuple(
+            self._x - other._x,
+            self._y - other._y,
+            self._z - other._z,
+            self._w - other._w,
+        )
 
     def __neg__(self):
-        return Tuple(*(-a for a in self.tuple_t))
+        return Tuple(-self._x, -self._y, -self._z, -self._w)
 
     def __mul__(self, other):
         results = None
         if isinstance(other, Tuple):
-            results = Tuple(*(a * b for a, b in zip(self.tuple_t, other.tuple_t)))
+            results = Tuple(
+                self._x * other._x,
+                self._y * other._y,
+                self._z * other._z,
+                self._w * other._w,
+            )
         elif isinstance(other, (int, float)):
-            results = Tuple(*(a * other for a in self.tuple_t))
+            results = Tuple(
+                self._x * other, self._y * other, self._z * other, self._w * other
+            )
         return results
 
     def __truediv__(self, scalar):
         if scalar == 0:
             raise ZeroDivisionError
-        return Tuple(*(a / scalar for a in self.tuple_t))
+        return Tuple(
+            self._x / scalar, self._y / scalar, self._z / scalar, self._w / scalar
+        )
 
     def __abs__(self):
         magnitude = self.magnitude()
         return magnitude
 
     def __repr__(self):
-        return f"Tuple({self.tuple_t[0]}, {self.tuple_t[1]}, {self.tuple_t[2]}, {self.tuple_t[3]})"
+        return f"Tuple({self._x}, {self._y}, {self._z}, {self._w})"
 
     def __str__(self):
-        return f"Tuple({self.tuple_t[0]}, {self.tuple_t[1]}, {self.tuple_t[2]}, {self.tuple_t[3]})"
+        return f"Tuple({self._x}, {self._y}, {self._z}, {self._w})"
 
     def is_point(self):
-        return self.tuple_t[3] == 1
+        return self._w == 1
 
     def is_vector(self):
-        return self.tuple_t[3] == 0
+        return self._w == 0
 
     def set_tuple(self, x, y, z, w):
-        self.tuple_t = (x, y, z, w)
+        self._x = x
+        self._y = y
+        self._z = z
+        self._w = w
 
     def magnitude(self):
         # normalize the first 3 values
-        magnitude = 0
-        for i in range(len(self.tuple_t) - 1):
-            magnitude += self.tuple_t[i] ** 2
-        magnitude = float(np.sqrt(magnitude))
-        return magnitude
+        return math.sqrt(self._x * self._x + self._y * self._y + self._z * self._z)
 
     def normalize(self):
         return self / self.magnitude()
 
     def dot(self, other):
-        return sum(a * b for a, b in zip(self.tuple_t, other.tuple_t))
+        return (
+            self._x * other._x
+            + self._y * other._y
+            + self._z * other._z
+            + self._w * other._w
+        )
 
     def cross(self, other):
         if not self.is_vector() or not other.is_vector():
             raise ValueError("Cross product is only defined for vectors")
         return Vector(
-            self.tuple_t[1] * other.tuple_t[2] - self.tuple_t[2] * other.tuple_t[1],
-            self.tuple_t[2] * other.tuple_t[0] - self.tuple_t[0] * other.tuple_t[2],
-            self.tuple_t[0] * other.tuple_t[1] - self.tuple_t[1] * other.tuple_t[0],
+            self._y * other._z - self._z * other._y,
+            self._z * other._x - self._x * other._z,
+            self._x * other._y - self._y * other._x,
         )
 
     def round(self, precision=5):
-        return Tuple(*(round(a, precision) for a in self.tuple_t))
+        return Tuple(
+            round(self._x, precision),
+            round(self._y, precision),
+            round(self._z, precision),
+            round(self._w, precision),
+        )
 
     def to_point(self):
-        return Point(self.tuple_t[0], self.tuple_t[1], self.tuple_t[2])
+        return Point(self._x, self._y, self._z)
 
     def to_vector(self):
-        return Vector(self.tuple_t[0], self.tuple_t[1], self.tuple_t[2])
+        return Vector(self._x, self._y, self._z)
 
     def to_color(self):
-        return Color(self.tuple_t[0], self.tuple_t[1], self.tuple_t[2], self.tuple_t[3])
+        return Color(self._x, self._y, self._z, self._w)
 
     # def reflect(self, normal):
     #     return self - normal * 2 * self.dot(normal)
@@ -105,36 +166,41 @@ class Point(Tuple):
     A point in 3D space
     """
 
+    __slots__ = ()
+
     def __init__(self, x, y, z):
-        super().__init__(x, y, z, 1)
+        self._x = x
+        self._y = y
+        self._z = z
+        self._w = 1
 
     def __repr__(self):
-        return f"Point({self.tuple_t[0]}, {self.tuple_t[1]}, {self.tuple_t[2]})"
+        return f"Point({self._x}, {self._y}, {self._z})"
 
     def __str__(self):
-        return f"Point({self.tuple_t[0]}, {self.tuple_t[1]}, {self.tuple_t[2]})"
+        return f"Point({self._x}, {self._y}, {self._z})"
 
     def __add__(self, other):
-        return super().__add__(other).to_point()
+        return Point(self._x + other._x, self._y + other._y, self._z + other._z)
 
     def __sub__(self, other):
-        results = super().__sub__(other)
         if isinstance(other, Point):
-            return Vector(results.tuple_t[0], results.tuple_t[1], results.tuple_t[2])
+            return Vector(self._x - other._x, self._y - other._y, self._z - other._z)
         elif isinstance(other, Vector):
-            return Point(results.tuple_t[0], results.tuple_t[1], results.tuple_t[2])
+            return Point(self._x - other._x, self._y - other._y, self._z - other._z)
+        return super().__sub__(other)
 
     def __neg__(self):
-        return super().__neg__().to_point()
+        return Point(-self._x, -self._y, -self._z)
 
     def x(self):
-        return self.tuple_t[0]
+        return self._x
 
     def y(self):
-        return self.tuple_t[1]
+        return self._y
 
     def z(self):
-        return self.tuple_t[2]
+        return self._z
 
     def w(self):
         return 1
@@ -148,57 +214,75 @@ class Vector(Tuple):
     A vector in 3D space
     """
 
+    __slots__ = ()
+
     def __init__(self, x, y, z):
-        super().__init__(x, y, z, 0)
+        self._x = x
+        self._y = y
+        self._z = z
+        self._w = 0
 
     def __repr__(self):
-        return f"Vector({self.tuple_t[0]}, {self.tuple_t[1]}, {self.tuple_t[2]})"
+        return f"Vector({self._x}, {self._y}, {self._z})"
 
     def __str__(self):
-        return f"Vector({self.tuple_t[0]}, {self.tuple_t[1]}, {self.tuple_t[2]})"
+        return f"Vector({self._x}, {self._y}, {self._z})"
 
     def __add__(self, other):
-        results = super().__add__(other)
-        if not isinstance(other, Vector):
-            return Vector(results.tuple_t[0], results.tuple_t[1], results.tuple_t[2])
+        if isinstance(other, Vector):
+            return Vector(self._x + other._x, self._y + other._y, self._z + other._z)
         elif isinstance(other, Point):
-            return Point(results.tuple_t[0], results.tuple_t[1], results.tuple_t[2])
+            return Point(self._x + other._x, self._y + other._y, self._z + other._z)
+        return super().__add__(other)
 
     def __sub__(self, other):
-        results = super().__sub__(other)
         if isinstance(other, Vector):
-            return Vector(results.tuple_t[0], results.tuple_t[1], results.tuple_t[2])
+            return Vector(self._x - other._x, self._y - other._y, self._z - other._z)
         elif isinstance(other, Point):
-            return Point(results.tuple_t[0], results.tuple_t[1], results.tuple_t[2])
+            return Point(self._x - other._x, self._y - other._y, self._z - other._z)
+        return super().__sub__(other)
 
     def __neg__(self):
-        return super().__neg__().to_vector()
+        return Vector(-self._x, -self._y, -self._z)
 
     def __mul__(self, other):
-        if isinstance(other, int) or isinstance(other, float):
-            new_vector = [a * other for a in self.tuple_t][:-1]
-            new_vector = Vector(*new_vector)
-        else:
-            raise ValueError("Vector can only be multiplied by a scalar")
-        return new_vector
+        if isinstance(other, (int, float)):
+            return Vector(self._x * other, self._y * other, self._z * other)
+        raise ValueError("Vector can only be multiplied by a scalar")
+
+    def __truediv__(self, scalar):
+        if scalar == 0:
+            raise ZeroDivisionError
+        return Vector(self._x / scalar, self._y / scalar, self._z / scalar)
 
     def dot(self, other):
-        return super().dot(other)
+        return self._x * other._x + self._y * other._y + self._z * other._z
 
     def cross(self, other):
-        return super().cross(other).to_vector()
+        if not other.is_vector():
+            raise ValueError("Cross product is only defined for vectors")
+        return Vector(
+            self._y * other._z - self._z * other._y,
+            self._z * other._x - self._x * other._z,
+            self._x * other._y - self._y * other._x,
+        )
 
     def normalize(self):
-        return super().normalize().to_vector()
+        magnitude = math.sqrt(
+            self._x * self._x + self._y * self._y + self._z * self._z
+        )
+        if magnitude == 0:
+            raise ZeroDivisionError
+        return Vector(self._x / magnitude, self._y / magnitude, self._z / magnitude)
 
     def x(self):
-        return self.tuple_t[0]
+        return self._x
 
     def y(self):
-        return self.tuple_t[1]
+        return self._y
 
     def z(self):
-        return self.tuple_t[2]
+        return self._z
 
     def w(self):
         return 0
@@ -217,45 +301,65 @@ class Color(Tuple):
     A color in RGB space
     """
 
+    __slots__ = ()
+
     def __init__(self, r, g, b, a=0):
-        super().__init__(r, g, b, a)
+        self._x = r
+        self._y = g
+        self._z = b
+        self._w = a
 
     def __repr__(self):
-        return f"Color({self.tuple_t[0]}, {self.tuple_t[1]}, {self.tuple_t[2]}, {self.tuple_t[3]})"
+        return f"Color({self._x}, {self._y}, {self._z}, {self._w})"
 
     def __str__(self):
-        return f"Color({self.tuple_t[0]}, {self.tuple_t[1]}, {self.tuple_t[2]}, {self.tuple_t[3]})"
+        return f"Color({self._x}, {self._y}, {self._z}, {self._w})"
 
     def __add__(self, other):
-        return super().__add__(other).to_color()
+        return Color(
+            self._x + other._x,
+            self._y + other._y,
+            self._z + other._z,
+            self._w + other._w,
+        )
 
     def __sub__(self, other):
-        return super().__sub__(other).to_color()
+        return Color(
+            self._x - other._x,
+            self._y - other._y,
+            self._z - other._z,
+            self._w - other._w,
+        )
 
     def __mul__(self, other):
         results = None
         if isinstance(other, Color):
             results = self.hadamard_product(other)
-        elif isinstance(other, int) or isinstance(other, float):
+        elif isinstance(other, (int, float)):
             results = Color(
-                *[a * other for a in self.tuple_t],
+                self._x * other, self._y * other, self._z * other, self._w * other
             )
         return results
 
     def r(self):
-        return self.tuple_t[0]
+        return self._x
 
     def g(self):
-        return self.tuple_t[1]
+        return self._y
 
     def b(self):
-        return self.tuple_t[2]
+        return self._z
 
     def a(self):
-        return self.tuple_t[3]
+        return self._w
 
     def set_color(self, r, g, b, a=0):
         self.set_tuple(r, g, b, a)
 
     def hadamard_product(self, other):
-        return Color(*[a * b for a, b in zip(self.tuple_t, other.tuple_t)])
+        return Color(
+            self._x * other._x,
+            self._y * other._y,
+            self._z * other._z,
+            self._w * other._w,
+        )
@@ -0,0 +1,527 @@
+"""
+This module contains the bounding volume hierarchy used to accelerate
+ray-world intersection.
+"""
+from __future__ import annotations
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import heapq
+import time
+import numpy as np
+from typing import List
+import typing
+import ray_tracing.elements.bounds as bounds
+import ray_tracing.elements.rays as rays
+
+if typing.TYPE_CHECKING:
+    import ray_tracing.elements.shapes as shapes
+
+# relative costs used by the surface area heuristic
+TRAVERSAL_COST = 1.0
+INTERSECTION_COST = 1.0
+# a refitted hierarchy is rebuilt once its SAH cost exceeds the cost it
+# had when it was built by this factor
+REBUILD_COST_RATIO = 1.3
+
+
+class BVH:
+    """
+    A bounding volume hierarchy over the world-space bounds of shapes,
+    built with a binned surface area heuristic.
+
+    Nodes are stored in flat arrays: node i covers node_min[i]..node_max[i];
+    an inner node has children node_left[i] and node_right[i], a leaf has
+    node_left[i] == -1 and holds order[node_start[i]:node_start[i] + node_count[i]].
+    Children always come after their parent, which lets refit() update the
+    boxes bottom-up by visiting nodes in decreasing order.
+    """
+
+    def __init__(
+        self,
+        shape_list: List[shapes.Shape],
+        indices: List[int] = None,
+        max_leaf_size: int = 4,
+        bins: int = 12,
+    ):
+        """
+        Constructor for the BVH class.
+
+        :param shape_list: Bounded shapes to organize.
+        :param indices: Index reported for each shape on a hit, defaults to
+            its position in shape_list.
+        :param max_leaf_size: Leaves larger than this are always split.
+        :param bins: Number of SAH bins per axis.
+        """
+        start = time.perf_counter()
+        self.shapes = list(shape_list)
+        self.indices = (
+            list(range(len(self.shapes))) if indices is None else list(indices)
+        )
+        self.max_leaf_size = max_leaf_size
+        self.bins = bins
+
+        count = len(self.shapes)
+        self.primitive_min = np.empty((count, 3))
+        self.primitive_max = np.empty((count, 3))
+        for i, shape in enumerate(self.shapes):
+            box = shape.world_bounds()
+            self.primitive_min[i] = box.minimum
+            self.primitive_max[i] = box.maximum
+
+        self.order = []
+        self._min = []
+        self._max = []
+        self.node_left = []
+        self.node_right = []
+        self.node_start = []
+        self.node_count = []
+        self.depth = 0
+        if count:
+            self._build(np.arange(count), 1)
+        self.node_min = np.array(self._min, dtype=np.float64).reshape(-1, 3)
+        self.node_max = np.array(self._max, dtype=np.float64).reshape(-1, 3)
+
+        self.node_parent = [-1] * len(self.node_left)
+        self.primitive_leaf = [-1] * count
+        for node, left in enumerate(self.node_left):
+            if left == -1:
+                start_index = self.node_start[node]
+                for i in self.order[start_index : start_index + self.node_count[node]]:
+                    self.primitive_leaf[i] = node
+            else:
+                self.node_parent[left] = node
+                self.node_parent[self.node_right[node]] = node
+        self.position_of = {index: i for i, index in enumerate(self.indices)}
+
+        self.build_cost = self.sah_cost(normalized=False)
+        self.build_time = time.perf_counter() - start
+        self.refits = 0
+        self.refit_time = 0.0
+        self.reset_traversal_stats()
+
+    def __len__(self):
+        """
+        Returns the number of shapes in the hierarchy.
+        """
+        return len(self.shapes)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the hierarchy.
+        """
+        return (
+            f"BVH(shapes={len(self.shapes)}, nodes={len(self.node_left)}, "
+            f"depth={self.depth})"
+        )
+
+    # construction
+    def _new_node(self, indices):
+        node = len(self.node_left)
+        self._min.append(self.primitive_min[indices].min(axis=0))
+        self._max.append(self.primitive_max[indices].max(axis=0))
+        self.node_left.append(-1)
+        self.node_right.append(-1)
+        self.node_start.append(0)
+        self.node_count.append(0)
+        return node
+
+    def _make_leaf(self, node, indices):
+        self.node_start[node] = len(self.order)
+        self.node_count[node] = len(indices)
+        self.order.extend(int(i) for i in indices)
+
+    def _build(self, indices, depth):
+        self.depth = max(self.depth, depth)
+        node = self._new_node(indices)
+        if len(indices) <= 1:
+            self._make_leaf(node, indices)
+            return node
+
+        split = self._find_split(node, indices)
+        if split is None:
+            if len(indices) <= self.max_leaf_size:
+                self._make_leaf(node, indices)
+                return node
+            # no useful SAH split: fall back to a median split on the widest axis
+            centroids = (self.primitive_min[indices] + self.primitive_max[indices]) / 2
+            axis = int(np.argmax(centroids.max(axis=0) - centroids.min(axis=0)))
+            ordered = indices[np.argsort(centroids[:, axis], kind="stable")]
+            half = len(ordered) // 2
+            left, right = ordered[:half], ordered[half:]
+        else:
+            left, right = split
+
+        self.node_left[node] = self._build(left, depth + 1)
+        self.node_right[node] = self._build(right, depth + 1)
+        return node
+
+    def _find_split(self, node, indices):
+        """
+        Returns the (left, right) partition with the lowest SAH cost, or
+        None when keeping a leaf is cheaper (and the leaf is small enough).
+        """
+        lows = self.primitive_min[indices]
+        highs = self.primitive_max[indices]
+        centroids = (lows + highs) / 2
+        centroid_min = centroids.min(axis=0)
+        extent = centroids.max(axis=0) - centroid_min
+        parent_area = _surface_areas(self._min[node], self._max[node])
+        leaf_cost = INTERSECTION_COST * len(indices)
+
+        best = None
+        best_cost = np.inf
+        for axis in range(3):
+            if extent[axis] <= 0:
+                continue
+            from_min = centroids[:, axis] - centroid_min[axis]
+            bin_ids = from_min / extent[axis] * self.bins
+            bin_ids = np.minimum(bin_ids.astype(np.int64), self.bins - 1)
+            counts = np.bincount(bin_ids, minlength=self.bins)
+            bin_min = np.full((self.bins, 3), np.inf)
+            bin_max = np.full((self.bins, 3), -np.inf)
+            np.minimum.at(bin_min, bin_ids, lows)
+            np.maximum.at(bin_max, bin_ids, highs)
+
+            # sweep: left side holds bins [0, k], right side bins (k, bins)
+            left_min = np.minimum.accumulate(bin_min, axis=0)[:-1]
+            left_max = np.maximum.accumulate(bin_max, axis=0)[:-1]
+            right_min = np.minimum.accumulate(bin_min[::-1], axis=0)[::-1][1:]
+            right_max = np.maximum.accumulate(bin_max[::-1], axis=0)[::-1][1:]
+            left_count = np.cumsum(counts)[:-1]
+            right_count = len(indices) - left_count
+            valid = (left_count > 0) & (right_count > 0)
+            if not np.any(valid):
+                continue
+            with np.errstate(invalid="ignore"):
+                cost = TRAVERSAL_COST + INTERSECTION_COST * (
+                    _surface_areas(left_min, left_max) * left_count
+                    + _surface_areas(right_min, right_max) * right_count
+                ) / max(parent_area, 1e-300)
+            cost = np.where(valid, cost, np.inf)
+            k = int(np.argmin(cost))
+            if cost[k] < best_cost:
+                best_cost = cost[k]
+                best = (axis, k, bin_ids)
+
+        if best is None:
+            return None
+        if best_cost >= leaf_cost and len(indices) <= self.max_leaf_size:
+            return None
+        axis, k, bin_ids = best
+        on_left = bin_ids <= k
+        return indices[on_left], indices[~on_left]
+
+    # refitting
+    def refit(self, indices: List[int] = None):
+        """
+        Re-reads the world bounds of the shapes with the given indices (all
+        shapes by default) and grows or shrinks the boxes of their leaves
+        and ancestors to fit, keeping the tree topology. Returns the time
+        taken in seconds.
+        """
+        start = time.perf_counter()
+        if indices is None:
+            positions = range(len(self.shapes))
+        else:
+            positions = [self.position_of[index] for index in indices]
+        pending = []
+        queued = set()
+        for i in positions:
+            box = self.shapes[i].world_bounds()
+            self.primitive_min[i] = box.minimum
+            self.primitive_max[i] = box.maximum
+            leaf = self.primitive_leaf[i]
+            if leaf not in queued:
+                queued.add(leaf)
+                heapq.heappush(pending, -leaf)
+
+        # children come after their parent, so the highest pending node
+        # never has a pending descendant
+        while pending:
+            node = -heapq.heappop(pending)
+            left = self.node_left[node]
+            if left == -1:
+                start_index = self.node_start[node]
+                members = self.order[start_index : start_index + self.node_count[node]]
+                low = self.primitive_min[members].min(axis=0)
+                high = self.primitive_max[members].max(axis=0)
+            else:
+                right = self.node_right[node]
+                low = np.minimum(self.node_min[left], self.node_min[right])
+                high = np.maximum(self.node_max[left], self.node_max[right])
+            if np.array_equal(low, self.node_min[node]) and np.array_equal(
+                high, self.node_max[node]
+            ):
+                continue
+            self.node_min[node] = low
+            self.node_max[node] = high
+            self._min[node] = low
+            self._max[node] = high
+            parent = self.node_parent[node]
+            if parent != -1 and parent not in queued:
+                queued.add(parent)
+                heapq.heappush(pending, -parent)
+
+        elapsed = time.perf_counter() - start
+        self.refits += 1
+        self.refit_time += elapsed
+        return elapsed
+
+    def sah_cost(self, normalized: bool = True):
+        """
+        Returns the surface area heuristic cost of the tree: the expected
+        cost of tracing a ray that hits the root box. Unnormalized, the
+        cost is not divided by the area of the root.
+        """
+        if not self.node_left:
+            return 0.0
+        areas = _surface_areas(self.node_min, self.node_max)
+        inner = np.asarray(self.node_left) != -1
+        counts = np.asarray(self.node_count)
+        cost = TRAVERSAL_COST * areas[inner].sum()
+        cost += INTERSECTION_COST * (areas[~inner] * counts[~inner]).sum()
+        if normalized:
+            cost /= max(areas[0], 1e-300)
+        return float(cost)
+
+    def cost_ratio(self):
+        """
+        Returns the unnormalized SAH cost relative to its value after the
+        build. Refitting stretches the boxes above moved shapes and makes
+        it grow; unlike the normalized cost it is not hidden by a growing
+        root box when a few shapes move far away.
+        """
+        return self.sah_cost(normalized=False) / max(self.build_cost, 1e-300)
+
+    def needs_rebuild(self, limit: float = REBUILD_COST_RATIO):
+        """
+        Returns True when refitting has degraded the tree past the limit.
+        """
+        return self.cost_ratio() > limit
+
+    # traversal
+    def reset_traversal_stats(self):
+        """
+        Clears the traversal counters.
+        """
+        self.rays_traced = 0
+        self.nodes_visited = 0
+        self.primitive_tests = 0
+
+    def stats(self):
+        """
+        Returns build and traversal statistics.
+        """
+        leaves = sum(1 for left in self.node_left if left == -1)
+        return {
+            "shapes": len(self.shapes),
+            "nodes": len(self.node_left),
+            "leaves": leaves,
+            "depth": self.depth,
+            "build_time": self.build_time,
+            "sah_cost": self.sah_cost(),
+            "cost_ratio": self.cost_ratio(),
+            "refits": self.refits,
+            "refit_time": self.refit_time,
+            "rays_traced": self.rays_traced,
+            "nodes_visited": self.nodes_visited,
+            "primitive_tests": self.primitive_tests,
+            "nodes_per_ray": self.nodes_visited / max(self.rays_traced, 1),
+            "tests_per_ray": self.primitive_tests / max(self.rays_traced, 1),
+        }
+
+    def candidates(self, ray: rays.Ray):
+        """
+        Yields (index, shape) for every shape whose leaf box the ray's line
+        passes through. Intersections behind the origin are kept, so the
+        result matches a brute-force test of every shape.
+        """
+        self.rays_traced += 1
+        if not self.shapes:
+            return
+        origin = (ray.origin.x(), ray.origin.y(), ray.origin.z())
+        inverse = bounds.inverse_direction(
+            (ray.direction.x(), ray.direction.y(), ray.direction.z())
+        )
+        node_min = self._min
+        node_max = self._max
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            self.nodes_visited += 1
+            t_near, t_far = bounds.slab_interval(
+                node_min[node], node_max[node], origin, inverse
+            )
+            if t_near > t_far:
+                continue
+            left = self.node_left[node]
+            if left == -1:
+                start = self.node_start[node]
+                for i in self.order[start : start + self.node_count[node]]:
+                    self.primitive_tests += 1
+                    yield self.indices[i], self.shapes[i]
+            else:
+                stack.append(self.node_right[node])
+                stack.append(left)
+
+    def occluder(self, ray: rays.Ray, t_max: float):
+        """
+        Returns a shape that intersects the ray at some 0 < t < t_max, or None,
+        skipping nodes outside that segment and stopping at the first hit.
+        """
+        self.rays_traced += 1
+        if not self.shapes:
+            return None
+        origin = (ray.origin.x(), ray.origin.y(), ray.origin.z())
+        inverse = bounds.inverse_direction(
+            (ray.direction.x(), ray.direction.y(), ray.direction.z())
+        )
+        node_min = self._min
+        node_max = self._max
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            self.nodes_visited += 1
+            t_near, t_far = bounds.slab_interval(
+                node_min[node], node_max[node], origin, inverse
+            )
+            if t_near > t_far or t_far < 0 or t_near > t_max:
+                continue
+            left = self.node_left[node]
+            if left == -1:
+                start = self.node_start[node]
+                for i in self.order[start : start + self.node_count[node]]:
+                    self.primitive_tests += 1
+                    if self.shapes[i].occludes(ray, t_max):
+                        return self.shapes[i]
+            else:
+                stack.append(self.node_right[node])
+                stack.append(left)
+        return None
+
+    def closest(self, ray: rays.Ray, t_max: float = bounds.INFINITY):
+        """
+        Returns (t, index, object-space ray) of the nearest hit with
+        0 < t < t_max, or None. Children are visited near to far and nodes
+        starting beyond the best t so far are skipped.
+        """
+        self.rays_traced += 1
+        if not self.shapes:
+            return None
+        origin = (ray.origin.x(), ray.origin.y(), ray.origin.z())
+        inverse = bounds.inverse_direction(
+            (ray.direction.x(), ray.direction.y(), ray.direction.z())
+        )
+        node_min = self._min
+        node_max = self._max
+        best = None
+        t_near, t_far = bounds.slab_interval(node_min[0], node_max[0], origin, inverse)
+        stack = [(0, t_near, t_far)]
+        while stack:
+            node, t_near, t_far = stack.pop()
+            if t_near > t_far or t_far < 0 or t_near >= t_max:
+                continue
+            self.nodes_visited += 1
+            left = self.node_left[node]
+            if left == -1:
+                start = self.node_start[node]
+                for i in self.order[start : start + self.node_count[node]]:
+                    self.primitive_tests += 1
+                    found = self.shapes[i].closest_t(ray, t_max)
+                    if found is not None:
+                        t_max = found[0]
+                        best = (found[0], self.indices[i], found[1])
+            else:
+                right = self.node_right[node]
+                left_near, left_far = bounds.slab_interval(
+                    node_min[left], node_max[left], origin, inverse
+                )
+                right_near, right_far = bounds.slab_interval(
+                    node_min[right], node_max[right], origin, inverse
+                )
+                if left_near <= right_near:
+                    stack.append((right, right_near, right_far))
+                    stack.append((left, left_near, left_far))
+                else:
+                    stack.append((left, left_near, left_far))
+                    stack.append((right, right_near, right_far))
+        return best
+
+    def intersect(self, ray: rays.Ray):
+        """
+        Returns the t values of every intersection of the ray with the
+        shapes in the hierarchy, and the index of the shape of each.
+        """
+        ts, indices = [], []
+        for index, shape in self.candidates(ray):
+            for t in shape.intersect_ts(ray):
+                ts.append(t)
+                indices.append(index)
+        return ts, indices
+
+    def intersect_batch(
+        self,
+        batch: rays.RayBatch,
+        best_t: np.ndarray,
+        best_index: np.ndarray,
+        any_hit: bool = False,
+    ):
+        """
+        Updates best_t/best_index in place with the nearest positive hit of
+        every ray, skipping nodes that start beyond the current best t.
+        With any_hit, a ray stops at the first hit closer than its initial
+        best_t instead of looking for the nearest one.
+        """
+        count = len(batch)
+        self.rays_traced += count
+        if not self.shapes or count == 0:
+            return
+        inverse = bounds.inverse_directions(batch.directions)
+        done = np.zeros(count, dtype=bool)
+        stack = [(0, np.arange(count))]
+        while stack:
+            node, ids = stack.pop()
+            if any_hit:
+                ids = ids[~done[ids]]
+            self.nodes_visited += len(ids)
+            t_near, t_far = bounds.slab_intervals(
+                self.node_min[node],
+                self.node_max[node],
+                batch.origins[ids],
+                inverse[ids],
+            )
+            ids = ids[(t_near <= t_far) & (t_far > 0) & (t_near < best_t[ids])]
+            if len(ids) == 0:
+                continue
+            left = self.node_left[node]
+            if left == -1:
+                sub_batch = batch[ids]
+                start = self.node_start[node]
+                for i in self.order[start : start + self.node_count[node]]:
+                    self.primitive_tests += len(ids)
+                    ts, _ = self.shapes[i].intersect_batch(sub_batch)
+                    ts = np.where(ts > 0, ts, np.inf).min(axis=1)
+                    closer = ts < best_t[ids]
+                    best_t[ids[closer]] = ts[closer]
+                    best_index[ids[closer]] = self.indices[i]
+                    if any_hit and np.any(closer):
+                        done[ids[closer]] = True
+                        ids = ids[~closer]
+                        if len(ids) == 0:
+                            break
+                        sub_batch = batch[ids]
+            else:
+                stack.append((self.node_right[node], ids))
+                stack.append((left, ids))
+
+
+def _surface_areas(lows, highs):
+    """
+    Surface areas of boxes given as (..., 3) arrays of corners.
+    """
+    d = np.maximum(np.asarray(highs) - np.asarray(lows), 0)
+    return 2 * (d[..., 0] * d[..., 1] + d[..., 1] * d[..., 2] + d[..., 2] * d[..., 0])
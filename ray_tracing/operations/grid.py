@@ -0,0 +1,407 @@
+"""
+This module contains the uniform grid used to accelerate ray-world
+intersection in scenes of many similarly sized objects.
+"""
+from __future__ import annotations
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import time
+import numpy as np
+from typing import List
+import typing
+import ray_tracing.elements.bounds as bounds
+import ray_tracing.elements.rays as rays
+
+if typing.TYPE_CHECKING:
+    import ray_tracing.elements.shapes as shapes
+
+# target number of voxels per object, and the largest resolution per axis
+CELLS_PER_OBJECT = 3.0
+MAX_RESOLUTION = 128
+
+
+class UniformGrid:
+    """
+    A uniform grid of voxels over the world-space bounds of shapes,
+    traversed with a 3D digital differential analyzer (3D-DDA).
+
+    Voxel v lists the shapes order[cell_start[v]:cell_start[v] + cell_count[v]],
+    with v = (ix * resolution[1] + iy) * resolution[2] + iz. Shape i is
+    listed in the voxels from cell_low[i] to cell_high[i] on every axis.
+    """
+
+    def __init__(
+        self,
+        shape_list: List[shapes.Shape],
+        indices: List[int] = None,
+        resolution=None,
+    ):
+        """
+        Constructor for the UniformGrid class.
+
+        :param shape_list: Bounded shapes to organize.
+        :param indices: Index reported for each shape on a hit, defaults to
+            its position in shape_list.
+        :param resolution: Voxels per axis, chosen from the shape count and
+            the grid bounds when omitted.
+        """
+        start = time.perf_counter()
+        self.shapes = list(shape_list)
+        self.indices = (
+            list(range(len(self.shapes))) if indices is None else list(indices)
+        )
+
+        count = len(self.shapes)
+        self.primitive_min = np.empty((count, 3))
+        self.primitive_max = np.empty((count, 3))
+        for i, shape in enumerate(self.shapes):
+            box = shape.world_bounds()
+            self.primitive_min[i] = box.minimum
+            self.primitive_max[i] = box.maximum
+
+        if count:
+            self.minimum = self.primitive_min.min(axis=0)
+            self.maximum = self.primitive_max.max(axis=0)
+        else:
+            self.minimum = np.zeros(3)
+            self.maximum = np.zeros(3)
+        if resolution is None:
+            resolution = self._choose_resolution()
+        self.resolution = np.array(resolution, dtype=np.int64)
+        extent = self.maximum - self.minimum
+        # flat axes get a single voxel of nominal size
+        self.cell_size = np.where(extent > 0, extent / self.resolution, 1.0)
+        self._fill()
+        self.build_time = time.perf_counter() - start
+        self.reset_traversal_stats()
+
+    def __len__(self):
+        """
+        Returns the number of shapes in the grid.
+        """
+        return len(self.shapes)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the grid.
+        """
+        resolution = tuple(self.resolution.tolist())
+        return f"UniformGrid(shapes={len(self.shapes)}, resolution={resolution})"
+
+    # construction
+    def _choose_resolution(self):
+        """
+        Picks voxels per axis so that there are about CELLS_PER_OBJECT
+        roughly cubic voxels per shape.
+        """
+        extent = self.maximum - self.minimum
+        count = len(self.shapes)
+        if count == 0:
+            return (1, 1, 1)
+        flat = extent <= 0
+        if flat.all():
+            return (1, 1, 1)
+        # treat flat axes as one voxel and spread the voxels over the others
+        dimensions = int((~flat).sum())
+        volume = np.prod(extent[~flat])
+        cells_per_unit = (CELLS_PER_OBJECT * count / volume) ** (1 / dimensions)
+        resolution = np.where(flat, 1, np.floor(extent * cells_per_unit))
+        return tuple(np.clip(resolution, 1, MAX_RESOLUTION).astype(np.int64).tolist())
+
+    def _cell_of(self, points):
+        """
+        Returns the clamped (N x 3) voxel coordinates of world-space points.
+        """
+        cells = np.floor((points - self.minimum) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, self.resolution - 1)
+
+    def _fill(self):
+        """
+        Lists every shape in each voxel its bounding box overlaps.
+        """
+        low = self._cell_of(self.primitive_min)
+        high = self._cell_of(self.primitive_max)
+        self.cell_low = low
+        self.cell_high = high
+        _, ny, nz = self.resolution
+        cells = []
+        items = []
+        for i in range(len(self.shapes)):
+            x, y, z = np.mgrid[
+                low[i, 0] : high[i, 0] + 1,
+                low[i, 1] : high[i, 1] + 1,
+                low[i, 2] : high[i, 2] + 1,
+            ]
+            voxel = (x.ravel() * ny + y.ravel()) * nz + z.ravel()
+            cells.append(voxel)
+            items.append(np.full(len(voxel), i, dtype=np.int64))
+        voxel_count = int(np.prod(self.resolution))
+        if cells:
+            cells = np.concatenate(cells)
+            items = np.concatenate(items)
+        else:
+            cells = np.empty(0, dtype=np.int64)
+            items = np.empty(0, dtype=np.int64)
+        ordering = np.argsort(cells, kind="stable")
+        self.order = items[ordering]
+        self.cell_count = np.bincount(cells, minlength=voxel_count)
+        self.cell_start = np.concatenate(([0], np.cumsum(self.cell_count)[:-1]))
+
+    # traversal
+    def reset_traversal_stats(self):
+        """
+        Clears the traversal counters.
+        """
+        self.rays_traced = 0
+        self.nodes_visited = 0
+        self.primitive_tests = 0
+
+    def stats(self):
+        """
+        Returns build and traversal statistics.
+        """
+        occupied = self.cell_count[self.cell_count > 0]
+        return {
+            "shapes": len(self.shapes),
+            "resolution": tuple(self.resolution.tolist()),
+            "voxels": len(self.cell_count),
+            "occupied_voxels": len(occupied),
+            "references": int(self.cell_count.sum()),
+            "max_per_voxel": int(occupied.max()) if len(occupied) else 0,
+            "build_time": self.build_time,
+            "rays_traced": self.rays_traced,
+            "nodes_visited": self.nodes_visited,
+            "primitive_tests": self.primitive_tests,
+            "nodes_per_ray": self.nodes_visited / max(self.rays_traced, 1),
+            "tests_per_ray": self.primitive_tests / max(self.rays_traced, 1),
+        }
+
+    def _setup(self, origins, directions, t_start):
+        """
+        Returns the DDA state of rays entering the grid at t_start:
+        current voxel, step per axis, t of the next voxel boundary per
+        axis and t between boundaries per axis.
+        """
+        cells = self._cell_of(origins + directions * t_start[:, np.newaxis])
+        step = np.sign(directions).astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            boundary = self.minimum + (cells + (step > 0)) * self.cell_size
+            t_next = np.where(step != 0, (boundary - origins) / directions, np.inf)
+            t_delta = np.where(step != 0, self.cell_size / np.abs(directions), np.inf)
+        return cells, step, t_next, t_delta
+
+    def _walk(self, ray: rays.Ray, t_min=-bounds.INFINITY, t_max=bounds.INFINITY):
+        """
+        Yields, in order along the ray, the voxels it crosses between t_min
+        and t_max, each with the t at which the ray leaves it.
+        """
+        origin = np.array([ray.origin.x(), ray.origin.y(), ray.origin.z()])
+        direction = np.array([ray.direction.x(), ray.direction.y(), ray.direction.z()])
+        t_enter, t_exit = bounds.slab_interval(
+            self.minimum, self.maximum, origin, bounds.inverse_direction(direction)
+        )
+        t_enter = max(t_enter, t_min)
+        t_exit = min(t_exit, t_max)
+        if t_enter > t_exit:
+            return
+        cells, step, t_next, t_delta = self._setup(
+            origin[np.newaxis], direction[np.newaxis], np.array([t_enter])
+        )
+        cell = cells[0].tolist()
+        step = step[0].tolist()
+        t_next = t_next[0].tolist()
+        t_delta = t_delta[0].tolist()
+        resolution = self.resolution.tolist()
+        while True:
+            self.nodes_visited += 1
+            axis = t_next.index(min(t_next))
+            voxel = (cell[0] * resolution[1] + cell[1]) * resolution[2] + cell[2]
+            yield voxel, t_next[axis]
+            if t_next[axis] > t_exit:
+                return
+            cell[axis] += step[axis]
+            if not 0 <= cell[axis] < resolution[axis]:
+                return
+            t_next[axis] += t_delta[axis]
+
+    def _shapes_along(
+        self, ray: rays.Ray, t_min=-bounds.INFINITY, t_max=bounds.INFINITY
+    ):
+        """
+        Yields the position in self.shapes of every shape listed in a voxel
+        crossed between t_min and t_max, once each.
+        """
+        self.rays_traced += 1
+        if not self.shapes:
+            return
+        seen = set()
+        for voxel, _ in self._walk(ray, t_min, t_max):
+            start = self.cell_start[voxel]
+            for i in self.order[start : start + self.cell_count[voxel]].tolist():
+                if i not in seen:
+                    seen.add(i)
+                    self.primitive_tests += 1
+                    yield i
+
+    def candidates(self, ray: rays.Ray):
+        """
+        Yields (index, shape) once for every shape listed in a voxel the
+        ray's line crosses. Intersections behind the origin are kept, so
+        the result matches a brute-force test of every shape.
+        """
+        for i in self._shapes_along(ray):
+            yield self.indices[i], self.shapes[i]
+
+    def occluder(self, ray: rays.Ray, t_max: float):
+        """
+        Returns a shape that intersects the ray at some 0 < t < t_max, or None,
+        stopping at the first one found.
+        """
+        for i in self._shapes_along(ray, 0.0, t_max):
+            if self.shapes[i].occludes(ray, t_max):
+                return self.shapes[i]
+        return None
+
+    def closest(self, ray: rays.Ray, t_max: float = bounds.INFINITY):
+        """
+        Returns (t, index, object-space ray) of the nearest hit with
+        0 < t < t_max, or None, stopping at the first voxel that contains
+        the best hit so far.
+        """
+        self.rays_traced += 1
+        if not self.shapes:
+            return None
+        best = None
+        seen = set()
+        for voxel, t_leave in self._walk(ray, 0.0, t_max):
+            start = self.cell_start[voxel]
+            for i in self.order[start : start + self.cell_count[voxel]].tolist():
+                if i in seen:
+                    continue
+                seen.add(i)
+                self.primitive_tests += 1
+                found = self.shapes[i].closest_t(ray, t_max)
+                if found is not None:
+                    t_max = found[0]
+                    best = (found[0], self.indices[i], found[1])
+            if best is not None and best[0] <= t_leave:
+                break
+        return best
+
+    def intersect(self, ray: rays.Ray):
+        """
+        Returns the t values of every intersection of the ray with the
+        shapes in the grid, and the index of the shape of each.
+        """
+        ts, indices = [], []
+        for index, shape in self.candidates(ray):
+            for t in shape.intersect_ts(ray):
+                ts.append(t)
+                indices.append(index)
+        return ts, indices
+
+    def intersect_batch(
+        self,
+        batch: rays.RayBatch,
+        best_t: np.ndarray,
+        best_index: np.ndarray,
+        any_hit: bool = False,
+    ):
+        """
+        Updates best_t/best_index in place with the nearest positive hit of
+        every ray. All rays step through the grid together, and a ray stops
+        at the first voxel in which its best hit is confirmed. With any_hit,
+        a ray stops at the first voxel with a hit closer than its initial
+        best_t.
+
+        A shape is tested once per ray (mailboxing): the voxels of a shape
+        form a box, so a ray crosses them in one run, and a shape listed in
+        the voxel a ray has just left has already been tested.
+        """
+        count = len(batch)
+        self.rays_traced += count
+        if not self.shapes or count == 0:
+            return
+        origins = batch.origins
+        directions = batch.directions
+        t_enter, t_exit = bounds.slab_intervals(
+            self.minimum, self.maximum, origins, bounds.inverse_directions(directions)
+        )
+        t_enter = np.maximum(t_enter, 0.0)
+        t_exit = np.minimum(t_exit, best_t)
+        ids = np.flatnonzero(t_enter <= t_exit)
+        if len(ids) == 0:
+            return
+        cells, step, t_next, t_delta = self._setup(
+            origins[ids], directions[ids], t_enter[ids]
+        )
+        t_exit = t_exit[ids]
+        # the voxel each ray has just left; none before the first
+        previous = np.full_like(cells, -1)
+        found = np.zeros(count, dtype=bool)
+        resolution = self.resolution
+        _, ny, nz = resolution
+        while len(ids):
+            self.nodes_visited += len(ids)
+            voxels = (cells[:, 0] * ny + cells[:, 1]) * nz + cells[:, 2]
+            counts = self.cell_count[voxels]
+            occupied = np.flatnonzero(counts)
+            # expand to (ray, shape) pairs, drop the shapes a ray has
+            # already tested and test each remaining shape once
+            pair_rays = np.repeat(occupied, counts[occupied])
+            offsets = np.arange(len(pair_rays)) - np.repeat(
+                np.cumsum(counts[occupied]) - counts[occupied], counts[occupied]
+            )
+            pair_items = self.order[self.cell_start[voxels[pair_rays]] + offsets]
+            left = previous[pair_rays]
+            tested = np.all(
+                (self.cell_low[pair_items] <= left)
+                & (left <= self.cell_high[pair_items]),
+                axis=1,
+            )
+            pair_rays = pair_rays[~tested]
+            pair_items = pair_items[~tested]
+            if len(pair_items):
+                ordering = np.argsort(pair_items, kind="stable")
+                pair_rays = pair_rays[ordering]
+                pair_items = pair_items[ordering]
+                split = np.flatnonzero(np.diff(pair_items)) + 1
+                for group_rays, group_items in zip(
+                    np.split(pair_rays, split), np.split(pair_items, split)
+                ):
+                    i = int(group_items[0])
+                    selected = ids[group_rays]
+                    self.primitive_tests += len(selected)
+                    ts, _ = self.shapes[i].intersect_batch(batch[selected])
+                    ts = np.where(ts > 0, ts, np.inf).min(axis=1)
+                    closer = ts < best_t[selected]
+                    best_t[selected[closer]] = ts[closer]
+                    best_index[selected[closer]] = self.indices[i]
+                    found[selected[closer]] = True
+
+            # a hit inside the current voxel cannot be beaten by later voxels
+            voxel_exit = np.minimum(t_next.min(axis=1), t_exit)
+            axis = np.argmin(t_next, axis=1)
+            rows = np.arange(len(ids))
+            previous = cells.copy()
+            cells[rows, axis] += step[rows, axis]
+            alive = (
+                (best_t[ids] > voxel_exit)
+                & (t_next[rows, axis] <= t_exit)
+                & (cells[rows, axis] >= 0)
+                & (cells[rows, axis] < resolution[axis])
+            )
+            if any_hit:
+                alive &= ~found[ids]
+            t_next[rows, axis] += t_delta[rows, axis]
+            ids = ids[alive]
+            previous = previous[alive]
+            cells = cells[alive]
+            step = step[alive]
+            t_next = t_next[alive]
+            t_delta = t_delta[alive]
+            t_exit = t_exit[alive]
@@ -8,6 +8,7 @@ import sys
 package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, package_path)
 
+import numpy as np
 from ray_tracing.utils.constants import *
 import ray_tracing.elements.tuples as tuples
 import ray_tracing.elements.rays as rays
@@ -80,6 +81,40 @@ class IntersectionComputations:
         return self.inside
 
 
+class IntersectionComputationsBatch:
+    """
+    Computation properties for many intersections, stored as arrays.
+    """
+
+    def __init__(
+        self,
+        t: np.ndarray,
+        object_indices: np.ndarray,
+        point: np.ndarray,
+        eye_vector: np.ndarray,
+        normal_vector: np.ndarray,
+        inside: np.ndarray,
+    ):
+        """
+        Constructor for the IntersectionComputationsBatch class.
+        Vectors and points are N x 3 arrays; t, object_indices and inside
+        have one entry per intersection.
+        """
+        self.t = t
+        self.object_indices = object_indices
+        self.point = point
+        self.over_point = point + normal_vector * EPSILON
+        self.eye_vector = eye_vector
+        self.normal_vector = normal_vector
+        self.inside = inside
+
+    def __len__(self):
+        """
+        Returns the number of intersections.
+        """
+        return len(self.t)
+
+
 class Intersection:
     """
     This class represents an intersection between a ray and a shape.
@@ -121,34 +156,198 @@ class Intersection:
         Prepares the computations for the intersection.
         """
         point = ray.position(self.t)
-        eye_vector = -ray.direction
         normal_vector = self.shape.normal_at(point)
-        if normal_vector.dot(eye_vector) < 0:
-            inside = True
-            normal_vector = -normal_vector
+        return _computations(self.t, self.shape, ray, point, normal_vector)
+
+
+class Hit:
+    """
+    A lightweight record of the nearest hit along a ray: its t value, the
+    object, the object's index in the world and the object-space ray,
+    which spares re-transforming the hit point for the normal.
+    """
+
+    __slots__ = ("t", "shape", "object_index", "local_ray")
+
+    def __init__(
+        self,
+        t: float,
+        shape: shapes.Shape,
+        object_index: int = -1,
+        local_ray: rays.Ray = None,
+    ):
+        """
+        Constructor for the Hit class.
+        """
+        self.t = t
+        self.shape = shape
+        self.object_index = object_index
+        self.local_ray = local_ray
+
+    def __repr__(self):
+        """
+        Returns a string representation of the hit.
+        """
+        return f"Hit(t={self.t}, shape={self.shape}, object_index={self.object_index})"
+
+    def get_object(self):
+        """
+        Returns the object that was hit.
+        """
+        return self.shape
+
+    def get_t(self):
+        """
+        Returns the t-value of the hit.
+        """
+        return self.t
+
+    def to_intersection(self) -> Intersection:
+        """
+        Returns the hit as an Intersection.
+        """
+        return Intersection(self.t, self.shape)
+
+    def prepare_computations(self, ray: rays.Ray):
+        """
+        Prepares the computations for the hit.
+        """
+        point = ray.position(self.t)
+        if self.local_ray is None:
+            normal_vector = self.shape.normal_at(point)
         else:
-            inside = False
-        return IntersectionComputations(
-            self.t,
-            self.shape,
-            point,
-            eye_vector,
-            normal_vector,
-            inside,
-        )
+            local_normal = self.shape.local_normal_at(self.local_ray.position(self.t))
+            normal_vector = self.shape.normal_to_world(local_normal)
+        return _computations(self.t, self.shape, ray, point, normal_vector)
 
 
 class Intersections:
     """
     This class represents a collection of intersections.
+
+    t values and object indices are kept in arrays, with the objects in a
+    table; Intersection objects are only created when read. The collection
+    is sorted by t on demand, and the hit is found with a linear scan.
     """
 
     def __init__(self, *intersections: List[Intersection]):
         """
         Constructor for the Intersections class.
         """
-        self.intersections = list(intersections)
-        self.first_hit = self.hit()
+        self._ts = np.array([i.t for i in intersections], dtype=np.float64)
+        self._object_indices = np.arange(len(intersections), dtype=np.int64)
+        self._objects = [i.shape for i in intersections]
+        self._items = list(intersections)
+        self._pending = []
+        self._sorted = len(intersections) <= 1
+        self._hit = None
+        self._hit_valid = False
+
+    @classmethod
+    def from_arrays(cls, ts, object_indices, objects: List[shapes.Shape]):
+        """
+        Builds a collection in bulk from t values, indices into objects and
+        the objects themselves.
+        """
+        xs = cls.__new__(cls)
+        xs._ts = np.asarray(ts, dtype=np.float64).ravel()
+        xs._object_indices = np.asarray(object_indices, dtype=np.int64).ravel()
+        xs._objects = list(objects)
+        xs._items = [None] * len(xs._ts)
+        xs._pending = []
+        xs._sorted = len(xs._ts) <= 1
+        xs._hit = None
+        xs._hit_valid = False
+        return xs
+
+    @classmethod
+    def from_ts(cls, ts, shape: shapes.Shape):
+        """
+        Builds a collection of intersections of one shape at the given t values.
+        """
+        ts = np.asarray(ts, dtype=np.float64).ravel()
+        return cls.from_arrays(ts, np.zeros(len(ts), dtype=np.int64), [shape])
+
+    @classmethod
+    def concatenate(cls, collections: List["Intersections"]):
+        """
+        Joins many collections into one without sorting them.
+        """
+        result = cls()
+        result._pending = [xs._snapshot() for xs in collections]
+        result._changed()
+        return result
+
+    def _flush(self):
+        """
+        Moves intersections and collections added since the last read into
+        the arrays, with a single concatenation.
+        """
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = []
+        ts = [self._ts]
+        indices = [self._object_indices]
+        for entry in pending:
+            if isinstance(entry, Intersection):
+                ts.append((entry.t,))
+                indices.append((len(self._objects),))
+                self._objects.append(entry.shape)
+                self._items.append(entry)
+            else:
+                chunk_ts, chunk_indices, chunk_objects, chunk_items = entry
+                ts.append(chunk_ts)
+                indices.append(chunk_indices + len(self._objects))
+                self._objects.extend(chunk_objects)
+                self._items.extend(chunk_items)
+        self._ts = np.concatenate(ts).astype(np.float64, copy=False)
+        self._object_indices = np.concatenate(indices).astype(np.int64, copy=False)
+
+    def _snapshot(self):
+        """
+        Returns the arrays, object table and items of the collection.
+        """
+        self._flush()
+        return self._ts, self._object_indices, list(self._objects), list(self._items)
+
+    def _item(self, k):
+        """
+        Returns the Intersection at position k, creating it if needed.
+        """
+        item = self._items[k]
+        if item is None:
+            shape = self._objects[self._object_indices[k]]
+            item = Intersection(float(self._ts[k]), shape)
+            self._items[k] = item
+        return item
+
+    def _changed(self):
+        self._sorted = False
+        self._hit_valid = False
+
+    @property
+    def ts(self) -> np.ndarray:
+        """
+        Returns the t values, in the current order.
+        """
+        self._flush()
+        return self._ts
+
+    @property
+    def intersections(self) -> List[Intersection]:
+        """
+        Returns the intersections sorted by t value.
+        """
+        self.sort()
+        return [self._item(k) for k in range(len(self._ts))]
+
+    @property
+    def first_hit(self):
+        """
+        Returns the first intersection with a positive t value.
+        """
+        return self.hit()
 
     def __repr__(self):
         """
@@ -166,77 +365,108 @@ class Intersections:
         """
         Returns the intersection at the given index.
         """
-        return self.intersections[index]
+        self.sort()
+        if isinstance(index, slice):
+            return [self._item(k) for k in range(len(self._ts))[index]]
+        return self._item(range(len(self._ts))[index])
+
+    def __iter__(self):
+        """
+        Iterates over the intersections sorted by t value.
+        """
+        return iter(self.intersections)
 
     def __len__(self):
         """
         Returns the number of intersections.
         """
-        return len(self.intersections)
+        self._flush()
+        return len(self._ts)
 
     def __add__(self, other):
         """
         Returns the union of the two collections.
         """
-        return Intersections(*self.intersections, *other.intersections)
+        return Intersections.concatenate([self, other])
+
+    def __iadd__(self, other):
+        """
+        Merges the other collection into this one. Repeated merges are only
+        concatenated when the collection is next read.
+        """
+        self.merge(other)
+        return self
 
     def hit(self):
         """
         Returns the first intersection with a positive t value.
         """
-        if self.any():
-            self.sort()
-            for intersection in self.intersections:
-                if intersection.t > 0:
-                    return intersection
-        return None
+        if not self._hit_valid:
+            self._flush()
+            self._hit = None
+            positive = np.flatnonzero(self._ts > 0)
+            if len(positive):
+                # argmin keeps the earliest of equal t values, as a stable sort would
+                self._hit = self._item(positive[np.argmin(self._ts[positive])])
+            self._hit_valid = True
+        return self._hit
 
     def get_first_hit(self):
         """
         Returns the first intersection with a positive t value.
         """
-        if self.any():
-            return self.first_hit
-        return None
+        return self.hit()
 
     def add(self, intersection: Intersection):
         """
         Adds the given intersection to the collection.
         """
-        self.intersections.append(intersection)
-        self.hit()
+        self._pending.append(intersection)
+        self._changed()
 
     def add_all(self, *intersections: List[Intersection]):
         """
         Adds the given intersections to the collection.
         """
-        self.intersections.extend(intersections)
-        self.hit()
+        self._pending.extend(intersections)
+        self._changed()
 
     def sort(self):
         """
         Sorts the intersections by t value.
         """
-        self.intersections.sort(key=lambda i: i.t)
+        self._flush()
+        if not self._sorted:
+            order = np.argsort(self._ts, kind="stable")
+            self._ts = self._ts[order]
+            self._object_indices = self._object_indices[order]
+            self._items = [self._items[k] for k in order]
+            self._sorted = True
 
     def merge(self, other):
         """
         Merges the given intersections with this one.
         """
-        self.intersections.extend(other.intersections)
-        self.hit()
+        self._pending.append(other._snapshot())
+        self._changed()
 
     def remove(self, intersection: Intersection):
         """
         Removes the given intersection from the collection.
         """
-        self.intersections.remove(intersection)
+        items = self.intersections
+        k = items.index(intersection)
+        keep = np.arange(len(items)) != k
+        self._ts = self._ts[keep]
+        self._object_indices = self._object_indices[keep]
+        del self._items[k]
+        self._hit_valid = False
 
     def remove_all(self):
         """
         Removes all intersections from the collection.
         """
-        self.intersections = []
+        self.__init__()
 
     def contains(self, intersection: Intersection):
         """
@@ -248,7 +478,7 @@ class Intersections:
         """
         Returns the number of intersections in the collection.
         """
-        return len(self.intersections)
+        return len(self)
 
     def all(self):
         """
@@ -260,12 +490,25 @@ class Intersections:
         """
         Returns True if the collection contains any intersections.
         """
-        return len(self.intersections) > 0
+        return len(self) > 0
 
     def all_positive(self):
         """
         Returns True if all intersections have a positive t value.
         """
-        for intersection in self.intersections:
-            if intersection.t < 0:
-                return False
+        return bool(np.all(self.ts >= 0))
+
+
+def _computations(t, shape, ray, point, normal_vector) -> IntersectionComputations:
+    """
+    Builds the computations of a hit, flipping the normal when the hit
+    is on the inside of the shape.
+    """
+    eye_vector = -ray.direction
+    if normal_vector.dot(eye_vector) < 0:
+        inside = True
+        normal_vector = -normal_vector
+    else:
+        inside = False
+    return IntersectionComputations(t, shape, point, eye_vector, normal_vector, inside)
+
@@ -0,0 +1,102 @@
+"""
+This module contains the OccluderCache class, which remembers the last
+object that blocked the shadow rays of each light.
+"""
+from __future__ import annotations
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import typing
+
+if typing.TYPE_CHECKING:
+    import ray_tracing.elements.lights as lights
+    import ray_tracing.elements.shapes as shapes
+
+
+class OccluderCache:
+    """
+    Remembers, per light, the object that last blocked a shadow ray, so that
+    it can be tested before a full occlusion query. Neighbouring shading
+    points are usually shadowed by the same object.
+
+    Counters:
+        lookups: shadow tests made while the light had a cached occluder
+        hits: lookups answered by the cached occluder (full queries saved)
+        misses: lookups where the cached occluder did not block the ray
+        full_queries: shadow tests that needed a full occlusion query
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Constructor for the OccluderCache class.
+        """
+        self.enabled = enabled
+        self.clear()
+        self.reset_stats()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the cache.
+        """
+        return f"OccluderCache(enabled={self.enabled}, lights={len(self._last)})"
+
+    def clear(self):
+        """
+        Forgets every cached occluder, e.g. after the objects change.
+        """
+        self._last = {}
+
+    def reset_stats(self):
+        """
+        Clears the counters.
+        """
+        self.lookups = 0
+        self.hits = 0
+        self.misses = 0
+        self.full_queries = 0
+
+    def get(self, light: lights.Light):
+        """
+        Returns the object that last blocked a shadow ray of the light, or None.
+        """
+        entry = self._last.get(id(light))
+        if entry is None or entry[0] is not light:
+            return None
+        return entry[1]
+
+    def remember(self, light: lights.Light, obj: shapes.Shape):
+        """
+        Records obj as the last occluder of the light.
+        """
+        self._last[id(light)] = (light, obj)
+
+    def forget(self, light: lights.Light):
+        """
+        Drops the cached occluder of the light, e.g. once its shadow rays
+        stop being blocked.
+        """
+        self._last.pop(id(light), None)
+
+    def record(self, hits: int, misses: int, full_queries: int):
+        """
+        Adds to the counters.
+        """
+        self.lookups += hits + misses
+        self.hits += hits
+        self.misses += misses
+        self.full_queries += full_queries
+
+    def stats(self):
+        """
+        Returns the counters and the hit rate of the cache.
+        """
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "full_queries": self.full_queries,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+        }
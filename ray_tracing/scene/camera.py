@@ -9,11 +9,13 @@ package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, package_path)
 
 import math
+import numpy as np
 from ray_tracing.utils.constants import *
 import ray_tracing.elements.tuples as tuples
 import ray_tracing.elements.matrix as matrix
 import ray_tracing.elements.rays as rays
 import ray_tracing.elements.canvas as canvas
+import ray_tracing.scene.tiles as tiles
 
 
 def view_transform(
@@ -86,6 +88,40 @@ class Camera:
             and self.transform == other.transform
         )
 
+    @property
+    def transform(self):
+        """
+        Returns the view transformation of the camera
+        """
+        return self._transform
+
+    @transform.setter
+    def transform(self, transform: matrix.Matrix):
+        """
+        Sets the view transformation and drops the cached inverse
+        """
+        self._transform = transform
+        self._inverse_transform = None
+        self._origin = None
+
+    @property
+    def inverse_transform(self):
+        """
+        Returns the inverse view transformation, computed once per transform
+        """
+        if self._inverse_transform is None:
+            self._inverse_transform = self._transform.inverse()
+        return self._inverse_transform
+
+    @property
+    def origin(self):
+        """
+        Returns the camera position in world space
+        """
+        if self._origin is None:
+            self._origin = self.inverse_transform * tuples.Point(0, 0, 0)
+        return self._origin
+
     def _calculate_half_width_and_height(self):
         """
         Calculates the half width and height of the camera
@@ -121,15 +157,81 @@ class Camera:
         # using the camera matrix, transform the canvas point and the origin,
         # and then compute the ray's direction vector.
         # (remember that the canvas is at z=-1)
-        pixel = self.transform.inverse() * tuples.Point(world_x, world_y, -1)
-        origin = self.transform.inverse() * tuples.Point(0, 0, 0)
+        pixel = self.inverse_transform * tuples.Point(world_x, world_y, -1)
+        origin = self.origin
         direction = (pixel - origin).normalize()
         return rays.Ray(origin, direction)
 
-    def render(self, world):
+    def rays_for_region(
+        self, x_start: int = 0, y_start: int = 0, x_end: int = None, y_end: int = None
+    ) -> rays.RayBatch:
+        """
+        Returns the rays for every pixel in [x_start, x_end) x [y_start, y_end)
+        as one batch, in row-major order. The whole frame is used by default.
+        """
+        x_end = self.hsize if x_end is None else x_end
+        y_end = self.vsize if y_end is None else y_end
+        py, px = np.mgrid[y_start:y_end, x_start:x_end]
+        return self.rays_for_pixels(px.ravel(), py.ravel())
+
+    def rays_for_pixels(self, px: np.ndarray, py: np.ndarray) -> rays.RayBatch:
+        """
+        Returns the rays through the pixels (px[i], py[i]) as one batch.
         """
-        Renders the world from the camera's perspective
+        px = np.asarray(px)
+        py = np.asarray(py)
+
+        # same construction as ray_for_pixel, one array operation per step
+        world_x = self.half_width - (px + 0.5) * self.pixel_size
+        world_y = self.half_height - (py + 0.5) * self.pixel_size
+        canvas_points = np.column_stack([world_x, world_y, np.full(len(px), -1.0)])
+        pixels = self.inverse_transform.transform_points(canvas_points)
+        origin = np.array([self.origin.x(), self.origin.y(), self.origin.z()])
+        directions = pixels - origin
+        directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+        origins = np.broadcast_to(origin, directions.shape)
+        return rays.RayBatch(origins, directions, pixels=np.column_stack([px, py]))
+
+    def rays_for_frame(self) -> rays.RayBatch:
+        """
+        Returns the primary rays of the whole frame as one batch
+        """
+        return self.rays_for_region()
+
+    def render(
+        self,
+        world,
+        engine: str = "scalar",
+        workers: int = None,
+        tile_size: int = tiles.DEFAULT_TILE_SIZE,
+        scheduler: tiles.TileScheduler = None,
+        executor: str = "processes",
+    ):
         """
+        Renders the world from the camera's perspective.
+        engine="scalar" traces one ray at a time through world.color_at;
+        engine="wavefront" traces the whole frame in array stages.
+        With workers, the frame is split into tile_size x tile_size tiles
+        rendered by that many processes into a shared-memory framebuffer;
+        expensive tiles go first, ordered by the scheduler, whose report
+        gives the utilisation of each worker (see tiles.render_tiles).
+        executor="threads" renders the tiles in threads instead, which
+        pays off with the wavefront engine.
+        """
+        if workers is not None:
+            return tiles.render_tiles(
+                self,
+                world,
+                workers,
+                tile_size,
+                engine,
+                scheduler=scheduler,
+                executor=executor,
+            )
+        if engine == "wavefront":
+            return self.render_wavefront(world)
+        if engine != "scalar":
+            raise ValueError(f"Unknown render engine: {engine}")
         image = canvas.Canvas(self.hsize, self.vsize)
         for y in range(self.vsize):
             for x in range(self.hsize):
@@ -137,3 +239,15 @@ class Camera:
                 color = world.color_at(ray)
                 image.write_pixel(x, y, color)
         return image
+
+    def render_wavefront(self, world):
+        """
+        Renders the world in stages over arrays: generate all primary rays,
+        intersect every object, keep the nearest hits, compute normals,
+        trace shadow rays, shade, and write the canvas in one pass
+        """
+        image = canvas.Canvas(self.hsize, self.vsize)
+        batch = self.rays_for_frame()
+        colors = world.color_at_batch(batch)
+        image.write_pixels(batch.pixels, colors)
+        return image
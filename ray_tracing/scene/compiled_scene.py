@@ -0,0 +1,163 @@
+"""
+This module contains the CompiledScene class, a frozen array form of a World.
+"""
+from __future__ import annotations
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import numpy as np
+import ray_tracing.elements.shapes as shapes
+import ray_tracing.elements.materials as materials
+
+# type codes of the shapes whose normals are computed from the arrays alone;
+# any other shape (including subclasses) is OTHER and uses its own methods
+SPHERE = 0
+PLANE = 1
+OTHER = -1
+SHAPE_CODES = {shapes.Sphere: SPHERE, shapes.Plane: PLANE}
+
+
+def shape_code(obj: shapes.Shape) -> int:
+    """
+    Returns the type code of a shape.
+    """
+    return SHAPE_CODES.get(type(obj), OTHER)
+
+
+def _freeze(array: np.ndarray) -> np.ndarray:
+    """
+    Returns a contiguous, read-only copy of the array.
+    """
+    array = np.array(array, dtype=array.dtype, order="C")
+    array.flags.writeable = False
+    return array
+
+
+def _stack(matrices) -> np.ndarray:
+    """
+    Stacks 4x4 matrices into an N x 4 x 4 array.
+    """
+    if not matrices:
+        return np.empty((0, 4, 4))
+    return np.stack([m.array for m in matrices])
+
+
+class CompiledScene:
+    """
+    A snapshot of the objects and lights of a world in contiguous, read-only
+    numpy arrays, for vectorized renderers and worker processes. Row i of
+    every per-object array describes world.objects[i].
+
+    Arrays:
+        type_codes: N shape type codes (SPHERE, PLANE or OTHER)
+        transforms, inverse_transforms, normal_transforms: N x 4 x 4
+        bounds_min, bounds_max: N x 3 world-space bounding boxes
+        materials: a MaterialBatch of N materials
+        light_positions, light_intensities: L x 3
+        unbounded: indices of the objects left out of the structure
+
+    The acceleration structure (or None for brute force) is shared with
+    the world it was compiled from. Materials and lights are copied at
+    compile time; World.compile() recompiles once any of them changes.
+    """
+
+    def __init__(self, objects, lights, structure=None, unbounded=None, key=None):
+        """
+        Constructor for the CompiledScene class.
+        """
+        self.objects = tuple(objects)
+        self.lights = tuple(lights)
+        self.structure = structure
+        self.key = key
+
+        self.type_codes = _freeze(
+            np.array([shape_code(obj) for obj in self.objects], dtype=np.int8)
+        )
+        self.transforms = _freeze(_stack([obj.transform for obj in self.objects]))
+        self.inverse_transforms = _freeze(
+            _stack([obj.inverse_transform for obj in self.objects])
+        )
+        self.normal_transforms = _freeze(
+            _stack([obj.normal_transform for obj in self.objects])
+        )
+        boxes = [obj.world_bounds() for obj in self.objects]
+        self.bounds_min = _freeze(np.array([b.minimum for b in boxes]).reshape(-1, 3))
+        self.bounds_max = _freeze(np.array([b.maximum for b in boxes]).reshape(-1, 3))
+        if unbounded is None:
+            unbounded = [i for i, b in enumerate(boxes) if not b.is_bounded()]
+        self.unbounded = _freeze(np.array(unbounded, dtype=np.int64))
+
+        self.materials = materials.MaterialBatch.from_materials(
+            [obj.material for obj in self.objects]
+        )
+        for name in ("color", "ambient", "diffuse", "specular", "shininess"):
+            setattr(self.materials, name, _freeze(getattr(self.materials, name)))
+
+        self.light_positions = _freeze(
+            np.array(
+                [(l.position.x(), l.position.y(), l.position.z()) for l in self.lights]
+            ).reshape(-1, 3)
+        )
+        self.light_intensities = _freeze(
+            np.array(
+                [
+                    (l.intensity.r(), l.intensity.g(), l.intensity.b())
+                    for l in self.lights
+                ]
+            ).reshape(-1, 3)
+        )
+
+    def __repr__(self):
+        """
+        Returns a string representation of the compiled scene.
+        """
+        return (
+            f"CompiledScene(objects={len(self.objects)}, lights={len(self.lights)}, "
+            f"structure={type(self.structure).__name__ if self.structure else None})"
+        )
+
+    def __len__(self):
+        """
+        Returns the number of objects.
+        """
+        return len(self.objects)
+
+    def num_lights(self):
+        """
+        Returns the number of lights.
+        """
+        return len(self.lights)
+
+    def normal_at_batch(self, indices: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """
+        Returns the normalized world-space normals at an N x 3 array of
+        world-space points, where point i lies on object indices[i].
+        Spheres and planes are handled in one pass over the stacked
+        matrices; other shapes fall back to their own normal_at_batch.
+        """
+        indices = np.asarray(indices)
+        points = np.asarray(points, dtype=np.float64)
+        inverse = self.inverse_transforms[indices]
+        local_points = np.einsum("nij,nj->ni", inverse[:, :3, :3], points)
+        local_points += inverse[:, :3, 3]
+
+        codes = self.type_codes[indices]
+        local_normals = np.zeros_like(local_points)
+        sphere = codes == SPHERE
+        local_normals[sphere] = local_points[sphere]
+        local_normals[codes == PLANE, 1] = 1
+        normals = np.einsum(
+            "nij,nj->ni", self.normal_transforms[indices][:, :3, :3], local_normals
+        )
+        with np.errstate(invalid="ignore"):
+            # rows of other shapes are zero here and are filled in below
+            normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+
+        other = np.flatnonzero(codes == OTHER)
+        for index in np.unique(indices[other]):
+            selected = other[indices[other] == index]
+            normals[selected] = self.objects[index].normal_at_batch(points[selected])
+        return normals
@@ -0,0 +1,561 @@
+"""
+This module renders a camera's frame across worker processes that
+connect to a coordinator over TCP, possibly from other machines.
+"""
+from __future__ import annotations
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import collections
+import hashlib
+import hmac
+import multiprocessing
+import numbers
+import pickle
+import queue
+import secrets
+import socket
+import struct
+import threading
+import time
+import typing
+import numpy as np
+import ray_tracing.elements.canvas as canvas
+import ray_tracing.elements.matrix as matrix
+import ray_tracing.elements.tuples as tuples
+import ray_tracing.scene.tiles as tiles
+
+if typing.TYPE_CHECKING:
+    import ray_tracing.scene.camera as camera
+    import ray_tracing.scene.world as world
+
+# seconds a worker may take to answer with a tile before the tile is
+# handed to another worker and the slow one is disconnected
+TILE_TIMEOUT = 60.0
+# scenes a worker keeps, least recently used first out
+SCENE_CACHE_SIZE = 4
+_HEADER = struct.Struct("!Q")
+# bytes of the random challenges and of their HMAC-SHA256 answers
+_CHALLENGE_SIZE = 32
+# private attributes that hold scene content behind a property; the other
+# private attributes are caches, counters and watchers
+_CONTENT_ATTRIBUTES = {"_transform": "transform", "_material": "material"}
+# public attributes that identify, count or cache rather than describe
+_NOT_CONTENT = frozenset({"id", "inversion_count", "occluder_cache"})
+
+
+def _send(sock: socket.socket, message):
+    """
+    Sends a message as a length-prefixed pickle.
+    """
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """
+    Reads size bytes, raising ConnectionError if the peer hangs up first.
+    """
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connection closed by peer")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv(sock: socket.socket):
+    """
+    Receives a message sent by _send.
+    """
+    (size,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+    return pickle.loads(_recv_exactly(sock, size))
+
+
+def _answer(authkey: bytes, role: bytes, challenge: bytes) -> bytes:
+    """
+    Returns the HMAC of a challenge, bound to the role of the peer that
+    answers it so that an answer cannot be reflected back.
+    """
+    return hmac.new(authkey, role + challenge, "sha256").digest()
+
+
+def _authenticate_worker(sock: socket.socket, authkey: bytes):
+    """
+    The coordinator's side of the handshake: challenges the worker, then
+    answers the worker's challenge. Raises multiprocessing.AuthenticationError
+    if the worker does not know the key.
+    """
+    challenge = secrets.token_bytes(_CHALLENGE_SIZE)
+    sock.sendall(challenge)
+    reply = _recv_exactly(sock, 2 * _CHALLENGE_SIZE)
+    answer, worker_challenge = reply[:_CHALLENGE_SIZE], reply[_CHALLENGE_SIZE:]
+    if not hmac.compare_digest(answer, _answer(authkey, b"worker", challenge)):
+        raise multiprocessing.AuthenticationError("Worker failed to authenticate")
+    sock.sendall(_answer(authkey, b"coordinator", worker_challenge))
+
+
+def _authenticate_coordinator(sock: socket.socket, authkey: bytes):
+    """
+    The worker's side of the handshake: answers the coordinator's challenge,
+    then checks the coordinator's answer to its own. Raises
+    multiprocessing.AuthenticationError if either side has the wrong key.
+    """
+    challenge = secrets.token_bytes(_CHALLENGE_SIZE)
+    coordinator_challenge = _recv_exactly(sock, _CHALLENGE_SIZE)
+    sock.sendall(_answer(authkey, b"worker", coordinator_challenge) + challenge)
+    try:
+        answer = _recv_exactly(sock, _CHALLENGE_SIZE)
+    except ConnectionError:
+        # the coordinator hangs up on workers with the wrong key
+        raise multiprocessing.AuthenticationError(
+            "Coordinator closed the connection during authentication"
+        ) from None
+    if not hmac.compare_digest(answer, _answer(authkey, b"coordinator", challenge)):
+        raise multiprocessing.AuthenticationError("Coordinator failed to authenticate")
+
+
+def _content(value):
+    """
+    Returns a canonical form of value built from numbers, strings and
+    tuples: matrices by their exact entries, sequences item by item and
+    other objects by class and content attributes, sorted by name.
+    """
+    if value is None or isinstance(value, (bool, int, str, bytes)):
+        return value
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, matrix.Matrix):
+        return ("Matrix",) + value.key
+    if isinstance(value, tuples.Tuple):
+        return (type(value).__qualname__,) + tuple(float(item) for item in value)
+    if isinstance(value, np.ndarray):
+        return (value.dtype.str, value.shape, (value + 0).tobytes())
+    if isinstance(value, (list, tuple)):
+        return tuple(_content(item) for item in value)
+    fields = sorted(
+        (_CONTENT_ATTRIBUTES.get(name, name), _content(item))
+        for name, item in vars(value).items()
+        if name in _CONTENT_ATTRIBUTES
+        or not (name.startswith("_") or name in _NOT_CONTENT)
+    )
+    return (type(value).__module__, type(value).__qualname__, tuple(fields))
+
+
+def scene_digest(cam: camera.Camera, wor: world.World) -> str:
+    """
+    Returns the hash that identifies a scene by its content: the camera's
+    size, field of view and transform, the acceleration mode and the
+    transforms, materials and parameters of the world's objects and
+    lights. Caches built while rendering (inverse transforms, bounds,
+    acceleration structures) are left out, so the hash of a scene does
+    not change when it is rendered.
+    """
+    return hashlib.sha256(repr(_content((cam, wor))).encode()).hexdigest()
+
+
+class SceneCache:
+    """
+    The scenes a worker has received, by content hash, so that a scene is
+    sent to a worker once rather than with every tile, and not again for
+    later jobs that render the same scene.
+    """
+
+    def __init__(self, max_scenes: int = SCENE_CACHE_SIZE):
+        """
+        Constructor for the SceneCache class.
+        """
+        self.max_scenes = max_scenes
+        self._scenes = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        """
+        Returns a string representation of the cache.
+        """
+        return f"SceneCache(scenes={len(self._scenes)}, max_scenes={self.max_scenes})"
+
+    def __len__(self):
+        """
+        Returns the number of cached scenes.
+        """
+        return len(self._scenes)
+
+    def __contains__(self, digest: str):
+        """
+        Checks if a scene is cached.
+        """
+        return digest in self._scenes
+
+    def get(self, digest: str):
+        """
+        Returns the (camera, world) with the given hash, or None.
+        """
+        scene = self._scenes.get(digest)
+        if scene is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._scenes.move_to_end(digest)
+        return scene
+
+    def put(self, digest: str, data: bytes):
+        """
+        Unpacks a pickled (camera, world), checks it against its hash,
+        compiles the world and caches it. Returns the (camera, world).
+        """
+        cam, wor = pickle.loads(data)
+        if scene_digest(cam, wor) != digest:
+            raise ValueError("Scene does not match its hash")
+        wor.compile()
+        self._scenes[digest] = (cam, wor)
+        while len(self._scenes) > self.max_scenes:
+            self._scenes.popitem(last=False)
+        return cam, wor
+
+
+def run_worker(host: str, port: int, authkey: bytes, cache: SceneCache = None) -> int:
+    """
+    Connects to a coordinator and renders the tiles it sends until it
+    closes the connection. Returns the number of tiles rendered. Raises
+    multiprocessing.AuthenticationError if the coordinator does not share
+    authkey; nothing is unpickled before both sides have proven it.
+
+    The coordinator sends ("tile", digest, tile, engine); a worker that
+    does not have the scene answers ("need", digest) and receives
+    ("scene", digest, data) first. Each tile is answered with ("tile",
+    tile, colors, seconds), or ("error", tile, message) if it failed.
+    """
+    cache = SceneCache() if cache is None else cache
+    rendered = 0
+    with socket.create_connection((host, port)) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        _authenticate_coordinator(sock, authkey)
+        try:
+            while True:
+                message = _recv(sock)
+                if message[0] == "close":
+                    break
+                _, digest, tile, engine = message
+                scene = cache.get(digest)
+                if scene is None:
+                    _send(sock, ("need", digest))
+                    _, digest, data = _recv(sock)
+                    scene = cache.put(digest, data)
+                start = time.perf_counter()
+                try:
+                    colors = tiles.render_tile(*scene, tile, engine)
+                except Exception as error:
+                    _send(sock, ("error", tile, repr(error)))
+                    continue
+                _send(sock, ("tile", tile, colors, time.perf_counter() - start))
+                rendered += 1
+        except ConnectionError:
+            # the coordinator went away or gave up on this worker
+            pass
+    return rendered
+
+
+def local_workers(address, count: int, authkey: bytes):
+    """
+    Starts count worker processes on this machine, connected to the
+    coordinator at address with its authkey, and returns them. They exit when the
+    coordinator closes. Workers are spawned rather than forked, since the
+    coordinator's threads are already running.
+    """
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for _ in range(count):
+        process = context.Process(
+            target=run_worker, args=(*address, authkey), daemon=True
+        )
+        process.start()
+        processes.append(process)
+    return processes
+
+
+class _Job:
+    """
+    The state of one frame being rendered by a coordinator.
+    """
+
+    def __init__(self, cam: camera.Camera, wor: world.World, engine: str, tile_list):
+        self.scene = pickle.dumps((cam, wor), protocol=pickle.HIGHEST_PROTOCOL)
+        self.digest = scene_digest(cam, wor)
+        self.engine = engine
+        self.frame = np.zeros((cam.vsize, cam.hsize, 3))
+        self.remaining = set(tile_list)
+        self.timings = []
+        self.error = None
+        self.finished = False
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+
+    def complete(self, tile, colors, worker, seconds: float):
+        """
+        Writes a finished tile; a tile already written is ignored.
+        """
+        with self.lock:
+            if self.finished or tile not in self.remaining:
+                return
+            x_start, y_start, x_end, y_end = tile
+            self.frame[y_start:y_end, x_start:x_end] = np.reshape(
+                colors, (y_end - y_start, x_end - x_start, 3)
+            )
+            self.remaining.discard(tile)
+            self.timings.append((tile, worker, seconds))
+            if not self.remaining:
+                self.finished = True
+                self.done.set()
+
+    def fail(self, error: Exception):
+        """
+        Ends the job with an error.
+        """
+        with self.lock:
+            if not self.finished:
+                self.error = error
+                self.finished = True
+                self.done.set()
+
+
+class Coordinator:
+    """
+    Serves the tiles of a frame to workers connected over TCP (see
+    run_worker) and assembles their colors into a canvas. Workers may
+    connect at any time and take one tile at a time from a shared queue,
+    so faster workers render more tiles. A tile whose worker does not
+    answer within timeout seconds, or disconnects, goes back on the queue
+    for another worker, and that worker is dropped.
+
+    The camera and world of a job are pickled once and sent to each worker
+    at most once, on its first tile; workers cache them by a hash of their
+    content (see scene_digest), so rendering the same scene again sends
+    nothing.
+
+    Trust model: scenes, tiles and colors travel as pickles, and
+    unpickling can run arbitrary code, so a peer that gets a pickle
+    through is trusted with the process. Every connection therefore
+    starts with a mutual HMAC challenge on authkey, a secret shared by the
+    coordinator and its workers, and nothing is unpickled from a peer that
+    did not answer it. The traffic itself is not encrypted: on networks
+    that others can watch, tunnel it (e.g. over SSH).
+
+    Counters:
+        scenes_sent: scenes sent to workers
+        requeued: tiles handed to another worker after a timeout or a
+        disconnect
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        timeout: float = TILE_TIMEOUT,
+        authkey: bytes = None,
+    ):
+        """
+        Constructor for the Coordinator class. Listens on host:port (port
+        0 picks a free one, see address) and accepts workers right away.
+        Without an authkey a random one is made, which local_workers can
+        pass on (see the authkey attribute).
+        """
+        self.timeout = timeout
+        self.authkey = secrets.token_bytes(32) if authkey is None else authkey
+        self.scenes_sent = 0
+        self.requeued = 0
+        self._tiles = queue.Queue()
+        self._lock = threading.Lock()
+        self._connected = threading.Condition(self._lock)
+        self._workers = set()
+        self._handlers = []
+        self._closed = False
+        self._server = socket.create_server((host, port))
+        self.address = self._server.getsockname()[:2]
+        self._acceptor = threading.Thread(target=self._accept, daemon=True)
+        self._acceptor.start()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the coordinator.
+        """
+        host, port = self.address
+        return f"Coordinator(address={host}:{port}, workers={self.workers})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def workers(self) -> int:
+        """
+        Returns the number of connected workers.
+        """
+        with self._lock:
+            return len(self._workers)
+
+    def wait_for_workers(self, count: int, timeout: float = None) -> bool:
+        """
+        Waits until at least count workers are connected. Returns False if
+        the timeout ran out first.
+        """
+        with self._connected:
+            return self._connected.wait_for(
+                lambda: len(self._workers) >= count, timeout
+            )
+
+    def _accept(self):
+        """
+        Accepts connections until the coordinator closes, serving each
+        from a thread of its own once it has authenticated.
+        """
+        while True:
+            try:
+                conn, peer = self._server.accept()
+            except OSError:
+                return
+            conn.settimeout(self.timeout)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            handler = threading.Thread(
+                target=self._serve, args=(conn, f"{peer[0]}:{peer[1]}"), daemon=True
+            )
+            with self._lock:
+                if self._closed:
+                    conn.close()
+                    return
+                self._handlers.append(handler)
+            handler.start()
+
+    def _serve(self, conn: socket.socket, worker: str):
+        """
+        Authenticates a worker, then hands it queued tiles, one at a time,
+        until the coordinator closes or the worker fails to answer.
+        """
+        try:
+            _authenticate_worker(conn, self.authkey)
+        except (OSError, multiprocessing.AuthenticationError):
+            conn.close()
+            return
+        with self._lock:
+            self._workers.add(threading.current_thread())
+            self._connected.notify_all()
+        try:
+            while True:
+                item = self._tiles.get()
+                if item is None:
+                    try:
+                        _send(conn, ("close",))
+                    except OSError:
+                        pass
+                    return
+                job, tile = item
+                if job.finished:
+                    continue
+                try:
+                    reply = self._exchange(conn, job, tile)
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    # includes timeouts: let another worker have the tile
+                    with self._lock:
+                        self.requeued += 1
+                    self._tiles.put(item)
+                    return
+                if reply[0] == "error":
+                    message = f"Tile {tile} failed on {worker}: {reply[2]}"
+                    job.fail(RuntimeError(message))
+                else:
+                    _, tile, colors, seconds = reply
+                    job.complete(tile, colors, worker, seconds)
+        finally:
+            conn.close()
+            with self._lock:
+                self._workers.discard(threading.current_thread())
+
+    def _exchange(self, conn: socket.socket, job: _Job, tile):
+        """
+        Sends a tile to a worker, and the scene if the worker asks for it,
+        and returns the worker's answer.
+        """
+        _send(conn, ("tile", job.digest, tile, job.engine))
+        reply = _recv(conn)
+        if reply[0] == "need":
+            _send(conn, ("scene", job.digest, job.scene))
+            with self._lock:
+                self.scenes_sent += 1
+            reply = _recv(conn)
+        return reply
+
+    def render(
+        self,
+        cam: camera.Camera,
+        wor: world.World,
+        tile_size: int = tiles.DEFAULT_TILE_SIZE,
+        engine: str = "scalar",
+        scheduler: tiles.TileScheduler = None,
+    ) -> canvas.Canvas:
+        """
+        Renders the frame on the connected workers and returns the canvas,
+        which is the image tiles.render_tiles gives for the same tile_size
+        and engine. Tiles are dispatched in the scheduler's order (expensive
+        first by default), and the scheduler reports each worker's
+        utilisation. Raises RuntimeError if a tile fails, or if no worker
+        is connected for timeout seconds while tiles are waiting.
+        """
+        if self._closed:
+            raise RuntimeError("Coordinator is closed")
+        if engine not in ("scalar", "wavefront"):
+            raise ValueError(f"Unknown render engine: {engine}")
+        tile_list = tiles.split_tiles(cam.hsize, cam.vsize, tile_size)
+        if scheduler is None and len(tile_list) > 1:
+            scheduler = tiles.TileScheduler()
+        if scheduler is not None:
+            tile_list = scheduler.schedule(cam, wor, tile_list, engine)
+        job = _Job(cam, wor, engine, tile_list)
+        start = time.perf_counter()
+        for tile in tile_list:
+            self._tiles.put((job, tile))
+        while not job.done.wait(self.timeout):
+            if not self.workers:
+                job.fail(RuntimeError("No workers are connected"))
+        wall_time = time.perf_counter() - start
+        if job.error is not None:
+            raise job.error
+        if scheduler is not None:
+            workers = {worker for _, worker, _ in job.timings}
+            scheduler.record(job.timings, wall_time, len(workers))
+        return canvas.Canvas.from_array(job.frame)
+
+    def close(self):
+        """
+        Stops accepting workers and disconnects the connected ones, which
+        then exit.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            handlers = list(self._handlers)
+        try:
+            # wakes the blocked accept()
+            self._server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._server.close()
+        self._acceptor.join()
+        # tiles of a failed job may still be queued ahead of the sentinels
+        while True:
+            try:
+                self._tiles.get_nowait()
+            except queue.Empty:
+                break
+        for _ in handlers:
+            self._tiles.put(None)
+        for handler in handlers:
+            handler.join()
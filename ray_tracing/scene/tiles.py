@@ -0,0 +1,408 @@
+"""
+This module renders a camera's frame in tiles, optionally in a pool of
+worker processes or threads.
+"""
+from __future__ import annotations
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import concurrent.futures
+import pickle
+import threading
+import time
+import typing
+import numpy as np
+import ray_tracing.elements.canvas as canvas
+
+if typing.TYPE_CHECKING:
+    import ray_tracing.scene.camera as camera
+    import ray_tracing.scene.world as world
+
+DEFAULT_TILE_SIZE = 32
+# seconds between a worker's checks that the rendering process is alive
+PARENT_POLL_INTERVAL = 0.5
+# the cost pre-pass traces every PREPASS_STRIDE-th pixel in x and y
+PREPASS_STRIDE = 8
+SCHEDULE_ORDERS = ("cost", "row")
+EXECUTORS = ("processes", "threads")
+
+
+def split_tiles(hsize: int, vsize: int, tile_size: int = DEFAULT_TILE_SIZE):
+    """
+    Returns the (x_start, y_start, x_end, y_end) rectangles of tile_size x
+    tile_size pixels (smaller at the right and bottom edges) covering the
+    frame, row by row.
+    """
+    if tile_size < 1:
+        raise ValueError("tile_size must be at least 1")
+    return [
+        (x, y, min(x + tile_size, hsize), min(y + tile_size, vsize))
+        for y in range(0, vsize, tile_size)
+        for x in range(0, hsize, tile_size)
+    ]
+
+
+def tile_pixels(tile) -> np.ndarray:
+    """
+    Returns the (x, y) indices of the pixels of a tile as an N x 2 array,
+    in row-major order.
+    """
+    x_start, y_start, x_end, y_end = tile
+    py, px = np.mgrid[y_start:y_end, x_start:x_end]
+    return np.column_stack([px.ravel(), py.ravel()])
+
+
+def render_tile(
+    cam: camera.Camera, wor: world.World, tile, engine: str = "scalar"
+) -> np.ndarray:
+    """
+    Renders the pixels of one tile, returning their colors as an N x 3
+    array in row-major order. Each pixel depends only on the world and its
+    own ray, so a tile renders the same wherever it runs.
+    """
+    if engine == "wavefront":
+        return wor.color_at_batch(cam.rays_for_region(*tile))
+    if engine != "scalar":
+        raise ValueError(f"Unknown render engine: {engine}")
+    x_start, y_start, x_end, y_end = tile
+    colors = np.empty(((y_end - y_start) * (x_end - x_start), 3))
+    k = 0
+    for y in range(y_start, y_end):
+        for x in range(x_start, x_end):
+            color = wor.color_at(cam.ray_for_pixel(x, y))
+            colors[k] = (color.r(), color.g(), color.b())
+            k += 1
+    return colors
+
+
+class TileScheduler:
+    """
+    Orders the tiles of a frame so that the most expensive ones are
+    dispatched first; idle workers then take the remaining tiles from the
+    queue one at a time, so cheap tiles fill the gaps at the end of the
+    frame. Tile costs come from the render times measured in the previous
+    frame rendered with the same scheduler or, when there is none, from a
+    low-resolution pre-pass over every stride-th pixel, traced with the
+    engine of the render. The pre-pass runs serially in the rendering
+    process before any tile is dispatched.
+
+    After each frame, report holds the wall time of the tiles, the frame
+    time (the pre-pass time plus the wall time) and, per worker process or
+    thread, the tiles rendered, the busy time and the utilisation (busy
+    time over the frame time, so workers count as idle during the
+    pre-pass).
+    """
+
+    def __init__(self, order: str = "cost", stride: int = PREPASS_STRIDE):
+        """
+        Constructor for the TileScheduler class.
+        order="cost" dispatches expensive tiles first; order="row" keeps
+        the tiles in row order, still handing them to idle workers.
+        """
+        if order not in SCHEDULE_ORDERS:
+            raise ValueError(f"Unknown tile order: {order}")
+        self.order = order
+        self.stride = stride
+        self.costs = {}
+        self.estimates = {}
+        self.source = None
+        self.prepass_time = 0.0
+        self.report = None
+
+    def __repr__(self):
+        """
+        Returns a string representation of the scheduler.
+        """
+        return f"TileScheduler(order={self.order!r}, stride={self.stride})"
+
+    def prepass(
+        self, cam: camera.Camera, wor: world.World, tile_list, engine: str = "scalar"
+    ):
+        """
+        Estimates the cost of each tile by timing the rays of a sparse grid
+        of its pixels (at least its center), scaled to the tile's area.
+        With the wavefront engine the samples of a tile are traced as one
+        batch, so the estimates include the engine's per-batch overhead.
+        The world's structure is built before the timing starts, and the
+        samples are timed in CPU time so that other processes running on
+        the machine do not skew the estimates.
+        """
+        if engine not in ("scalar", "wavefront"):
+            raise ValueError(f"Unknown render engine: {engine}")
+        start = time.perf_counter()
+        wor.compile()
+        half = self.stride // 2
+        estimates = {}
+        for tile in tile_list:
+            x_start, y_start, x_end, y_end = tile
+            xs = range(x_start + half, x_end, self.stride) or [(x_start + x_end) // 2]
+            ys = range(y_start + half, y_end, self.stride) or [(y_start + y_end) // 2]
+            if engine == "wavefront":
+                py, px = np.meshgrid(ys, xs, indexing="ij")
+                batch = cam.rays_for_pixels(px.ravel(), py.ravel())
+                sample_start = time.process_time()
+                wor.color_at_batch(batch)
+            else:
+                sample_start = time.process_time()
+                for y in ys:
+                    for x in xs:
+                        wor.color_at(cam.ray_for_pixel(x, y))
+            elapsed = time.process_time() - sample_start
+            area = (x_end - x_start) * (y_end - y_start)
+            estimates[tile] = elapsed * area / (len(xs) * len(ys))
+        self.prepass_time = time.perf_counter() - start
+        return estimates
+
+    def schedule(
+        self, cam: camera.Camera, wor: world.World, tile_list, engine: str = "scalar"
+    ):
+        """
+        Returns the tiles in dispatch order; engine is the one the frame
+        will be rendered with.
+        """
+        self.prepass_time = 0.0
+        if self.order == "row":
+            self.source = None
+            self.estimates = {}
+            return list(tile_list)
+        if tile_list and all(tile in self.costs for tile in tile_list):
+            self.source = "previous frame"
+            self.estimates = {tile: self.costs[tile] for tile in tile_list}
+        else:
+            self.source = "prepass"
+            self.estimates = self.prepass(cam, wor, tile_list, engine)
+        # ties keep row order, so the order is reproducible
+        return sorted(tile_list, key=lambda tile: -self.estimates[tile])
+
+    def record(self, timings, wall_time: float, workers: int):
+        """
+        Records the (tile, worker id, seconds) timings of a frame as the
+        cost estimates of the next frame and builds the report. wall_time
+        runs from the first dispatch to the last completed tile; the
+        utilisation is taken over the frame time, which adds the pre-pass.
+        """
+        self.costs = {tile: seconds for tile, _, seconds in timings}
+        per_worker = {}
+        for _, worker, seconds in timings:
+            entry = per_worker.setdefault(
+                worker, {"worker": worker, "tiles": 0, "busy": 0.0}
+            )
+            entry["tiles"] += 1
+            entry["busy"] += seconds
+        wall_time = max(wall_time, 1e-9)
+        frame_time = self.prepass_time + wall_time
+        for entry in per_worker.values():
+            entry["utilisation"] = entry["busy"] / frame_time
+        busy = sum(entry["busy"] for entry in per_worker.values())
+        self.report = {
+            "order": self.order,
+            "source": self.source,
+            "prepass_time": self.prepass_time,
+            "wall_time": wall_time,
+            "frame_time": frame_time,
+            "tiles": len(timings),
+            "workers": sorted(per_worker.values(), key=lambda entry: entry["worker"]),
+            "utilisation": busy / (frame_time * max(workers, 1)),
+        }
+        return self.report
+
+
+# state of a worker process, set once by _init_worker
+_worker_camera = None
+_worker_world = None
+_worker_engine = None
+_worker_frame = None
+
+
+def _exit_with_parent(parent_pid: int):
+    """
+    Ends the worker once its parent has died. Orphaned workers would
+    otherwise wait for tiles forever and keep the multiprocessing resource
+    tracker, which unlinks the framebuffer of a crashed parent, alive.
+    """
+    while os.getppid() == parent_pid:
+        time.sleep(PARENT_POLL_INTERVAL)
+    os._exit(1)
+
+
+def _init_worker(scene: bytes, engine: str, frame=None):
+    """
+    Unpacks the camera and world shipped to a worker process, builds the
+    world's acceleration structure once for all its tiles and attaches to
+    the shared framebuffer, given as (name, width, height), if any.
+    """
+    global _worker_camera, _worker_world, _worker_engine, _worker_frame
+    threading.Thread(
+        target=_exit_with_parent, args=(os.getppid(),), daemon=True
+    ).start()
+    _worker_camera, _worker_world = pickle.loads(scene)
+    _worker_engine = engine
+    _worker_world.compile()
+    if frame is not None:
+        _worker_frame = canvas.SharedCanvas.attach(*frame)
+
+
+def _render_worker_tile(tile):
+    """
+    Renders a tile in a worker process. Returns the tile, its colors (None
+    when they were written to the shared framebuffer instead, in which
+    case the result is just a completion notice), the worker's process id
+    and the render time.
+    """
+    start = time.perf_counter()
+    colors = render_tile(_worker_camera, _worker_world, tile, _worker_engine)
+    if _worker_frame is not None:
+        _worker_frame.write_tile(tile, colors)
+        colors = None
+    return tile, colors, os.getpid(), time.perf_counter() - start
+
+
+def _render_in_pool(processes: int, initargs, tile_list):
+    """
+    Yields the results of _render_worker_tile as worker processes finish
+    the tiles, which are queued in the given order and taken by whichever
+    worker is idle. If a tile fails, or a worker dies (BrokenProcessPool),
+    the pending tiles are cancelled and the error is raised.
+    """
+    executor = concurrent.futures.ProcessPoolExecutor(
+        processes, initializer=_init_worker, initargs=initargs
+    )
+    try:
+        futures = [executor.submit(_render_worker_tile, tile) for tile in tile_list]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _init_thread(local: threading.local, wor: world.World):
+    """
+    Gives a render thread its own view of the world (see World.thread_view).
+    """
+    local.world = wor.thread_view()
+
+
+def _render_in_threads(
+    threads: int, cam: camera.Camera, wor: world.World, engine: str, tile_list, frame
+):
+    """
+    Renders the tiles in a pool of threads, which write straight into
+    frame, a height x width x 3 array, and yields the tile, the thread's
+    name and the render time as the tiles finish. Tiles are taken in the
+    given order by whichever thread is idle; if one fails, the pending
+    tiles are cancelled and the error is raised.
+    """
+    local = threading.local()
+
+    def render(tile):
+        start = time.perf_counter()
+        x_start, y_start, x_end, y_end = tile
+        colors = render_tile(cam, local.world, tile, engine)
+        frame[y_start:y_end, x_start:x_end] = colors.reshape(
+            y_end - y_start, x_end - x_start, 3
+        )
+        return tile, threading.current_thread().name, time.perf_counter() - start
+
+    executor = concurrent.futures.ThreadPoolExecutor(
+        threads,
+        thread_name_prefix="render",
+        initializer=_init_thread,
+        initargs=(local, wor),
+    )
+    try:
+        futures = [executor.submit(render, tile) for tile in tile_list]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def render_tiles(
+    cam: camera.Camera,
+    wor: world.World,
+    workers: int = 1,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    engine: str = "scalar",
+    shared: bool = True,
+    scheduler: TileScheduler = None,
+    executor: str = "processes",
+) -> canvas.Canvas:
+    """
+    Renders the frame tile by tile. With more than one worker, the tiles
+    are rendered in a process pool; the camera and world are pickled once
+    and unpacked once per worker rather than sent with every tile. The
+    image depends on tile_size and engine but not on the number of workers.
+
+    With shared (the default), workers write their tiles straight into a
+    SharedCanvas and send back only completion notices; the block is
+    unlinked once the frame is copied out, or when a worker fails.
+
+    The scheduler decides the dispatch order and reports utilisation; pass
+    the same one for every frame of an animation to reuse the measured
+    tile costs. Multi-worker renders get a new cost-ordered one by default.
+
+    With executor="threads", the workers are threads of this process
+    instead: nothing is pickled and the tiles are written straight into
+    one array, but only the array stages of the wavefront engine, which
+    release the GIL inside numpy, run in parallel; the scalar engine is
+    serialised by the GIL. Each thread has its own occluder cache; the
+    traversal counters of the shared acceleration structure may undercount.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {executor}")
+    tile_list = split_tiles(cam.hsize, cam.vsize, tile_size)
+    if workers > 1 and len(tile_list) > 1 and scheduler is None:
+        scheduler = TileScheduler()
+    if scheduler is not None:
+        tile_list = scheduler.schedule(cam, wor, tile_list, engine)
+    timings = []
+    start = time.perf_counter()
+
+    if workers == 1 or len(tile_list) <= 1:
+        workers = 1
+        image = canvas.Canvas(cam.hsize, cam.vsize)
+        for tile in tile_list:
+            tile_start = time.perf_counter()
+            image.write_pixels(tile_pixels(tile), render_tile(cam, wor, tile, engine))
+            timings.append((tile, os.getpid(), time.perf_counter() - tile_start))
+        wall_time = time.perf_counter() - start
+    elif executor == "threads":
+        workers = min(workers, len(tile_list))
+        # build the structure and compiled scene once, before the threads share them
+        wor.compile()
+        frame = np.zeros((cam.vsize, cam.hsize, 3))
+        for tile, worker, seconds in _render_in_threads(
+            workers, cam, wor, engine, tile_list, frame
+        ):
+            timings.append((tile, worker, seconds))
+        wall_time = time.perf_counter() - start
+        image = canvas.Canvas.from_array(frame)
+    else:
+        scene = pickle.dumps((cam, wor))
+        workers = min(workers, len(tile_list))
+        if not shared:
+            image = canvas.Canvas(cam.hsize, cam.vsize)
+            for tile, colors, worker, seconds in _render_in_pool(
+                workers, (scene, engine), tile_list
+            ):
+                image.write_pixels(tile_pixels(tile), colors)
+                timings.append((tile, worker, seconds))
+            wall_time = time.perf_counter() - start
+        else:
+            with canvas.SharedCanvas(cam.hsize, cam.vsize) as frame:
+                initargs = (scene, engine, (frame.name, cam.hsize, cam.vsize))
+                for tile, _, worker, seconds in _render_in_pool(
+                    workers, initargs, tile_list
+                ):
+                    timings.append((tile, worker, seconds))
+                wall_time = time.perf_counter() - start
+                image = frame.to_canvas()
+
+    if scheduler is not None:
+        scheduler.record(timings, wall_time, workers)
+    return image
@@ -9,8 +9,10 @@ package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, package_path)
 
 from typing import List, Union
+import copy
 import numpy as np
 import math
+import time
 from ray_tracing.utils.constants import *
 import ray_tracing.elements.tuples as tuples
 import ray_tracing.elements.matrix as matrix
@@ -19,6 +21,17 @@ import ray_tracing.elements.lights as lights
 import ray_tracing.elements.materials as materials
 import ray_tracing.elements.shapes as shapes
 import ray_tracing.operations.intersection as intersection
+import ray_tracing.operations.bvh as bvh
+import ray_tracing.operations.grid as grid
+import ray_tracing.operations.occluder_cache as occluder_cache
+import ray_tracing.utils.changes as changes
+import ray_tracing.scene.compiled_scene as compiled_scene
+
+# worlds with fewer bounded objects than this are intersected by brute force
+# when acceleration is "auto"
+BVH_MIN_OBJECTS = 8
+ACCELERATORS = {"bvh": bvh.BVH, "grid": grid.UniformGrid}
+ACCELERATIONS = ("auto", "none") + tuple(ACCELERATORS)
 
 
 class World:
@@ -29,6 +42,10 @@ class World:
     def __init__(self):
         self.objects = []
         self.lights = []
+        self.acceleration = "auto"
+        self.occluder_cache = occluder_cache.OccluderCache()
+        self._start_watching()
+        self.invalidate_acceleration()
 
     def __eq__(self, other):
         return self.objects == other.objects and self.lights == other.lights
@@ -42,17 +59,51 @@ class World:
     def __hash__(self):
         return hash((self.objects, self.lights))
 
+    def _derived(self, objects, lights):
+        """
+        Returns a world of the same class and settings holding the given
+        objects and lights, without building anything.
+        """
+        other = self.__class__.__new__(self.__class__)
+        World.__init__(other)
+        other.objects = objects
+        other.lights = lights
+        other.acceleration = self.acceleration
+        other.occluder_cache.enabled = self.occluder_cache.enabled
+        return other
+
     def __copy__(self):
-        return World(self.objects, self.lights)
+        return self._derived(list(self.objects), list(self.lights))
 
     def __deepcopy__(self, memo):
-        return World(self.objects, self.lights)
+        other = self._derived([], [])
+        memo[id(self)] = other
+        other.objects = copy.deepcopy(self.objects, memo)
+        other.lights = copy.deepcopy(self.lights, memo)
+        return other
 
     def __getstate__(self):
-        return (self.objects, self.lights)
+        return (self.objects, self.lights, self.acceleration)
 
     def __setstate__(self, state):
-        self.objects, self.lights = state
+        self.objects, self.lights = state[0], state[1]
+        self.acceleration = state[2] if len(state) > 2 else "auto"
+        self.occluder_cache = occluder_cache.OccluderCache()
+        self._start_watching()
+        self.invalidate_acceleration()
+
+    def _start_watching(self):
+        """
+        Creates the counters that the world's objects increment when their
+        transforms change (geometry) and that its objects, materials and
+        lights increment when the shading inputs change (appearance). Only
+        objects of this world are watched, so shapes created or edited
+        elsewhere do not make its caches stale.
+        """
+        self._geometry = changes.ChangeCounter()
+        self._watched = []
+        self._appearance = changes.ChangeCounter()
+        self._appearance_watched = []
 
     def __len__(self):
         return len(self.objects) + len(self.lights)
@@ -70,24 +121,29 @@ class World:
     def __setitem__(self, key, value):
         if key < len(self.objects):
             self.objects[key] = value
+            self.invalidate_acceleration()
         else:
             self.lights[key - len(self.objects)] = value
+            self.invalidate_compiled()
 
     def __delitem__(self, key):
         if key < len(self.objects):
             del self.objects[key]
+            self.invalidate_acceleration()
         else:
             del self.lights[key - len(self.objects)]
+            self.invalidate_compiled()
 
     def __contains__(self, item):
         return item in self.objects or item in self.lights
 
     def __add__(self, other):
-        return World(self.objects + other.objects, self.lights + other.lights)
+        return self._derived(self.objects + other.objects, self.lights + other.lights)
 
     def __iadd__(self, other):
         self.objects += other.objects
         self.lights += other.lights
+        self.invalidate_acceleration()
         return self
 
     def num_objects(self):
@@ -112,6 +168,7 @@ class World:
             self.objects += obj
         else:
             raise TypeError("Invalid type for object")
+        self.invalidate_acceleration()
 
     def add_light(self, light: Union[lights.Light, List[lights.Light]]):
         """
@@ -123,6 +180,7 @@ class World:
             self.lights += light
         else:
             raise TypeError("Invalid type for light")
+        self.invalidate_compiled()
 
     def replace_lights(self, new_lights: Union[List[lights.Light], lights.Light]):
         """
@@ -134,6 +192,7 @@ class World:
             self.lights = new_lights
         else:
             raise TypeError("Invalid type for lights")
+        self.invalidate_compiled()
 
     def replace_objects(self, new_objects: Union[List[shapes.Shape], shapes.Shape]):
         """
@@ -145,15 +204,239 @@ class World:
             self.objects = new_objects
         else:
             raise TypeError("Invalid type for objects")
+        self.invalidate_acceleration()
+
+    def invalidate_acceleration(self):
+        """
+        Drops the acceleration structure; it is rebuilt on the next query.
+        Only needed after editing self.objects in place, the world methods
+        and shape transforms invalidate it on their own.
+        """
+        self._structure = None
+        self._structure_key = None
+        self._unbounded = None
+        self._compiled = None
+        self.occluder_cache.clear()
+
+    def invalidate_compiled(self):
+        """
+        Drops the compiled scene; it is rebuilt by the next compile().
+        Only needed after editing self.lights, or a material's color or a
+        light's position, in place (e.g. with set_color); assigning a
+        material or light property notifies the world on its own.
+        """
+        self._compiled = None
+
+    def _acceleration_key(self):
+        return (
+            self.acceleration,
+            id(self.objects),
+            len(self.objects),
+            self._geometry.value,
+        )
+
+    def _accelerator(self):
+        """
+        Returns the acceleration structure over the bounded objects,
+        building it if the objects changed, or None when the world is
+        intersected by brute force.
+        """
+        if self.acceleration not in ACCELERATIONS:
+            raise ValueError(f"Unknown acceleration: {self.acceleration}")
+        key = self._acceleration_key()
+        if key != self._structure_key:
+            # cached occluders may have moved or left the world
+            self.occluder_cache.clear()
+            for obj in self._watched:
+                obj.unwatch(self._geometry, "transform")
+            self._watched = list(self.objects)
+            for obj in self._watched:
+                obj.watch(self._geometry, "transform")
+            bounded, bounded_indices, unbounded = [], [], []
+            for index, obj in enumerate(self.objects):
+                if obj.world_bounds().is_bounded():
+                    bounded.append(obj)
+                    bounded_indices.append(index)
+                else:
+                    unbounded.append(index)
+            if self.acceleration == "auto":
+                kind = "bvh" if len(bounded) >= BVH_MIN_OBJECTS else None
+            elif self.acceleration == "none":
+                kind = None
+            else:
+                kind = self.acceleration
+            if kind is None:
+                self._structure = None
+            else:
+                self._structure = ACCELERATORS[kind](bounded, bounded_indices)
+            self._unbounded = unbounded
+            self._structure_key = key
+        return self._structure
+
+    def compile(self) -> compiled_scene.CompiledScene:
+        """
+        Returns the world flattened into a frozen CompiledScene: shape type
+        codes, stacked transforms, material and light arrays and the
+        acceleration structure. The scene is cached until the objects,
+        lights, any of their transforms, materials or light properties
+        change.
+        """
+        structure = self._accelerator()
+        key = self._acceleration_key() + (
+            id(self.lights),
+            len(self.lights),
+            self._appearance.value,
+        )
+        if self._compiled is None or self._compiled.key != key:
+            for item, aspect in self._appearance_watched:
+                item.unwatch(self._appearance, aspect)
+            self._appearance_watched = (
+                [(obj, "material") for obj in self.objects]
+                + [(obj.material, "") for obj in self.objects]
+                + [(light, "") for light in self.lights]
+            )
+            for item, aspect in self._appearance_watched:
+                item.watch(self._appearance, aspect)
+            self._compiled = compiled_scene.CompiledScene(
+                self.objects, self.lights, structure, self._unbounded, key
+            )
+        return self._compiled
+
+    def thread_view(self):
+        """
+        Returns a world over the same object and light lists that shares
+        this world's acceleration structure and compiled scene (built here
+        if needed) but has its own occluder cache, for one render thread.
+        The cache is the only state a render writes to; a cache per thread
+        stays coherent with the tiles that thread traces.
+        """
+        scene = self.compile()
+        other = self._derived(self.objects, self.lights)
+        # the same counter, so that the shared structure's key stays valid
+        other._geometry = self._geometry
+        other._watched = self._watched
+        other._appearance = self._appearance
+        other._appearance_watched = self._appearance_watched
+        other._structure = self._structure
+        other._structure_key = self._structure_key
+        other._unbounded = self._unbounded
+        other._compiled = scene
+        return other
+
+    def update_transforms(self, transforms):
+        """
+        Sets the transforms of some objects, e.g. between animation frames.
+        transforms is a dict from object index to new transform, or a list
+        of (object or object index, new transform) pairs. A BVH is refitted
+        bottom-up around the moved objects instead of being rebuilt, unless
+        refitting has degraded it past bvh.REBUILD_COST_RATIO or an object
+        became (un)bounded. Returns a report with the update mode ("refit",
+        "rebuild" or "none"), the time taken in seconds and the SAH cost
+        ratio of the hierarchy.
+        """
+        start = time.perf_counter()
+        accelerator = self._accelerator()
+        positions = None
+        updates = []
+        if isinstance(transforms, dict):
+            transforms = transforms.items()
+        for key, transform in transforms:
+            if isinstance(key, shapes.Shape):
+                if positions is None:
+                    positions = {id(obj): i for i, obj in enumerate(self.objects)}
+                if id(key) not in positions:
+                    raise ValueError("Object is not in the world")
+                key = positions[id(key)]
+            updates.append((key, transform))
+        moved = []
+        for index, transform in updates:
+            obj = self.objects[index]
+            obj.transform = transform
+            moved.append(index)
+
+        mode = "rebuild"
+        if isinstance(accelerator, bvh.BVH) and all(
+            (index in accelerator.position_of)
+            == self.objects[index].world_bounds().is_bounded()
+            for index in moved
+        ):
+            accelerator.refit(moved)
+            if not accelerator.needs_rebuild():
+                mode = "refit"
+                self._structure_key = self._acceleration_key()
+        if mode == "rebuild":
+            self._structure_key = None
+        # the structure, unbounded list and cache are brought up to date here
+        accelerator = self._accelerator()
+        if accelerator is None:
+            mode = "none"
+        self._compiled = None
+        return {
+            "mode": mode,
+            "time": time.perf_counter() - start,
+            "cost_ratio": (
+                accelerator.cost_ratio() if isinstance(accelerator, bvh.BVH) else None
+            ),
+        }
+
+    def acceleration_stats(self):
+        """
+        Returns the build and traversal statistics of the acceleration
+        structure, or None when the world is intersected by brute force.
+        """
+        accelerator = self._accelerator()
+        if accelerator is None:
+            return None
+        stats = accelerator.stats()
+        stats["structure"] = (
+            "grid" if isinstance(accelerator, grid.UniformGrid) else "bvh"
+        )
+        stats["unbounded"] = len(self._unbounded)
+        return stats
 
     def intersect_world(self, ray: rays.Ray) -> intersection.Intersections:
         """
         Intersects the world with a ray
         """
-        intersections = intersection.Intersections()
-        for obj in self.objects:
-            intersections += obj.intersect(ray)
-        return intersections
+        accelerator = self._accelerator()
+        if accelerator is None:
+            candidates = range(len(self.objects))
+            ts, indices = [], []
+        else:
+            candidates = self._unbounded
+            ts, indices = accelerator.intersect(ray)
+        for index in candidates:
+            for t in self.objects[index].intersect_ts(ray):
+                ts.append(t)
+                indices.append(index)
+        return intersection.Intersections.from_arrays(ts, indices, self.objects)
+
+    def closest_hit(
+        self, ray: rays.Ray, t_max: float = math.inf
+    ) -> Union[intersection.Hit, None]:
+        """
+        Returns the nearest hit with 0 < t < t_max, or None. The best t so
+        far is passed on as the t_max of every later shape, so farther
+        objects are rejected by their bounds without being intersected.
+        """
+        accelerator = self._accelerator()
+        best = None
+        # unbounded objects such as floors often give a tight t_max early
+        candidates = (
+            range(len(self.objects)) if accelerator is None else self._unbounded
+        )
+        for index in candidates:
+            obj = self.objects[index]
+            found = obj.closest_t(ray, t_max)
+            if found is not None:
+                t_max = found[0]
+                best = intersection.Hit(found[0], obj, index, found[1])
+        if accelerator is not None:
+            found = accelerator.closest(ray, t_max)
+            if found is not None:
+                t, index, local_ray = found
+                best = intersection.Hit(t, self.objects[index], index, local_ray)
+        return best
 
     def shade_hit(
         self, comps: intersection.IntersectionComputations, remaining: int = 5
@@ -163,7 +446,7 @@ class World:
         """
         surface = BLACK
         for light in self.lights:
-            in_shadow = self.is_shadowed(comps.over_point)
+            in_shadow = self.is_shadowed(comps.over_point, light)
             surface += light.lighting(
                 comps.get_object().material,
                 comps.get_point(),
@@ -185,32 +468,221 @@ class World:
         """
         Returns the color at a ray
         """
-        intersections = self.intersect_world(ray)
-        hit = intersections.get_first_hit()
+        hit = self.closest_hit(ray)
         if hit is None:
             return BLACK
         else:
             comps = hit.prepare_computations(ray)
             return self.shade_hit(comps, remaining)
 
-    def is_shadowed(self, point: tuples.Point):
+    def occluded(
+        self, origin: tuples.Point, direction: tuples.Vector, max_distance: float
+    ) -> bool:
+        """
+        Checks if any object blocks the segment from origin, along direction,
+        shorter than max_distance. Returns as soon as one blocker is found.
+        """
+        ray = rays.Ray(origin, direction.normalize())
+        return self._occluder(ray, max_distance) is not None
+
+    def _occluder(self, ray: rays.Ray, max_distance: float):
+        """
+        Returns an object blocking the normalized ray before max_distance, or None.
+        """
+        accelerator = self._accelerator()
+        if accelerator is None:
+            candidates = self.objects
+        else:
+            blocker = accelerator.occluder(ray, max_distance)
+            if blocker is not None:
+                return blocker
+            candidates = [self.objects[index] for index in self._unbounded]
+        for obj in candidates:
+            if obj.occludes(ray, max_distance):
+                return obj
+        return None
+
+    def is_shadowed(self, point: tuples.Point, light: lights.Light = None):
         """
-        Checks if a point is shadowed
+        Checks if a point is shadowed from a light (the first light by default).
+        The light's last occluder is tested before a full occlusion query.
         """
-        # checking for the first light only
-        v = self.lights[0].position - point
+        if light is None:
+            light = self.lights[0]
+        v = light.position - point
         distance = v.magnitude()
-        direction = v.normalize()
-        r = rays.Ray(point, direction)
-        intersections = self.intersect_world(r)
-        if (
-            intersections is not None
-            and intersections.get_first_hit() is not None
-            and intersections.get_first_hit().get_t() < distance
-        ):
-            return True
+        ray = rays.Ray(point, v.normalize())
+        cache = self.occluder_cache
+        if not cache.enabled:
+            return self._occluder(ray, distance) is not None
+        # the full query may rebuild the structure and clear the cache,
+        # so look up the cached occluder after validating it
+        self._accelerator()
+        cached = cache.get(light)
+        if cached is not None:
+            if cached.occludes(ray, distance):
+                cache.record(hits=1, misses=0, full_queries=0)
+                return True
+            cache.record(hits=0, misses=1, full_queries=1)
         else:
+            cache.record(hits=0, misses=0, full_queries=1)
+        blocker = self._occluder(ray, distance)
+        if blocker is None:
+            # neighbouring points are likely unshadowed too
+            cache.forget(light)
             return False
+        cache.remember(light, blocker)
+        return True
+
+    def occluded_batch(
+        self, origins: np.ndarray, directions: np.ndarray, max_distances: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized occluded: checks which of N segments, given as N x 3
+        origins and directions and N distances, are blocked by an object.
+        """
+        return self._occluders_batch(origins, directions, max_distances) >= 0
+
+    def _occluders_batch(
+        self, origins: np.ndarray, directions: np.ndarray, max_distances: np.ndarray
+    ) -> np.ndarray:
+        """
+        Returns, for each of N segments, the index in self.objects of an
+        object blocking it, or -1.
+        """
+        lengths = np.linalg.norm(directions, axis=1)
+        batch = rays.RayBatch(origins, directions / lengths[:, np.newaxis])
+        best_t = np.array(max_distances, dtype=np.float64)
+        best_index = np.full(len(batch), -1, dtype=np.int64)
+        accelerator = self._accelerator()
+        if accelerator is None:
+            candidates = range(len(self.objects))
+        else:
+            accelerator.intersect_batch(batch, best_t, best_index, any_hit=True)
+            candidates = self._unbounded
+        for index in candidates:
+            open_rays = np.flatnonzero(best_index < 0)
+            if len(open_rays) == 0:
+                break
+            ts, _ = self.objects[index].intersect_batch(batch[open_rays])
+            ts = np.where(ts > 0, ts, np.inf).min(axis=1)
+            best_index[open_rays[ts < best_t[open_rays]]] = index
+        return best_index
+
+    def intersect_world_batch(self, batch: rays.RayBatch):
+        """
+        Finds the nearest positive intersection of every ray in a batch.
+        Returns the t values (np.inf on a miss) and the index of the hit
+        object in self.objects (-1 on a miss).
+        """
+        best_t = np.full(len(batch), np.inf)
+        best_index = np.full(len(batch), -1, dtype=np.int64)
+        accelerator = self._accelerator()
+        if accelerator is None:
+            candidates = range(len(self.objects))
+        else:
+            accelerator.intersect_batch(batch, best_t, best_index)
+            candidates = self._unbounded
+        for index in candidates:
+            ts, _ = self.objects[index].intersect_batch(batch)
+            ts = np.where(ts > 0, ts, np.inf).min(axis=1)
+            closer = ts < best_t
+            best_t[closer] = ts[closer]
+            best_index[closer] = index
+        return best_t, best_index
+
+    def prepare_computations_batch(
+        self, batch: rays.RayBatch, ts: np.ndarray, indices: np.ndarray
+    ) -> intersection.IntersectionComputationsBatch:
+        """
+        Prepares the computations for one hit per ray of the batch.
+        Every ray of the batch must have hit an object.
+        """
+        points = batch.position(ts)
+        eye_vectors = -batch.directions
+        normal_vectors = self.compile().normal_at_batch(indices, points)
+        inside = np.einsum("ij,ij->i", normal_vectors, eye_vectors) < 0
+        normal_vectors[inside] = -normal_vectors[inside]
+        return intersection.IntersectionComputationsBatch(
+            ts, indices, points, eye_vectors, normal_vectors, inside
+        )
+
+    def is_shadowed_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Checks which of an N x 3 array of points are shadowed from each
+        light. Returns an N x L mask. Each light's last occluder is tested
+        first, then the remaining shadow rays of all lights are traced
+        together.
+        """
+        count = len(points)
+        cache = self.occluder_cache
+        scene = self.compile()
+        blocked = np.zeros((len(self.lights), count), dtype=bool)
+        directions = np.empty((len(self.lights), count, 3))
+        distances = np.empty((len(self.lights), count))
+        for k, light in enumerate(self.lights):
+            v = scene.light_positions[k] - points
+            distances[k] = np.linalg.norm(v, axis=1)
+            directions[k] = v / distances[k][:, np.newaxis]
+            cached = cache.get(light) if cache.enabled else None
+            if cached is not None and count:
+                ts, _ = cached.intersect_batch(rays.RayBatch(points, directions[k]))
+                blocked[k] = np.any(
+                    (ts > 0) & (ts < distances[k][:, np.newaxis]), axis=1
+                )
+                hits = int(blocked[k].sum())
+                cache.record(hits=hits, misses=count - hits, full_queries=0)
+
+        # light-major: row k * N + i is the shadow ray of point i to light k
+        remaining = np.flatnonzero(~blocked.ravel())
+        occluders = self._occluders_batch(
+            np.tile(points, (len(self.lights), 1))[remaining],
+            directions.reshape(-1, 3)[remaining],
+            distances.ravel()[remaining],
+        )
+        blocked.flat[remaining] = occluders >= 0
+        if cache.enabled:
+            cache.record(hits=0, misses=0, full_queries=len(remaining))
+            light_of = remaining // max(count, 1)
+            for k, light in enumerate(self.lights):
+                found = occluders[(light_of == k) & (occluders >= 0)]
+                if len(found):
+                    # the most frequent blocker is the best guess for the next batch
+                    cache.remember(light, self.objects[np.bincount(found).argmax()])
+                else:
+                    cache.forget(light)
+        return blocked.T
+
+    def shade_hit_batch(
+        self, comps: intersection.IntersectionComputationsBatch
+    ) -> np.ndarray:
+        """
+        Shades a batch of hits with the world, returning N x 3 colors
+        """
+        material_batch = self.compile().materials.take(comps.object_indices)
+        surface = np.zeros((len(comps), 3))
+        in_shadow = self.is_shadowed_batch(comps.over_point)
+        for k, light in enumerate(self.lights):
+            surface += light.lighting_batch(
+                material_batch,
+                comps.point,
+                comps.eye_vector,
+                comps.normal_vector,
+                in_shadow[:, k],
+            )
+        return surface
+
+    def color_at_batch(self, batch: rays.RayBatch) -> np.ndarray:
+        """
+        Returns the colors for a batch of rays as an N x 3 array
+        """
+        colors = np.zeros((len(batch), 3))
+        ts, indices = self.intersect_world_batch(batch)
+        hit = indices >= 0
+        if np.any(hit):
+            comps = self.prepare_computations_batch(batch[hit], ts[hit], indices[hit])
+            colors[hit] = self.shade_hit_batch(comps)
+        return colors
 
     def reflected_color(
         self, comps: intersection.IntersectionComputations, remaining: int = 5
@@ -0,0 +1,73 @@
+"""
+This module lets caches watch the objects they are built from.
+"""
+import os
+import sys
+
+package_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, package_path)
+
+import weakref
+
+
+class ChangeCounter:
+    """
+    A number that the objects it watches increment whenever they change,
+    so that the owner of a cache (such as a world's BVH) can tell whether
+    the cache is stale by comparing one value.
+    """
+
+    __slots__ = ("value", "__weakref__")
+
+    def __init__(self):
+        """
+        Constructor for the ChangeCounter class.
+        """
+        self.value = 0
+
+    def __repr__(self):
+        """
+        Returns a string representation of the counter.
+        """
+        return f"ChangeCounter(value={self.value})"
+
+
+class Watchable:
+    """
+    Mixin for objects that increment the ChangeCounters watching them.
+    Each change has an aspect (e.g. "transform" or "material"), so a cache
+    can watch only the changes that make it stale. Counters are held
+    weakly and are neither pickled nor copied with the object.
+    """
+
+    def watch(self, counter: ChangeCounter, aspect: str = ""):
+        """
+        Makes changes of the given aspect increment counter.
+        """
+        watchers = self.__dict__.setdefault("_watchers", {})
+        watchers.setdefault(aspect, weakref.WeakSet()).add(counter)
+
+    def unwatch(self, counter: ChangeCounter, aspect: str = ""):
+        """
+        Stops changes of the given aspect from incrementing counter.
+        """
+        watchers = self.__dict__.get("_watchers")
+        if watchers and aspect in watchers:
+            watchers[aspect].discard(counter)
+
+    def _changed(self, aspect: str = ""):
+        """
+        Increments the counters watching the given aspect.
+        """
+        watchers = self.__dict__.get("_watchers")
+        if watchers and aspect in watchers:
+            for counter in list(watchers[aspect]):
+                counter.value += 1
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_watchers", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)